@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Compare the default and the lean browser profile of GoogleMapsScraper.
+
+For each profile, starts a driver and, for every place URL, measures the page
+load (navigation timing), sort and review streaming time.
+
+Usage (from the repository root):
+
+    python -m benchmarks.lean_profile --i urls.txt --N 50
+"""
+import argparse
+import statistics
+import time
+
+from googlemaps import GoogleMapsScraper
+
+PAGE_LOAD_JS = "var t = performance.timing; return t.loadEventEnd - t.navigationStart;"
+
+
+def run_profile(urls, n_reviews, lean):
+    stats = {'driver_start': 0.0, 'page_load': [], 'place': [], 'reviews': 0}
+
+    start = time.perf_counter()
+    scraper = GoogleMapsScraper(lean=lean)
+    stats['driver_start'] = time.perf_counter() - start
+
+    try:
+        for url in urls:
+            start = time.perf_counter()
+            if scraper.sort_by(url, 1) != 0:
+                continue
+            stats['page_load'].append(scraper.driver.execute_script(PAGE_LOAD_JS) / 1000)
+            stats['reviews'] += sum(1 for _ in scraper.iter_reviews(url, limit=n_reviews))
+            stats['place'].append(time.perf_counter() - start)
+    finally:
+        scraper.close()
+
+    return stats
+
+
+def mean(values):
+    return statistics.mean(values) if values else float('nan')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Default vs lean browser profile benchmark.')
+    parser.add_argument('--i', type=str, default='urls.txt', help='target URLs file')
+    parser.add_argument('--N', type=int, default=50, help='Number of reviews to stream per place')
+    args = parser.parse_args()
+
+    with open(args.i, 'r') as urls_file:
+        urls = [u.strip() for u in urls_file if u.strip()]
+
+    results = {profile: run_profile(urls, args.N, lean=profile == 'lean') for profile in ('default', 'lean')}
+
+    print(f"{'profile':<10}{'driver start':>14}{'page load':>12}{'per place':>12}{'reviews':>10}")
+    for profile, s in results.items():
+        print(f"{profile:<10}{s['driver_start']:>13.2f}s{mean(s['page_load']):>11.2f}s"
+              f"{mean(s['place']):>11.2f}s{s['reviews']:>10}")
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Offline benchmark of GoogleMapsScraper against recorded Google Maps fixtures.
+
+Serves the fixtures from a local HTTP server (see server.py), drives sort_by,
+iter_reviews, get_reviews, get_account and get_places against them and reports
+per-phase timings (from the scraper's own metrics, see metrics.py) and review
+throughput. With --baseline, phases slower than the
+baseline by more than --tolerance make the run fail, so scroll/parse
+regressions are caught before deploying.
+
+Usage (from the repository root):
+
+    python -m benchmarks.offline --reviews 200 --extraction dom --parser lxml --json bench.json
+    python -m benchmarks.offline --baseline bench.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import traceback
+from collections import defaultdict
+
+from googlemaps import EXTRACTION_MODES, GoogleMapsScraper
+from parsers import PARSERS
+
+from benchmarks.server import FixtureServer
+
+TOLERANCE = 0.2
+
+
+class PhaseTimer:
+    """
+    Accumulate wall time of the scraper entry points driven by the benchmark.
+    """
+
+    def __init__(self):
+        self.totals = defaultdict(float)
+        self.calls = defaultdict(int)
+
+    def wrap(self, phase, fn):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.totals[phase] += time.perf_counter() - start
+                self.calls[phase] += 1
+        return timed
+
+    def measure(self, phase, fn, *args, **kwargs):
+        return self.wrap(phase, fn)(*args, **kwargs)
+
+
+def run(args):
+    results = {'config': {'reviews': args.reviews, 'extraction': args.extraction, 'parser': args.parser,
+                          'latency': args.latency}, 'phases': {}, 'errors': {}}
+    timer = PhaseTimer()
+
+    with FixtureServer(n_reviews=args.reviews, latency=args.latency) as server:
+        url = server.place_url()
+
+        scraper = GoogleMapsScraper(debug=args.debug, extraction=args.extraction, parser=args.parser, lean=args.lean)
+
+        try:
+            # streaming path used by scraper.py / monitor.py
+            scraper.sort_by(url, 1)
+            start = time.perf_counter()
+            reviews = list(scraper.iter_reviews(url, limit=args.reviews))
+            stream_time = time.perf_counter() - start
+            timer.totals['stream'] += stream_time
+            results['stream_reviews'] = len(reviews)
+            results['stream_missing'] = len(set(server.expected_ids()) - {r['id_review'] for r in reviews})
+            results['reviews_per_second'] = round(len(reviews) / stream_time, 2) if stream_time else None
+
+            # offset based path
+            scraper.sort_by(url, 1)
+            batch = timer.measure('get_reviews', scraper.get_reviews, 0, url, limit=args.reviews)
+            results['get_reviews_reviews'] = len(batch)
+
+            place = timer.measure('get_account', scraper.get_account, url)
+            results['place_n_reviews'] = place.get('n_reviews')
+
+            if not args.skip_places:
+                with tempfile.TemporaryDirectory() as tmp:
+                    square_points = os.path.join(tmp, 'square_points.csv')
+                    with open(square_points, 'w') as f:
+                        f.write("city,latitude,longitude\nbench,12.97,77.64\nbench,12.98,77.65\n")
+                    try:
+                        timer.measure('get_places', scraper.get_places, keyword_list=['salon'],
+                                      search_url=server.search_url(), square_points=square_points,
+                                      output=os.path.join(tmp, 'places.csv'))
+                    except Exception as e:
+                        results['errors']['get_places'] = f"{type(e).__name__}: {e}"
+                        traceback.print_exc()
+
+            results['waits'] = scraper.waits.summary()
+        finally:
+            scraper.close()
+
+    # driver_start, sort_by, scroll, expand, page_source and parse come from the scraper itself
+    results['phases'] = {phase: {'seconds': s['total'], 'calls': s['count']}
+                         for phase, s in scraper.metrics.summary().items()}
+    results['phases'].update({phase: {'seconds': round(total, 4), 'calls': timer.calls.get(phase, 1)}
+                              for phase, total in timer.totals.items()})
+    results['counters'] = dict(scraper.metrics.counters)
+    return results
+
+
+def report(results):
+    print(f"\n{'phase':<14}{'seconds':>10}{'calls':>8}")
+    for phase, s in sorted(results['phases'].items()):
+        print(f"{phase:<14}{s['seconds']:>10.3f}{s['calls']:>8}")
+
+    print(f"\nstreamed {results.get('stream_reviews')} reviews "
+          f"({results.get('reviews_per_second')} reviews/s, {results.get('stream_missing')} missing)")
+    for name, error in results['errors'].items():
+        print(f"{name} failed: {error}")
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns:
+        list[str]: Phases slower than the baseline by more than tolerance.
+    """
+    regressions = []
+    for phase, s in baseline['phases'].items():
+        current = results['phases'].get(phase)
+        if current is None:
+            continue
+        if current['seconds'] > s['seconds'] * (1 + tolerance):
+            regressions.append(f"{phase}: {s['seconds']:.3f}s -> {current['seconds']:.3f}s")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Offline Google Maps scraper benchmark.')
+    parser.add_argument('--reviews', type=int, default=200, help='Number of reviews served by the fixture place')
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds added to every review page request')
+    parser.add_argument('--extraction', type=str, default='dom', choices=EXTRACTION_MODES)
+    parser.add_argument('--parser', type=str, default='html.parser', choices=PARSERS)
+    parser.add_argument('--lean', dest='lean', action='store_true', help='Use the lean browser profile')
+    parser.add_argument('--debug', dest='debug', action='store_true', help='Show the browser')
+    parser.add_argument('--skip-places', dest='skip_places', action='store_true', help='Do not benchmark get_places')
+    parser.add_argument('--json', type=str, default=None, help='Write results to this JSON file')
+    parser.add_argument('--baseline', type=str, default=None, help='JSON results to compare against')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help='Allowed slowdown per phase (0.2 = 20%%)')
+    parser.set_defaults(lean=False, debug=False, skip_places=False)
+    args = parser.parse_args()
+
+    results = run(args)
+    report(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2, default=str)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print('\nRegressions:\n  ' + '\n  '.join(regressions))
+            sys.exit(1)
+        print('\nNo regression against baseline')
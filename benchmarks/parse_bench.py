@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Parser microbenchmark and golden check of GoogleMapsScraper.__parse / __parse_place.
+
+Parses the saved review blocks and place pages in fixtures/ with every parser
+backend, compares each field (id, username, text, rating, relative and review
+date, reviewer count, place details) against fixtures/parse_golden.json and
+reports the per-review and per-place parse cost. No browser is needed.
+
+Any field mismatch makes the run fail, and so do phases slower than --baseline
+by more than --tolerance, so it can gate parser optimizations.
+
+Usage (from the repository root):
+
+    python -m benchmarks.parse_bench --json parse.json
+    python -m benchmarks.parse_bench --baseline parse.json
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import timeit
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+
+from googlemaps import GoogleMapsScraper
+from parsers import PARSERS, get_parser
+
+from benchmarks.offline import TOLERANCE, compare
+from benchmarks.server import FIXTURES_DIR, load_fixture, render_place
+
+GOLDEN = 'parse_golden.json'
+REPEAT = 200
+ROUNDS = 5
+
+# review_date is compared against retrieval_date - review_age instead
+REVIEW_FIELDS = ('id_review', 'username', 'caption', 'rating', 'relative_date', 'n_review_user')
+DATE_SLACK = timedelta(seconds=5)
+
+
+def make_scraper(parser_name):
+    """
+    GoogleMapsScraper without a browser, enough to run the private parse methods.
+    """
+    scraper = GoogleMapsScraper.__new__(GoogleMapsScraper)
+    scraper.logger = logging.getLogger('googlemaps-scraper.parse-bench')
+    scraper.logger.disabled = True  # the missing ID fixture would warn on every timed parse
+    scraper.parser = get_parser(parser_name)
+    return scraper
+
+
+def load_place(entry):
+    if 'n_reviews' in entry:
+        return render_place(entry['name'], entry['n_reviews'])
+    return load_fixture(entry['file'])
+
+
+def check_reviews(scraper, golden):
+    """
+    Returns:
+        list[str]: Fields of the parsed review blocks differing from the golden values.
+    """
+    mismatches = []
+    raw = scraper.parser.parse_reviews(load_fixture(golden['file']))
+    if len(raw) != len(golden['expected']):
+        return [f"{golden['file']}: {len(raw)} review blocks, expected {len(golden['expected'])}"]
+
+    for i, (fields, expected) in enumerate(zip(raw, golden['expected'])):
+        item = scraper._GoogleMapsScraper__parse(fields)
+        for key in REVIEW_FIELDS:
+            if item[key] != expected[key]:
+                mismatches.append(f"review {i} {key}: {item[key]!r} != {expected[key]!r}")
+
+        age = expected['review_age']
+        if age is None:
+            if item['review_date'] is not None:
+                mismatches.append(f"review {i} review_date: {item['review_date']} != None")
+        elif item['review_date'] is None or \
+                abs(item['review_date'] - (item['retrieval_date'] - relativedelta(**age))) > DATE_SLACK:
+            mismatches.append(f"review {i} review_date: {item['review_date']} is not {age} before retrieval")
+
+    return mismatches
+
+
+def check_places(scraper, golden):
+    """
+    Returns:
+        list[str]: Fields of the parsed place pages differing from the golden values.
+    """
+    mismatches = []
+    for entry in golden:
+        place = scraper._GoogleMapsScraper__parse_place(scraper.parser.parse_place(load_place(entry)), entry['url'])
+        for key, value in entry['expected'].items():
+            if place.get(key) != value:
+                mismatches.append(f"{entry['file']} {key}: {place.get(key)!r} != {value!r}")
+    return mismatches
+
+
+def best_time(fn, repeat, rounds):
+    # best of rounds, like timeit, to keep noise from other processes out
+    return min(timeit.repeat(fn, number=repeat, repeat=rounds)) / repeat
+
+
+def bench(scraper, golden, repeat=REPEAT, rounds=ROUNDS):
+    """
+    Returns:
+        dict: phase -> seconds per review (or per place) and the number of items timed.
+    """
+    name = scraper.parser.name
+    html = load_fixture(golden['reviews']['file'])
+    raw = scraper.parser.parse_reviews(html)
+    pages = [(load_place(entry), entry['url']) for entry in golden['places']]
+    parse = scraper._GoogleMapsScraper__parse
+    parse_place = scraper._GoogleMapsScraper__parse_place
+
+    phases = {
+        f"{name}/parse_reviews": best_time(lambda: scraper.parser.parse_reviews(html), repeat, rounds) / len(raw),
+        f"{name}/__parse": best_time(lambda: [parse(fields) for fields in raw], repeat, rounds) / len(raw),
+        f"{name}/parse_place": best_time(
+            lambda: [scraper.parser.parse_place(page) for page, _ in pages], repeat, rounds) / len(pages),
+    }
+    fields = [(scraper.parser.parse_place(page), url) for page, url in pages]
+    phases[f"{name}/__parse_place"] = best_time(
+        lambda: [parse_place(response, url) for response, url in fields], repeat, rounds) / len(pages)
+
+    counts = {'parse_reviews': len(raw), '__parse': len(raw), 'parse_place': len(pages), '__parse_place': len(pages)}
+    return {phase: {'seconds': round(seconds, 9), 'calls': counts[phase.split('/', 1)[1]]}
+            for phase, seconds in phases.items()}
+
+
+def run(args):
+    with open(os.path.join(FIXTURES_DIR, GOLDEN), 'r', encoding='utf-8') as f:
+        golden = json.load(f)
+
+    results = {'config': {'repeat': args.repeat, 'rounds': args.rounds}, 'phases': {}, 'mismatches': {}}
+    for parser_name in args.parsers:
+        scraper = make_scraper(parser_name)
+        if scraper.parser.name != parser_name:
+            continue  # backend not installed, get_parser fell back
+
+        mismatches = check_reviews(scraper, golden['reviews']) + check_places(scraper, golden['places'])
+        if mismatches:
+            results['mismatches'][parser_name] = mismatches
+        results['phases'].update(bench(scraper, golden, args.repeat, args.rounds))
+
+    return results
+
+
+def report(results):
+    print(f"\n{'phase':<28}{'us/item':>10}{'items':>8}")
+    for phase, s in sorted(results['phases'].items()):
+        print(f"{phase:<28}{s['seconds'] * 1e6:>10.1f}{s['calls']:>8}")
+
+    for parser_name, mismatches in results['mismatches'].items():
+        print(f"\n{parser_name}: {len(mismatches)} field mismatches\n  " + '\n  '.join(mismatches))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Parser microbenchmark and golden field check.')
+    parser.add_argument('--parsers', nargs='+', default=list(PARSERS), choices=PARSERS,
+                        help='Parser backends to check and time')
+    parser.add_argument('--repeat', type=int, default=REPEAT, help='Parses per timing round')
+    parser.add_argument('--rounds', type=int, default=ROUNDS, help='Timing rounds, the best one is kept')
+    parser.add_argument('--json', type=str, default=None, help='Write results to this JSON file')
+    parser.add_argument('--baseline', type=str, default=None, help='JSON results to compare against')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help='Allowed slowdown per phase (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    results = run(args)
+    report(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    failed = bool(results['mismatches'])
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print('\nRegressions:\n  ' + '\n  '.join(regressions))
+            failed = True
+        else:
+            print('\nNo regression against baseline')
+
+    sys.exit(1 if failed else 0)
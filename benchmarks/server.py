@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Local HTTP server replaying Google Maps fixtures for offline benchmarks.
+
+Routes:
+    /maps/place/...                 place page (fixtures/place.html)
+    /maps/rpc/listugcposts?p=<n>    n-th page of reviews, in the listugcposts format
+    /maps/search/<keyword>/...      search result list (fixtures/search.html)
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+PAGE_SIZE = 10
+N_SEARCH_RESULTS = 20
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def render_place(name, n_reviews):
+    """
+    fixtures/place.html filled in for a place called name with n_reviews reviews.
+    """
+    return (load_fixture('place.html')
+            .replace('{{PLACE_NAME}}', name)
+            .replace('{{N_REVIEWS_FMT}}', f"{n_reviews:,}"))
+
+
+def review_entry(i, seed, now):
+    """
+    One review in the listugcposts layout decoded by xhr.REVIEW_FIELDS.
+    """
+    timestamp_us = int((now - timedelta(days=seed['age_days'])).timestamp() * 1e6)
+    author = [seed['author'], None, None, None, None, seed['n_reviews']]
+    details = [[seed['rating']]] + [None] * 14 + [[[seed['text']]]]
+    return [[f"BENCH{i:06d}", [None, None, timestamp_us, None, [None, None, None, None, None, author], None,
+                               seed['relative_date']], details]]
+
+
+class FixtureServer:
+    """
+    Serve a place with n_reviews reviews (cycled from fixtures/reviews.json),
+    adding `latency` seconds to every review page to mimic the network.
+    """
+
+    def __init__(self, n_reviews=200, latency=0.05, page_size=PAGE_SIZE, port=0):
+        self.n_reviews = n_reviews
+        self.latency = latency
+        self.page_size = page_size
+        self.seeds = json.loads(load_fixture('reviews.json'))
+        self.now = datetime.now()
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', port), self.__handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def place_url(self, name='Bench-Salon'):
+        return f"{self.base_url}/maps/place/{name}/@12.9716,77.6412,17z/data=!4m2?q=place_id:ChIJbench{name}"
+
+    def search_url(self):
+        return f"{self.base_url}/maps/search/"
+
+    def expected_ids(self, limit=None):
+        n = self.n_reviews if limit is None else min(limit, self.n_reviews)
+        return [f"BENCH{i:06d}" for i in range(n)]
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.stop()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def review_page(self, page):
+        start = page * self.page_size
+        end = min(start + self.page_size, self.n_reviews)
+        entries = [review_entry(i, self.seeds[i % len(self.seeds)], self.now) for i in range(start, end)]
+        next_token = f"page{page + 1}" if end < self.n_reviews else None
+        return ")]}'\n" + json.dumps([None, next_token, entries])
+
+    def place_page(self, name):
+        return render_place(name, self.n_reviews)
+
+    def search_page(self, keyword, point):
+        results = '\n'.join(
+            f'    <div class="Nv2PK" jsaction="mouseover:pane.wfvdle{i}">'
+            f'<a href="{self.base_url}/maps/place/{keyword}-{point}-{i}/@12.97,77.64,17z/data=!4m7!3m6!1s0x0:0x{i:x}"'
+            f' aria-label="{keyword.title()} {point} #{i}"></a></div>'
+            for i in range(N_SEARCH_RESULTS))
+        return load_fixture('search.html').replace('{{KEYWORD}}', keyword).replace('{{RESULTS}}', results)
+
+    def __handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                parts = [unquote(p) for p in url.path.split('/') if p]
+
+                if url.path.startswith('/maps/rpc/listugcposts'):
+                    time.sleep(server.latency)
+                    page = int(parse_qs(url.query).get('p', ['0'])[0])
+                    self.__send(server.review_page(page), 'application/json')
+                elif url.path.startswith('/maps/place/') and len(parts) > 2:
+                    self.__send(server.place_page(parts[2]), 'text/html')
+                elif url.path.startswith('/maps/search/') and len(parts) > 3:
+                    self.__send(server.search_page(parts[2], parts[3]), 'text/html')
+                else:
+                    self.send_error(404)
+
+            def log_message(self, format, *args):
+                pass  # keep benchmark output readable
+
+            def __send(self, body, content_type):
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', f"{content_type}; charset=utf-8")
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
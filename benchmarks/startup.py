@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Startup benchmark of the monitor Lambda: import time and time to first review.
+
+Every measure runs in a fresh interpreter, like a cold Lambda container:
+import time of monitor.py, googlemaps.py and scraper.py, then, for monitor.py,
+the time from process start to the first review streamed from the fixture
+place (see server.py) through warm_pool(), and the same for a second place
+load reusing the warm browser, as the next invocation of a warm container does.
+
+Usage (from the repository root):
+
+    python -m benchmarks.startup --repeat 5 --json startup.json
+    python -m benchmarks.startup --baseline startup.json
+"""
+import time
+
+START = time.perf_counter()  # before any other import, for the child process
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+MODULES = ('monitor', 'googlemaps', 'scraper')
+HEAVY_MODULES = ('pandas', 'numpy', 'pyarrow', 'boto3', 'bs4', 'lxml', 'selenium', 'webdriver_manager')
+IMPORT_CODE = "import sys, time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+
+def import_seconds(module):
+    out = subprocess.run([sys.executable, '-c', IMPORT_CODE.format(module=module)],
+                         capture_output=True, text=True, check=True).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def first_review(scraper, url):
+    scraper.sort_by(url, 1)
+    return next(iter(scraper.iter_reviews(url, limit=1)), None)
+
+
+def child(url):
+    import monitor
+    imported = time.perf_counter()
+
+    pool = monitor.warm_pool()
+    try:
+        review = pool.run(first_review, url)
+        cold = time.perf_counter()
+        pool.run(first_review, url)
+        warm = time.perf_counter() - cold
+    finally:
+        pool.close()
+
+    print(json.dumps({'import': imported - START, 'cold_first_review': cold - START, 'warm_first_review': warm,
+                      'review': review is not None,
+                      'heavy_modules': [m for m in HEAVY_MODULES if m in sys.modules]}))
+
+
+def run(args):
+    from benchmarks.server import FixtureServer
+
+    samples = {f'import_{module}': [] for module in MODULES}
+    samples.update(cold_first_review=[], warm_first_review=[])
+    heavy_modules = None
+
+    for module in MODULES:
+        for _ in range(args.repeat):
+            samples[f'import_{module}'].append(import_seconds(module))
+
+    with FixtureServer(n_reviews=args.reviews, latency=args.latency) as server:
+        for _ in range(args.repeat):
+            out = subprocess.run([sys.executable, '-m', 'benchmarks.startup', '--child', server.place_url()],
+                                 capture_output=True, text=True, check=True).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            if not result['review']:
+                raise RuntimeError('no review streamed from the fixture place')
+            samples['cold_first_review'].append(result['cold_first_review'])
+            samples['warm_first_review'].append(result['warm_first_review'])
+            heavy_modules = result['heavy_modules']
+
+    # median of the runs, same layout as offline.py results for compare()
+    return {'config': {'repeat': args.repeat, 'reviews': args.reviews, 'latency': args.latency},
+            'phases': {name: {'seconds': round(statistics.median(values), 4), 'calls': len(values)}
+                       for name, values in samples.items()},
+            'heavy_modules': heavy_modules}
+
+
+def report(results):
+    print(f"\n{'phase':<20}{'seconds':>10}")
+    for phase, s in results['phases'].items():
+        print(f"{phase:<20}{s['seconds']:>10.3f}")
+    print(f"\nmodules loaded by the first review: {', '.join(results['heavy_modules'] or [])}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Lambda startup benchmark: import time and time to first review.')
+    parser.add_argument('--repeat', type=int, default=3, help='Fresh interpreters per measure (median reported)')
+    parser.add_argument('--reviews', type=int, default=20, help='Number of reviews served by the fixture place')
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds added to every review page request')
+    parser.add_argument('--json', type=str, default=None, help='Write results to this JSON file')
+    parser.add_argument('--baseline', type=str, default=None, help='JSON results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed slowdown per phase (0.2 = 20%%)')
+    parser.add_argument('--child', type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        sys.exit(0)
+
+    results = run(args)
+    report(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        from benchmarks.offline import compare
+
+        with open(args.baseline, 'r') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print('\nRegressions:\n  ' + '\n  '.join(regressions))
+            sys.exit(1)
+        print('\nNo regression against baseline')
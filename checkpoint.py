@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import boto3
+
+
+class CheckpointStore:
+    """
+    SQLite journal of per-place progress for long scraping runs.
+
+    For every place URL it records the review IDs already captured, the number
+    of review blocks consumed (offset) and whether the place is done, so that a
+    rerun after a crash skips completed places and resumes partial ones.
+    Failed attempts are counted per place, so that callers can give up on a
+    place until the next reset instead of retrying it forever.
+    The database can be mirrored to S3 (e.g. for Lambda, whose disk is ephemeral).
+    """
+
+    def __init__(self, path, bucket=None, key=None):
+        self.path = path
+        self.bucket = bucket
+        self.key = key
+        self.logger = logging.getLogger('googlemaps-scraper')
+        self._lock = threading.Lock()
+
+        if self.bucket and self.key:
+            self.__pull()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS places (
+                url TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                n_reviews INTEGER NOT NULL DEFAULT 0,
+                review_offset INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS reviews (
+                url TEXT NOT NULL,
+                id_review TEXT NOT NULL,
+                PRIMARY KEY (url, id_review)
+            );
+            CREATE TABLE IF NOT EXISTS failures (
+                url TEXT PRIMARY KEY,
+                attempts INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                name TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        self.conn.commit()
+
+    def is_done(self, url):
+        row = self.conn.execute("SELECT status FROM places WHERE url = ?", (url,)).fetchone()
+        return row is not None and row[0] == 'done'
+
+    def offset(self, url):
+        row = self.conn.execute("SELECT review_offset FROM places WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else 0
+
+    def seen_ids(self, url):
+        return {r[0] for r in self.conn.execute("SELECT id_review FROM reviews WHERE url = ?", (url,))}
+
+    def failures(self, url):
+        row = self.conn.execute("SELECT attempts FROM failures WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else 0
+
+    def last_url(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE name = 'last_url'").fetchone()
+        return row[0] if row else None
+
+    def record(self, url, reviews, offset):
+        """
+        Record reviews captured for a place and the offset reached so far.
+        """
+        with self._lock:
+            self.conn.executemany("INSERT OR IGNORE INTO reviews (url, id_review) VALUES (?, ?)",
+                                  [(url, r['id_review']) for r in reviews if r.get('id_review')])
+            self.conn.execute("""
+                INSERT INTO places (url, status, n_reviews, review_offset, updated_at) VALUES (?, 'partial', ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    n_reviews = n_reviews + excluded.n_reviews, review_offset = excluded.review_offset, updated_at = excluded.updated_at
+            """, (url, len(reviews), offset, self.__now()))
+            self.conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('last_url', ?)", (url,))
+            self.conn.commit()
+
+    def mark_done(self, url):
+        with self._lock:
+            self.conn.execute("""
+                INSERT INTO places (url, status, updated_at) VALUES (?, 'done', ?)
+                ON CONFLICT(url) DO UPDATE SET status = 'done', updated_at = excluded.updated_at
+            """, (url, self.__now()))
+            self.conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('last_url', ?)", (url,))
+            self.conn.commit()
+        self.push()
+
+    def mark_failed(self, url):
+        """
+        Record a failed attempt at a place.
+
+        Returns:
+            int: Failed attempts at the place since the last reset.
+        """
+        with self._lock:
+            self.conn.execute("""
+                INSERT INTO failures (url, attempts) VALUES (?, 1)
+                ON CONFLICT(url) DO UPDATE SET attempts = attempts + 1
+            """, (url,))
+            self.conn.commit()
+        self.push()
+        return self.failures(url)
+
+    def reset(self):
+        # the run completed: next run starts from scratch
+        with self._lock:
+            self.conn.executescript("DELETE FROM places; DELETE FROM reviews; DELETE FROM failures; DELETE FROM meta;")
+            self.conn.commit()
+        self.push()
+
+    def push(self):
+        if not (self.bucket and self.key):
+            return
+        try:
+            with self._lock:
+                boto3.client('s3').upload_file(self.path, self.bucket, self.key)
+        except Exception as e:
+            self.logger.warning(f"Failed to mirror checkpoint to s3://{self.bucket}/{self.key}: {e}")
+
+    def close(self):
+        self.conn.close()
+
+    def __pull(self):
+        if os.path.exists(self.path):
+            return
+        try:
+            boto3.client('s3').download_file(self.bucket, self.key, self.path)
+            self.logger.info(f"Resuming from checkpoint s3://{self.bucket}/{self.key}")
+        except Exception as e:
+            self.logger.info(f"No checkpoint at s3://{self.bucket}/{self.key}: {e}")
+
+    def __now(self):
+        return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
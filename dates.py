@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Relative review dates ("2 days ago", "a week ago", "Edited 3 months ago",
+"hace un mes", "il y a 2 jours", "vor einer Woche", ...) to review dates.
+
+A phrase is reduced to (unit, amount) with the lookup tables below; the
+resulting offset is subtracted from the retrieval date. Phrases repeat a lot
+(Google only uses a few dozen), so reductions are cached and review_dates
+handles a whole pandas column with one offset computation per distinct phrase.
+"""
+import re
+from functools import lru_cache
+
+from dateutil.relativedelta import relativedelta
+
+# word -> relativedelta unit; English, Spanish, Portuguese, French, Italian, German and Dutch
+# TODO: Subject to changes
+UNITS = {}
+for unit, words in {
+    'minutes': ('minute', 'minutes', 'min', 'mins', 'minuto', 'minutos', 'minuti', 'minuten', 'minuut'),
+    'hours': ('hour', 'hours', 'hora', 'horas', 'heure', 'heures', 'ora', 'ore', 'stunde', 'stunden', 'uur'),
+    'days': ('day', 'days', 'día', 'días', 'dia', 'dias', 'jour', 'jours', 'giorno', 'giorni', 'tag', 'tage',
+             'tagen', 'dag', 'dagen'),
+    'weeks': ('week', 'weeks', 'semana', 'semanas', 'semaine', 'semaines', 'settimana', 'settimane', 'woche',
+              'wochen', 'weken'),
+    'months': ('month', 'months', 'mes', 'meses', 'mês', 'mois', 'mese', 'mesi', 'monat', 'monate', 'monaten',
+               'maand', 'maanden'),
+    'years': ('year', 'years', 'año', 'años', 'ano', 'anos', 'an', 'ans', 'année', 'années', 'anno', 'anni',
+              'jahr', 'jahre', 'jahren', 'jaar'),
+}.items():
+    UNITS.update(dict.fromkeys(words, unit))
+
+# indefinite articles standing for 1 ("a week ago", "hace una semana", "vor einem Monat")
+ONE = frozenset(('a', 'an', 'one', 'un', 'une', 'una', 'uno', 'um', 'uma', 'ein', 'eine', 'einer', 'einem',
+                 'einen', 'een'))
+
+# phrases meaning the review was just posted
+NOW = frozenset(('now', 'moment', 'ahora', 'agora', 'instant', 'adesso', 'gerade', 'zojuist'))
+
+TOKEN = re.compile(r'\w+')
+
+
+@lru_cache(maxsize=4096)
+def parse_relative(text):
+    """
+    Parameters:
+        text (str): Relative date as shown by Google Maps, in any supported language.
+
+    Returns:
+        tuple: (unit, amount) with unit a relativedelta argument, None if not recognized.
+    """
+    if not isinstance(text, str):
+        return None
+
+    tokens = TOKEN.findall(text.lower())
+    for i, token in enumerate(tokens[:-1]):
+        if token.isdigit():
+            amount = int(token)
+        elif token in ONE:
+            amount = 1
+        else:
+            continue
+
+        # "il y a un an": 'a' is followed by no unit, 'un' is
+        unit = UNITS.get(tokens[i + 1])
+        if unit is not None:
+            return unit, amount
+
+    if NOW.intersection(tokens):
+        return 'minutes', 0
+
+    return None
+
+
+def review_date(text, retrieval_date):
+    """
+    Parameters:
+        text (str): Relative date.
+        retrieval_date (datetime): When the review was scraped.
+
+    Returns:
+        datetime: Review date, None if text is not recognized.
+    """
+    parsed = parse_relative(text)
+    if parsed is None:
+        return None
+
+    unit, amount = parsed
+    return retrieval_date - relativedelta(**{unit: amount})
+
+
+def review_dates(relative_dates, retrieval_dates):
+    """
+    Vectorized review_date over a column of existing data.
+
+    Parameters:
+        relative_dates (pd.Series): Relative dates.
+        retrieval_dates (pd.Series or datetime or str): Retrieval date of each row, or one for all rows.
+
+    Returns:
+        pd.Series: datetime64 review dates, NaT where the relative date is not recognized.
+    """
+    # only needed offline, kept out of the scraper's import time
+    import numpy as np
+    import pandas as pd
+
+    relative_dates = pd.Series(relative_dates)
+    if isinstance(retrieval_dates, pd.Series):
+        retrieval = pd.to_datetime(retrieval_dates, errors='coerce').set_axis(relative_dates.index)
+    else:
+        retrieval = pd.Series(pd.Timestamp(retrieval_dates), index=relative_dates.index)
+
+    codes, phrases = pd.factorize(relative_dates)
+
+    # one offset per distinct (unit, amount), applied to all rows sharing it
+    groups = {}
+    for code, phrase in enumerate(phrases):
+        parsed = parse_relative(phrase)
+        if parsed is not None:
+            groups.setdefault(parsed, []).append(code)
+
+    out = pd.Series(pd.NaT, index=relative_dates.index, dtype='datetime64[ns]')
+    for (unit, amount), group_codes in groups.items():
+        mask = np.isin(codes, group_codes)
+        out[mask] = retrieval[mask] - pd.DateOffset(**{unit: amount})
+
+    return out
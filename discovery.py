@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Grid search discovery of places, used by GoogleMapsScraper.get_places.
+
+Every square point of input/square_points.csv is the center of a grid cell
+searched at ZOOM for each keyword. A cell whose result list is cut off before
+its end (Google stops listing after ~120 places) is dense: it is split into
+four cells searched one zoom level closer, down to max_depth. Places found by
+overlapping cells are deduplicated on their feature/place ID and written to
+the output CSV as soon as a cell is done.
+"""
+import csv
+import hashlib
+import logging
+import os
+import re
+from collections import deque, namedtuple
+
+ZOOM = 15
+# degrees covered by a search at ZOOM, halved at every zoom level
+CELL_SPAN = 0.02
+MAX_DEPTH = 2
+# a cut off list this long means the cell has more places than Google lists
+DENSE_RESULTS = 100
+PLACES_COLUMNS = ['search_point_url', 'href', 'name']
+
+# TODO: Subject to changes
+FEATURE_ID = re.compile(r'!1s(0x[0-9a-f]+:0x[0-9a-f]+)')
+PLACE_ID = re.compile(r'place_id:([^&/]+)')
+
+Cell = namedtuple('Cell', ['lat', 'lng', 'zoom', 'span', 'depth'])
+
+
+def initial_cells(square_points):
+    """
+    Parameters:
+        square_points (str): CSV with city, latitude and longitude columns.
+
+    Returns:
+        list[Cell]: One cell per latitude x longitude of each city.
+    """
+    import pandas as pd
+
+    points = pd.read_csv(square_points)
+
+    cells = []
+    for city, df_city in points.groupby('city', sort=False):
+        for lat in df_city['latitude'].unique():
+            for lng in df_city['longitude'].unique():
+                cells.append(Cell(float(lat), float(lng), ZOOM, CELL_SPAN, 0))
+    return cells
+
+
+def subdivide(cell):
+    offset = cell.span / 4
+    return [Cell(cell.lat + d_lat, cell.lng + d_lng, cell.zoom + 1, cell.span / 2, cell.depth + 1)
+            for d_lat in (-offset, offset) for d_lng in (-offset, offset)]
+
+
+def search_url_for(search_url, keyword, cell):
+    return f"{search_url}{keyword}/@{cell.lat:.6f},{cell.lng:.6f},{cell.zoom}z"
+
+
+def place_key(href):
+    """
+    8 byte hash of the place behind href: its feature ID or place ID when
+    present, the URL without query string otherwise.
+    """
+    match = FEATURE_ID.search(href) or PLACE_ID.search(href)
+    key = match.group(1) if match else href.split('?')[0]
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+
+
+class PlaceIndex:
+    """
+    Hash index of the places found so far, across cells and keywords.
+    """
+
+    def __init__(self):
+        self._keys = set()
+
+    def add(self, href):
+        """
+        Returns:
+            bool: True when the place was not indexed yet.
+        """
+        key = place_key(href)
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        return True
+
+    def load(self, path):
+        # places written by a previous run of the same output
+        if not os.path.exists(path):
+            return
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                self.add(row['href'])
+
+    def __contains__(self, href):
+        return place_key(href) in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class PlacesWriter:
+    """
+    Append-mode CSV of discovered places, flushed after every cell.
+    """
+
+    def __init__(self, path, resume=False):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        append = resume and os.path.exists(path) and os.path.getsize(path) > 0
+
+        self._file = open(path, 'a' if append else 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=PLACES_COLUMNS, extrasaction='ignore')
+        if not append:
+            self._writer.writeheader()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    def write(self, places):
+        self._writer.writerows(places)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class GridSearch:
+    """
+    Breadth-first search over grid cells, subdividing the dense ones.
+
+    `search(url)` loads one search result list and returns its places (dicts
+    with href and name) and whether the end of the list was reached.
+    """
+
+    def __init__(self, search, keyword_list, search_url, max_depth=MAX_DEPTH, dense_results=DENSE_RESULTS):
+        self.search = search
+        self.keyword_list = keyword_list
+        self.search_url = search_url
+        self.max_depth = max_depth
+        self.dense_results = dense_results
+        self.logger = logging.getLogger('googlemaps-scraper')
+
+    def run(self, cells, writer, index):
+        """
+        Returns:
+            int: New places written.
+        """
+        queue = deque((cell, keyword) for cell in cells for keyword in self.keyword_list)
+        n_searched = 0
+        n_new = 0
+
+        while queue:
+            cell, keyword = queue.popleft()
+            url = search_url_for(self.search_url, keyword, cell)
+            places, reached_end = self.search(url)
+            n_searched += 1
+
+            point = url.replace(self.search_url, '')
+            new_places = [dict(place, search_point_url=point) for place in places if index.add(place['href'])]
+            writer.write(new_places)
+            n_new += len(new_places)
+
+            split = not reached_end and len(places) >= self.dense_results and cell.depth < self.max_depth
+            if split:
+                queue.extend((child, keyword) for child in subdivide(cell))
+
+            self.logger.info(f"{point}: {len(places)} places, {len(new_places)} new{', subdividing' if split else ''}")
+            if n_searched % 10 == 0:
+                self.logger.info(f"{n_searched} searches, {len(queue)} queued, {len(index)} places")
+
+        return n_new
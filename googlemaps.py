@@ -1,14 +1,10 @@
 # -*- coding: utf-8 -*-
-import itertools
+import json
 import logging
 import re
-import time
 import traceback
-from datetime import datetime, timedelta
-from dateutil.relativedelta import relativedelta
+from datetime import datetime
 
-import numpy as np
-import pandas as pd
 from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.common.exceptions import NoSuchElementException
@@ -19,19 +15,110 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
 
-GM_WEBPAGE = 'https://www.google.com/maps/'
+from dates import review_date as relative_to_review_date
+from discovery import MAX_DEPTH, GridSearch, PlaceIndex, PlacesWriter, initial_cells, search_url_for
+from metrics import ScraperMetrics, timed
+from waits import AdaptiveWait, REVIEW_BLOCK_SELECTOR, count_above, review_count, review_count_above, review_ids, spinner_gone
+from parsers import get_parser
+from xhr import ReviewXhrCollector, parse_review_payload
+
+GM_SEARCH_URL = 'https://www.google.com/maps/search/'
+SQUARE_POINTS = 'input/square_points.csv'
+PLACES_OUTPUT = 'output/places_wax.csv'
 MAX_WAIT = 10
 MAX_RETRY = 5
 MAX_SCROLLS = 40
 
+EXTRACTION_MODES = ('dom', 'js', 'xhr')
+
+# requests blocked by the lean profile: images, avatars, fonts, media and map tiles
+# TODO: Subject to changes
+LEAN_BLOCKED_URLS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*.mp4', '*.webm', '*.mp3',
+    '*googleusercontent.com/*', '*fonts.gstatic.com/*',
+    '*/maps/vt*', '*/kh/v*', '*/maps/preview/streetview*',
+]
+
+REVIEW_PANE_SELECTOR = 'div.m6QErb.DxyBCb.kA9KIf.dS8AEf'
+
+# search result list, its place links and the "You've reached the end of the list" marker
+# TODO: Subject to changes
+PLACES_FEED_SELECTOR = "div.m6QErb.DxyBCb.kA9KIf.dS8AEf.ecceSd > div[aria-label*='Results for']"
+PLACE_LINK_SELECTOR = 'div[jsaction] > a[href]'
+PLACES_END_SELECTOR = 'span.HlvSq'
+
+# expand "More" buttons and return outerHTML of review blocks (arguments[1]) from index arguments[0]
+NEW_REVIEW_BLOCKS_JS = """
+var blocks = document.querySelectorAll(arguments[1]);
+var out = [];
+for (var i = arguments[0]; i < blocks.length; i++) {
+    blocks[i].querySelectorAll('button.w8nwRe.kyuRq').forEach(function (b) { b.click(); });
+    out.push(blocks[i].outerHTML);
+}
+return out;
+"""
+
+# expand and extract the raw fields of review blocks (arguments[1]) from index arguments[0]
+# in the page itself, rows are returned as one compact JSON array in REVIEW_JS_FIELDS order
+# TODO: Subject to changes
+REVIEW_JS_FIELDS = ('id_review', 'username', 'place_id', 'caption', 'rating_label', 'relative_date', 'n_review_text')
+EXTRACT_REVIEWS_JS = """
+function text(root, sel) { var el = root.querySelector(sel); return el ? el.textContent : null; }
+function attr(root, sel, name) { var el = root.querySelector(sel); return el ? el.getAttribute(name) : null; }
+var blocks = document.querySelectorAll(arguments[1]);
+var rows = [];
+for (var i = arguments[0]; i < blocks.length; i++) {
+    var b = blocks[i];
+    b.querySelectorAll('button.w8nwRe.kyuRq').forEach(function (btn) { btn.click(); });
+    rows.push([
+        b.getAttribute('data-review-id'),
+        b.getAttribute('aria-label'),
+        b.getAttribute('place_id'),
+        text(b, 'span.wiI7pd'),
+        attr(b, 'span.kvMYJc', 'aria-label'),
+        text(b, 'span.rsqaWe'),
+        text(b, 'div.RfnDt')
+    ]);
+}
+return JSON.stringify(rows);
+"""
+
 class GoogleMapsScraper:
 
-    def __init__(self, debug=False):
+    def __init__(self, debug=False, extraction='dom', parser='html.parser', lean=False, metrics=None,
+                 place_cache=None):
+        """
+        Parameters:
+            debug (bool): Run the browser with its graphical interface.
+            extraction (str): 'dom' parses the rendered review pane in Python,
+                'js' extracts the review fields inside the page,
+                'xhr' decodes the review pane background responses instead.
+            parser (str): HTML parser backend, 'html.parser' (BeautifulSoup) or 'lxml'.
+            lean (bool): Lightweight browser profile: block images, fonts, media
+                and map tiles, disable GPU/extensions.
+            metrics (ScraperMetrics): Timings and counters of this run, may be
+                shared by several scrapers; a new one by default.
+            place_cache (PlaceCache): Serves get_account from cached metadata
+                while it is fresh, may be shared by several scrapers.
+        """
+        if extraction not in EXTRACTION_MODES:
+            raise ValueError(f"extraction must be one of {EXTRACTION_MODES}, got {extraction!r}")
+
         self.debug = debug
-        self.driver = self.__get_driver()
+        self.lean = lean
+        self.extraction = extraction
+        self.parser = get_parser(parser)
+        self.metrics = metrics if metrics is not None else ScraperMetrics()
+        self.place_cache = place_cache
+        with self.metrics.timer('driver_start'):
+            self.driver = self.__get_driver()
         self.logger = self.__get_logger()
+        self.waits = AdaptiveWait(self.driver)
+        self.xhr = ReviewXhrCollector(self.driver) if extraction == 'xhr' else None
+        self.xhr_reviews = []  # decoded by get_reviews since the last sort_by
 
     def __enter__(self):
         return self
@@ -40,15 +127,38 @@ class GoogleMapsScraper:
         if exc_type is not None:
             traceback.print_exception(exc_type, exc_value, tb)
 
-        self.driver.close()
-        self.driver.quit()
+        self.close()
 
         return True
 
-    def sort_by(self, url, ind):
+    def close(self):
+        try:
+            self.driver.close()
+        except Exception:
+            pass  # window already gone, e.g. after a browser crash
+        self.driver.quit()
 
-        self.driver.get(url)
-        self.__click_on_cookie_agreement()
+    @timed('sort_by')
+    def sort_by(self, url, ind, reload=True):
+        """
+        Sort the reviews of a place.
+
+        Parameters:
+            url (str): The place URL.
+            ind (int): Position of the sort option (0 most relevant, 1 newest, ...).
+            reload (bool): Load url first; False when the page is already loaded,
+                e.g. by get_review_count.
+
+        Returns:
+            int: 0 on success, -1 when the sort menu could not be opened.
+        """
+        if self.xhr is not None:
+            self.xhr.reset()
+            self.xhr_reviews = []
+
+        if reload:
+            self.driver.get(url)
+            self.__click_on_cookie_agreement()
 
         wait = WebDriverWait(self.driver, MAX_WAIT)
 
@@ -61,69 +171,111 @@ class GoogleMapsScraper:
                 menu_bt.click()
 
                 clicked = True
-                time.sleep(3)
+                self.waits.until('sort_menu', EC.presence_of_all_elements_located((By.XPATH, '//div[@role=\'menuitemradio\']')))
             except Exception as e:
                 tries += 1
+                self.metrics.incr('retries')
                 self.logger.warn('Failed to click sorting button')
 
             # failed to open the dropdown
             if tries == MAX_RETRY:
+                self.metrics.incr('failures')
                 return -1
 
         #  element of the list specified according to ind
         recent_rating_bt = self.driver.find_elements(By.XPATH, '//div[@role=\'menuitemradio\']')[ind]
+        old_blocks = self.driver.find_elements(By.CSS_SELECTOR, REVIEW_BLOCK_SELECTOR)
         recent_rating_bt.click()
 
-        # wait to load review (ajax call)
-        time.sleep(4)
+        # wait to load review (ajax call): old list replaced and new one rendered
+        if old_blocks:
+            self.waits.until('sort_reload', EC.staleness_of(old_blocks[0]))
+        self.waits.until('sort_reviews', review_count_above(0))
+        self.waits.until('spinner', spinner_gone)
 
         return 0
 
-    def get_places(self, keyword_list=None):
+    def get_places(self, keyword_list=None, search_url=GM_SEARCH_URL, square_points=SQUARE_POINTS, output=PLACES_OUTPUT,
+                   max_depth=MAX_DEPTH, resume=False):
+        """
+        Discover places with a grid search around the square points (see discovery.py).
+
+        Parameters:
+            keyword_list (list[str]): Search keywords, e.g. ['salon'].
+            search_url (str): Google Maps search URL prefix.
+            square_points (str): CSV with city, latitude and longitude columns.
+            output (str): CSV the places are appended to as they are found.
+            max_depth (int): Times a dense cell can be split into four smaller ones.
+            resume (bool): Keep the places already in output and skip them.
 
-        df_places = pd.DataFrame()
-        search_point_url_list = self._gen_search_points_from_square(keyword_list=keyword_list)
+        Returns:
+            int: New places written to output.
+        """
+        index = PlaceIndex()
+        if resume:
+            index.load(output)
 
-        for i, search_point_url in enumerate(search_point_url_list):
-            print(search_point_url)
+        engine = GridSearch(self.search_places, keyword_list or [], search_url, max_depth=max_depth)
+        with PlacesWriter(output, resume=resume) as writer:
+            return engine.run(initial_cells(square_points), writer, index)
 
-            if (i+1) % 10 == 0:
-                print(f"{i}/{len(search_point_url_list)}")
-                df_places = df_places[['search_point_url', 'href', 'name', 'rating', 'num_reviews', 'close_time', 'other']]
-                df_places.to_csv('output/places_wax.csv', index=False)
+    def search_places(self, search_point_url, max_scrolls=MAX_SCROLLS):
+        """
+        Load a search result list, scrolling it past the first 20 places until its end.
 
+        Parameters:
+            search_point_url (str): Search URL of one keyword and grid point.
+            max_scrolls (int): Scroll budget of the result list.
 
-            try:
-                self.driver.get(search_point_url)
-            except NoSuchElementException:
-                self.driver.quit()
-                self.driver = self.__get_driver()
-                self.driver.get(search_point_url)
-
-            # scroll to load all (20) places into the page
-            scrollable_div = self.driver.find_element(By.CSS_SELECTOR,
-                "div.m6QErb.DxyBCb.kA9KIf.dS8AEf.ecceSd > div[aria-label*='Results for']")
-            for i in range(10):
-                self.driver.execute_script('arguments[0].scrollTop = arguments[0].scrollHeight', scrollable_div)
+        Returns:
+            tuple: (list of dicts with href and name, True if the end of the list was reached).
+        """
+        try:
+            self.driver.get(search_point_url)
+        except NoSuchElementException:
+            self.metrics.incr('retries')
+            self.driver.quit()
+            self.driver = self.__get_driver()
+            self.waits.driver = self.driver
+            self.driver.get(search_point_url)
+
+        try:
+            scrollable_div = WebDriverWait(self.driver, MAX_WAIT).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, PLACES_FEED_SELECTOR)))
+        except Exception as e:
+            self.logger.warning(f"No result list for {search_point_url}: {e}")
+            return [], True
+
+        self.waits.until('places', EC.presence_of_element_located((By.CSS_SELECTOR, PLACE_LINK_SELECTOR)))
 
-            # Get places names and href
-            time.sleep(2)
-            response = BeautifulSoup(self.driver.page_source, 'html.parser')
-            div_places = response.select('div[jsaction] > a[href]')
+        n_loaded = len(self.driver.find_elements(By.CSS_SELECTOR, PLACE_LINK_SELECTOR))
+        reached_end = False
+        no_change_count = 0
 
-            for div_place in div_places:
-                place_info = {
-                    'search_point_url': search_point_url.replace('https://www.google.com/maps/search/', ''),
-                    'href': div_place['href'],
-                    'name': div_place['aria-label']
-                }
+        for _ in range(max_scrolls):
+            if self.driver.find_elements(By.CSS_SELECTOR, PLACES_END_SELECTOR):
+                reached_end = True
+                break
 
-                df_places = df_places.append(place_info, ignore_index=True)
+            with self.metrics.timer('scroll'):
+                self.driver.execute_script('arguments[0].scrollTop = arguments[0].scrollHeight', scrollable_div)
+                if self.waits.until('places_scroll', count_above(PLACE_LINK_SELECTOR, n_loaded)):
+                    n_loaded = len(self.driver.find_elements(By.CSS_SELECTOR, PLACE_LINK_SELECTOR))
+                    no_change_count = 0
+                else:
+                    no_change_count += 1
 
-            # TODO: implement click to handle > 20 places
+            if no_change_count >= 3:
+                break  # list neither grows nor shows its end
 
-        df_places = df_places[['search_point_url', 'href', 'name']]
-        df_places.to_csv('output/places_wax.csv', index=False)
+        with self.metrics.timer('page_source'):
+            page_source = self.driver.page_source
+        with self.metrics.timer('parse'):
+            response = BeautifulSoup(page_source, 'html.parser')
+            places = [{'href': a['href'], 'name': a.get('aria-label')}
+                      for a in response.select(PLACE_LINK_SELECTOR)]
+
+        return places, reached_end
 
 
 
@@ -192,39 +344,231 @@ class GoogleMapsScraper:
 
     #     return parsed_reviews
 
-    def get_reviews(self, offset, url):
+    def get_reviews(self, offset, url, limit=None, max_scrolls=MAX_SCROLLS, stop_ids=None):
         """
         Scrape reviews and include the Place ID in the review metadata.
 
         Parameters:
             offset (int): The starting point for reviews to scrape.
             url (str): The URL containing the Place ID.
+            limit (int): Reviews wanted after offset, scrolling stops as soon as
+                they are loaded; None loads as many as the scroll budget allows.
+            max_scrolls (int): Scroll budget, None for no budget.
+            stop_ids (set): Review IDs already known (e.g. from a previous run),
+                scrolling stops once one of them is loaded.
 
         Returns:
             list[dict]: List of reviews with metadata, including Place ID.
+                With xhr extraction, offset counts the reviews decoded since
+                sort_by, also by earlier calls.
         """
-        self.__scroll()  # Intelligent scroll with retry logic
-        time.sleep(5)
-        self.__expand_reviews()
+        target = offset + limit if limit is not None else None
+
+        if self.extraction == 'xhr':
+            # responses are consumed once, so the reviews decoded since sort_by are
+            # kept and offsets index into them: successive calls page through the place
+            loaded = self.xhr_reviews
+            if not (stop_ids and any(r['id_review'] in stop_ids for r in loaded)):
+                seen_ids = {r['id_review'] for r in loaded}
+                for batch in self.__xhr_batches(url, max_scrolls, seen_ids):
+                    loaded += batch
+                    if target is not None and len(loaded) >= target:
+                        break
+                    if stop_ids and any(r['id_review'] in stop_ids for r in batch):
+                        break
+
+            parsed_reviews = loaded[offset:target]
+            for r in parsed_reviews:
+                print(r)
+            self.metrics.incr('reviews', len(parsed_reviews))
+            return parsed_reviews
+
+        self.__scroll(target=target, max_scrolls=max_scrolls, stop_ids=stop_ids)
+        self.waits.until('spinner', spinner_gone)
 
         place_id = self.extract_place_id_from_url(url)
 
-        response = BeautifulSoup(self.driver.page_source, 'html.parser')
-        rblock = response.find_all('div', class_='jftiEf fontBodyMedium')
+        if self.extraction == 'js':
+            # only the blocks after offset, expanded and extracted in the page
+            rblock = [None] * offset + self.__get_new_review_fields(offset)
+        else:
+            self.__expand_reviews()
+            with self.metrics.timer('page_source'):
+                page_source = self.driver.page_source
+            with self.metrics.timer('parse'):
+                rblock = self.parser.parse_reviews(page_source)
         parsed_reviews = []
+        retrieval_date = datetime.now()
 
         for index, review in enumerate(rblock):
             if index >= offset:
-                r = self.__parse(review)
+                with self.metrics.timer('parse'):
+                    r = self.__parse(review, retrieval_date)
                 if not r.get('id_review'):
                     self.logger.warning("Skipped a review block due to missing ID.")
                 r['place_id'] = place_id
                 parsed_reviews.append(r)
                 print(r)
 
+                if limit is not None and len(parsed_reviews) >= limit:
+                    break
+
+        self.metrics.incr('reviews', len(parsed_reviews))
         return parsed_reviews
 
+    def iter_reviews(self, url, limit=None, skip=0, max_scrolls=None):
+        """
+        Stream reviews of the current place, parsing only the review blocks
+        loaded by the latest scroll instead of the whole page source.
+
+        Parameters:
+            url (str): The URL containing the Place ID.
+            limit (int): Maximum number of reviews to yield, None for all.
+            skip (int): Review blocks to scroll past without parsing them,
+                e.g. the offset reached by an interrupted run (dom/js only).
+            max_scrolls (int): Scroll budget, None to scroll until limit is
+                reached or no more reviews load.
+
+        Yields:
+            dict: Review with metadata, including Place ID.
+        """
+        if self.extraction == 'xhr':
+            yield from self.__iter_reviews_xhr(url, limit, max_scrolls)
+            return
+
+        place_id = self.extract_place_id_from_url(url)
+
+        try:
+            scrollable_div = WebDriverWait(self.driver, MAX_WAIT).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, REVIEW_PANE_SELECTOR))
+            )
+        except Exception as e:
+            self.logger.error(f"Review pane not found for {url}: {e}")
+            return
+
+        # fast-forward past blocks consumed by a previous run
+        n_loaded = self.__scroll(target=skip, max_scrolls=None) if skip else 0
+
+        seen_ids = set()
+        n_blocks = min(skip, n_loaded)
+        n_yielded = 0
+        n_scrolls = 0
+        no_change_count = 0
+
+        while limit is None or n_yielded < limit:
+            if self.extraction == 'js':
+                new_reviews = self.__get_new_review_fields(n_blocks)
+                n_new = len(new_reviews)
+            else:
+                new_blocks = self.__get_new_review_blocks(n_blocks)
+                with self.metrics.timer('parse'):
+                    new_reviews = self.parser.parse_reviews(''.join(new_blocks))
+                n_new = len(new_blocks)
+
+            if not n_new:
+                no_change_count += 1
+                if no_change_count >= 3:
+                    break  # Stop if no new reviews loaded after 3 attempts
+            else:
+                no_change_count = 0
+                n_blocks += n_new
+
+            retrieval_date = datetime.now()
+            for review in new_reviews:
+                with self.metrics.timer('parse'):
+                    r = self.__parse(review, retrieval_date)
+
+                # the same review can be rendered twice while the pane re-renders
+                if r['id_review'] is not None:
+                    if r['id_review'] in seen_ids:
+                        continue
+                    seen_ids.add(r['id_review'])
+
+                r['place_id'] = place_id
+                print(r)
+                self.metrics.incr('reviews')
+                yield r
+
+                n_yielded += 1
+                if limit is not None and n_yielded >= limit:
+                    return
+
+            if max_scrolls is not None and n_scrolls >= max_scrolls:
+                self.logger.info(f"Scroll budget of {max_scrolls} spent after {n_yielded} reviews for {url}")
+                return
+
+            with self.metrics.timer('scroll'):
+                self.driver.execute_script('arguments[0].scrollTop = arguments[0].scrollHeight', scrollable_div)
+                # Allow time for AJAX to load new reviews
+                self.waits.until('scroll', review_count_above(n_blocks))
+            n_scrolls += 1
+
+    # decode review XHR responses: no "More" clicks and no HTML parsing
+    def __iter_reviews_xhr(self, url, limit, max_scrolls=None):
+        n_yielded = 0
+        for batch in self.__xhr_batches(url, max_scrolls):
+            for r in batch:
+                print(r)
+                self.metrics.incr('reviews')
+                yield r
+
+                n_yielded += 1
+                if limit is not None and n_yielded >= limit:
+                    return
+
+    # reviews decoded from the responses of each scroll, a whole response at a time
+    # so that a consumer stopping between batches loses none of them
+    def __xhr_batches(self, url, max_scrolls=None, seen_ids=None):
+        place_id = self.extract_place_id_from_url(url)
+
+        try:
+            scrollable_div = WebDriverWait(self.driver, MAX_WAIT).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, REVIEW_PANE_SELECTOR))
+            )
+        except Exception as e:
+            self.logger.error(f"Review pane not found for {url}: {e}")
+            return
+
+        seen_ids = set() if seen_ids is None else seen_ids
+        n_scrolls = 0
+        no_change_count = 0
+
+        while True:
+            decoded = []
+            with self.metrics.timer('page_source'):
+                payloads = self.xhr.collect()
+            for endpoint, body in payloads:
+                try:
+                    with self.metrics.timer('parse'):
+                        decoded += parse_review_payload(body, endpoint, place_id=place_id)
+                except ValueError as e:
+                    self.metrics.incr('undecodable_payloads')
+                    self.logger.warning(f"Undecodable {endpoint} payload for {url}: {e}")
+
+            new_reviews = []
+            for r in decoded:
+                if r['id_review'] not in seen_ids:
+                    seen_ids.add(r['id_review'])
+                    new_reviews.append(r)
+
+            if not new_reviews:
+                no_change_count += 1
+                if no_change_count >= 3:
+                    return  # Stop if no new reviews loaded after 3 attempts
+            else:
+                no_change_count = 0
+                yield new_reviews
 
+            if max_scrolls is not None and n_scrolls >= max_scrolls:
+                self.logger.info(f"Scroll budget of {max_scrolls} spent after {len(seen_ids)} reviews for {url}")
+                return
+
+            n_scrolls += 1
+            with self.metrics.timer('scroll'):
+                n_blocks = review_count(self.driver)
+                self.driver.execute_script('arguments[0].scrollTop = arguments[0].scrollHeight', scrollable_div)
+                # next page of reviews is requested as the pane reaches the bottom
+                self.waits.until('scroll', review_count_above(n_blocks))
 
     def extract_place_id_from_url(self, url):
         """
@@ -246,59 +590,97 @@ class GoogleMapsScraper:
             self.logger.warning(f"Failed to extract Place ID from URL {url}: {e}")
             return None
 
-    # need to use different url wrt reviews one to have all info
-    def get_account(self, url):
+    def get_review_count(self, url):
+        """
+        Load the place page and read its number of reviews from the header,
+        without sorting or scrolling the reviews.
+
+        Parameters:
+            url (str): The place URL.
 
+        Returns:
+            int: Number of reviews of the place, None if the header was not found.
+        """
         self.driver.get(url)
         self.__click_on_cookie_agreement()
 
-        # ajax call also for this section
-        time.sleep(2)
+        # TODO: Subject to changes
+        header = self.waits.until('place_header', EC.presence_of_element_located((By.CSS_SELECTOR, 'div.F7nice')))
+        if not header:
+            return None
 
-        resp = BeautifulSoup(self.driver.page_source, 'html.parser')
+        try:
+            return self.__parse_review_count(header.get_attribute('textContent'))
+        except Exception as e:
+            self.logger.warning(f"No review count in the header of {url}: {e}")
+            return None
 
-        place_data = self.__parse_place(resp, url)
-        # Add Place ID from URL
+    # need to use different url wrt reviews one to have all info
+    def get_account(self, url, n_reviews=None, reload=True):
+        """
+        Scrape the metadata of a place, or serve it from the place cache.
+
+        Parameters:
+            url (str): The place URL.
+            n_reviews (int): Current number of reviews if already known (e.g. from
+                get_review_count): a cached entry with a different count is refreshed.
+            reload (bool): Load url first; False when the page is already loaded,
+                e.g. by get_review_count.
+
+        Returns:
+            dict: Place metadata, including Place ID.
+        """
         place_id = self.extract_place_id_from_url(url)
+        cache_key = place_id or url
+
+        if self.place_cache is not None:
+            cached = self.place_cache.get(cache_key, n_reviews=n_reviews)
+            if cached is not None:
+                self.metrics.incr('place_cache_hits')
+                return cached
+            self.metrics.incr('place_cache_misses')
+
+        if reload:
+            self.driver.get(url)
+            self.__click_on_cookie_agreement()
+
+        # ajax call also for this section
+        self.waits.until('place_header', EC.presence_of_element_located((By.CSS_SELECTOR, 'h1.DUwDvf')))
+
+        with self.metrics.timer('page_source'):
+            page_source = self.driver.page_source
+        with self.metrics.timer('parse'):
+            resp = self.parser.parse_place(page_source)
+            place_data = self.__parse_place(resp, url)
+        # Add Place ID from URL
         place_data['place_id'] = place_id
 
+        if self.place_cache is not None:
+            self.place_cache.put(cache_key, place_data)
+
         return place_data
 
-    def __parse(self, review):
+    # review: raw fields located by the parser backend (see parsers.py)
+    # retrieval_date: one timestamp shared by the reviews of a batch, now by default
+    def __parse(self, review, retrieval_date=None):
 
         item = {}
 
-        try:
-            # TODO: Subject to changes
-            id_review = review['data-review-id']
-        except Exception as e:
-            id_review = None
+        id_review = review['id_review']
 
         if id_review is None:
             self.logger.warning("Skipped a review block due to missing ID.")
 
+        username = review['username']
+        place_id = review['place_id']
 
         try:
-            # TODO: Subject to changes
-            username = review['aria-label']
-        except Exception as e:
-            username = None
-
-        try:
-            # TODO: Subject to changes
-            place_id = review['place_id']
-        except Exception as e:
-            place_id = None
-
-        try:
-            # TODO: Subject to changes
-            review_text = self.__filter_string(review.find('span', class_='wiI7pd').text)
+            review_text = self.__filter_string(review['caption'])
         except Exception as e:
             review_text = None
 
         try:
-            # TODO: Subject to changes
-            rating = float(review.find('span', class_='kvMYJc')['aria-label'].split(' ')[0])
+            rating = float(review['rating_label'].split(' ')[0])
         except Exception as e:
             rating = None
 
@@ -308,40 +690,16 @@ class GoogleMapsScraper:
         # except Exception as e:
         #     relative_date = None
 
-        try:
-            # Extract relative date
-            relative_date = review.find('span', class_='rsqaWe').text
-
-            # Convert relative date to an actual date
-            retrieval_date = datetime.now()
-            if "day" in relative_date:
-                days_ago = int(relative_date.split()[0])
-                review_date = retrieval_date - timedelta(days=days_ago)
-            elif "week" in relative_date:
-                weeks_ago = int(relative_date.split()[0])
-                review_date = retrieval_date - timedelta(weeks=weeks_ago)
-            elif "month" in relative_date:
-                months_ago = int(relative_date.split()[0])
-                review_date = retrieval_date - relativedelta(months=months_ago)
-            elif "year" in relative_date:
-                years_ago = int(relative_date.split()[0])
-                review_date = retrieval_date - relativedelta(years=years_ago)
-            else:
-                review_date = retrieval_date  # Default to retrieval date if unknown format
-        except Exception as e:
-            relative_date = None
-            review_date = None
+        # relative date converted to an actual date, see dates.py for the supported phrases
+        retrieval_date = datetime.now() if retrieval_date is None else retrieval_date
+        relative_date = review['relative_date']
+        review_date = relative_to_review_date(relative_date, retrieval_date)
 
         try:
-            n_reviews = review.find('div', class_='RfnDt').text.split(' ')[3]
+            n_reviews = review['n_review_text'].split(' ')[3]
         except Exception as e:
             n_reviews = 0
 
-        try:
-            user_url = review.find('button', class_='WEBjve')['data-href']
-        except Exception as e:
-            user_url = None
-
         item['id_review'] = id_review
         item['caption'] = review_text
 
@@ -349,9 +707,8 @@ class GoogleMapsScraper:
         # custom mapping to transform into date should be implemented
         item['relative_date'] = relative_date
         item['review_date'] = review_date
-        # store datetime of scraping and apply further processing to calculate
-        # correct date as retrieval_date - time(relative_date)
-        item['retrieval_date'] = datetime.now()
+        # store datetime of scraping, review_date is retrieval_date - time(relative_date)
+        item['retrieval_date'] = retrieval_date
         item['rating'] = rating
         item['username'] = username
         item['n_review_user'] = n_reviews
@@ -362,63 +719,64 @@ class GoogleMapsScraper:
         return item
 
 
+    # response: raw place fields located by the parser backend (see parsers.py)
     def __parse_place(self, response, url):
 
         place = {}
 
         try:
-            place['name'] = response.find('h1', class_='DUwDvf fontHeadlineLarge').text.strip()
+            place['name'] = response['name'].strip()
         except Exception as e:
             place['name'] = None
 
         try:
-            place['overall_rating'] = float(response.find('div', class_='F7nice ').find('span', class_='ceNzKf')['aria-label'].split(' ')[1])
+            place['overall_rating'] = float(response['rating_label'].split(' ')[1])
         except Exception as e:
             place['overall_rating'] = None
 
         try:
-            place['n_reviews'] = int(response.find('div', class_='F7nice ').text.split('(')[1].replace(',', '').replace(')', ''))
+            place['n_reviews'] = self.__parse_review_count(response['rating_text'])
         except Exception as e:
             place['n_reviews'] = 0
 
         try:
-            place['n_photos'] = int(response.find('div', class_='YkuOqf').text.replace('.', '').replace(',','').split(' ')[0])
+            place['n_photos'] = int(response['photos_text'].replace('.', '').replace(',','').split(' ')[0])
         except Exception as e:
             place['n_photos'] = 0
 
         try:
-            place['category'] = response.find('button', jsaction='pane.rating.category').text.strip()
+            place['category'] = response['category'].strip()
         except Exception as e:
             place['category'] = None
 
         try:
-            place['description'] = response.find('div', class_='PYvSYb').text.strip()
+            place['description'] = response['description'].strip()
         except Exception as e:
             place['description'] = None
 
-        b_list = response.find_all('div', class_='Io6YTe fontBodyMedium')
+        b_list = response['info']
         try:
-            place['address'] = b_list[0].text
+            place['address'] = b_list[0]
         except Exception as e:
             place['address'] = None
 
         try:
-            place['website'] = b_list[1].text
+            place['website'] = b_list[1]
         except Exception as e:
             place['website'] = None
 
         try:
-            place['phone_number'] = b_list[2].text
+            place['phone_number'] = b_list[2]
         except Exception as e:
             place['phone_number'] = None
     
         try:
-            place['plus_code'] = b_list[3].text
+            place['plus_code'] = b_list[3]
         except Exception as e:
             place['plus_code'] = None
 
         try:
-            place['opening_hours'] = response.find('div', class_='t39EBf GUrTXd')['aria-label'].replace('\u202f', ' ')
+            place['opening_hours'] = response['hours_label'].replace('\u202f', ' ')
         except:
             place['opening_hours'] = None
 
@@ -431,31 +789,16 @@ class GoogleMapsScraper:
         return place
 
 
-    def _gen_search_points_from_square(self, keyword_list=None):
-        # TODO: Generate search points from corners of square
-
+    def _gen_search_points_from_square(self, keyword_list=None, search_url=GM_SEARCH_URL, square_points=SQUARE_POINTS):
+        # search URLs of the initial grid, before any dense cell is subdivided
         keyword_list = [] if keyword_list is None else keyword_list
 
-        square_points = pd.read_csv('input/square_points.csv')
-
-        cities = square_points['city'].unique()
-
-        search_urls = []
-
-        for city in cities:
-
-            df_aux = square_points[square_points['city'] == city]
-            latitudes = df_aux['latitude'].unique()
-            longitudes = df_aux['longitude'].unique()
-            coordinates_list = list(itertools.product(latitudes, longitudes, keyword_list))
-
-            search_urls += [f"https://www.google.com/maps/search/{coordinates[2]}/@{str(coordinates[1])},{str(coordinates[0])},{str(15)}z"
-             for coordinates in coordinates_list]
-
-        return search_urls
+        return [search_url_for(search_url, keyword, cell)
+                for cell in initial_cells(square_points) for keyword in keyword_list]
 
 
     # expand review description
+    @timed('expand')
     def __expand_reviews(self):
         # use XPath to load complete reviews
         # TODO: Subject to changes
@@ -463,6 +806,18 @@ class GoogleMapsScraper:
         for button in buttons:
             self.driver.execute_script("arguments[0].click();", button)
 
+    # expand and serialize only the review blocks after the first `start` ones
+    @timed('page_source')
+    def __get_new_review_blocks(self, start):
+        # TODO: Subject to changes
+        return self.driver.execute_script(NEW_REVIEW_BLOCKS_JS, start, REVIEW_BLOCK_SELECTOR) or []
+
+    # raw fields of the review blocks after the first `start` ones, in a single round trip
+    @timed('page_source')
+    def __get_new_review_fields(self, start):
+        rows = json.loads(self.driver.execute_script(EXTRACT_REVIEWS_JS, start, REVIEW_BLOCK_SELECTOR) or '[]')
+        return [dict(zip(REVIEW_JS_FIELDS, row)) for row in rows]
+
 
     # def __scroll(self):
     #     # TODO: Subject to changes
@@ -481,36 +836,72 @@ class GoogleMapsScraper:
     #     except Exception as e:
     #         self.logger.error(f"Scrolling failed: {e}")
 
-    def __scroll(self, max_scrolls=40):
+    # scroll the review pane until the caller has what it asked for, returns the review blocks loaded
+    def __scroll(self, target=None, max_scrolls=MAX_SCROLLS, stop_ids=None):
+        """
+        Parameters:
+            target (int): Review blocks wanted, None to load as many as possible.
+            max_scrolls (int): Scroll budget, None for no budget.
+            stop_ids (set): Known review IDs, stop once one of them is loaded.
+
+        Returns:
+            int: Review blocks loaded in the pane.
+        """
+        n_loaded = 0
         try:
             scrollable_div = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, 'div.m6QErb.DxyBCb.kA9KIf.dS8AEf'))
+                EC.presence_of_element_located((By.CSS_SELECTOR, REVIEW_PANE_SELECTOR))
             )
 
-            last_height = self.driver.execute_script("return arguments[0].scrollHeight", scrollable_div)
+            n_loaded = review_count(self.driver)
+            if stop_ids and stop_ids.intersection(review_ids(self.driver)):
+                return n_loaded
+
             scroll_attempts = 0
             no_change_count = 0
-
-            while scroll_attempts < max_scrolls:
-                self.driver.execute_script('arguments[0].scrollTop = arguments[0].scrollHeight', scrollable_div)
-                time.sleep(2)  # Allow time for AJAX to load new reviews
-
-                new_height = self.driver.execute_script("return arguments[0].scrollHeight", scrollable_div)
-                if new_height == last_height:
-                    no_change_count += 1
-                    if no_change_count >= 3:
-                        break  # Stop if no new reviews loaded after 3 attempts
-                else:
-                    no_change_count = 0
-                    last_height = new_height
-
+            added = 0
+
+            while target is None or n_loaded < target:
+                if max_scrolls is not None and scroll_attempts >= max_scrolls:
+                    self.logger.info(f"Scroll budget of {max_scrolls} spent with {n_loaded} reviews loaded")
+                    break
+
+                with self.metrics.timer('scroll'):
+                    self.driver.execute_script('arguments[0].scrollTop = arguments[0].scrollHeight', scrollable_div)
+                    # the adaptive timeout follows how long the pane takes to load a page of reviews
+                    self.waits.until('scroll', review_count_above(n_loaded))
+                    n_new = review_count(self.driver) - n_loaded
                 scroll_attempts += 1
 
+                if n_new <= 0:
+                    # a slow response is still loading: wait for it before counting a miss
+                    if self.waits.until('spinner', spinner_gone) and review_count(self.driver) > n_loaded:
+                        n_new = review_count(self.driver) - n_loaded
+                    else:
+                        no_change_count += 1
+                        if no_change_count >= 3:
+                            break  # Stop if no new reviews loaded after 3 attempts
+                        continue
+
+                no_change_count = 0
+                if stop_ids and stop_ids.intersection(review_ids(self.driver, n_loaded)):
+                    n_loaded += n_new
+                    self.logger.info(f"Known review loaded after {scroll_attempts} scrolls, stopping")
+                    break
+
+                n_loaded += n_new
+                added += n_new
+
+            per_scroll = added / scroll_attempts if scroll_attempts else 0
+            self.logger.debug(f"scroll: {n_loaded} reviews loaded, {per_scroll:.1f} per scroll")
             print(f"✅ Completed scrolling in {scroll_attempts} attempts.")
 
         except Exception as e:
+            self.metrics.incr('failures')
             self.logger.error(f"Scrolling failed: {e}")
 
+        return n_loaded
+
 
 
     def __get_logger(self):
@@ -518,6 +909,10 @@ class GoogleMapsScraper:
         logger = logging.getLogger('googlemaps-scraper')
         logger.setLevel(logging.DEBUG)
 
+        # several scrapers can live in one process (see pool.py)
+        if logger.handlers:
+            return logger
+
         # create console handler and set level to debug
         fh = logging.FileHandler('gm-scraper.log')
         fh.setLevel(logging.DEBUG)
@@ -545,12 +940,25 @@ class GoogleMapsScraper:
         options.add_argument("--disable-notifications")
         #options.add_argument("--lang=en-GB")
         options.add_argument("--accept-lang=en-GB")
+
+        # network events are needed to capture review responses
+        if self.extraction == 'xhr':
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+        if self.lean:
+            options.add_argument("--disable-gpu")
+            options.add_argument("--disable-extensions")
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+
         input_driver = webdriver.Chrome(service=Service(), options=options)
 
-         # click on google agree button so we can continue (not needed anymore)
-         # EC.element_to_be_clickable((By.XPATH, '//span[contains(text(), "I agree")]')))
-        input_driver.get(GM_WEBPAGE)
+        if self.lean:
+            # drop everything the review pane does not need before it is requested
+            input_driver.execute_cdp_cmd('Network.enable', {})
+            input_driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': LEAN_BLOCKED_URLS})
 
+        # no warm-up page: every entry point loads its own URL and clicks the cookie agreement
         return input_driver
 
     # cookies agreement click
@@ -567,6 +975,10 @@ class GoogleMapsScraper:
         except:
             return False
 
+    # "4.4(1,284)" -> 1284, whatever the thousands separator
+    def __parse_review_count(self, rating_text):
+        return int(re.sub(r'\D', '', rating_text.split('(')[1]))
+
     # util function to clean special characters
     def __filter_string(self, str):
         strOut = str.replace('\r', ' ').replace('\n', ' ').replace('\t', ' ')
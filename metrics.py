@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+import functools
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+PROMETHEUS_PREFIX = 'gmscraper'
+
+
+class ScraperMetrics:
+    """
+    Per-run timings and counters of the scraping hot path.
+
+    Phases (driver_start, sort_by, scroll, expand, page_source, parse, ...) keep
+    only a count, total and max, so timing every scroll or parsed review costs
+    a couple of additions. Counters track reviews, places, retries and failures,
+    and places are timed one by one to spot the slow ones. One instance can be
+    shared by all the scrapers of a pool.
+    """
+
+    def __init__(self, run_id=None):
+        self.run_id = run_id or datetime.now().strftime('%Y%m%dT%H%M%S')
+        self.started = time.time()
+        self.phases = {}
+        self.counters = {}
+        self.places = {}
+
+        self._lock = threading.Lock()
+
+    def observe(self, phase, seconds):
+        with self._lock:
+            stats = self.phases.get(phase)
+            if stats is None:
+                self.phases[phase] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                if seconds > stats[2]:
+                    stats[2] = seconds
+
+    @contextmanager
+    def timer(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - start)
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def place(self, url, seconds, reviews=0, ok=True):
+        """
+        Record one scraped place.
+
+        Parameters:
+            url (str): Place URL.
+            seconds (float): Wall time spent on the place.
+            reviews (int): Reviews scraped.
+            ok (bool): False when the place failed.
+        """
+        with self._lock:
+            self.places[url] = {'seconds': round(seconds, 3), 'reviews': reviews, 'ok': ok}
+        self.incr('places')
+        if not ok:
+            self.incr('failures')
+
+    def summary(self):
+        """
+        Returns:
+            dict: phase -> count, total, mean and max seconds.
+        """
+        with self._lock:
+            return {phase: {'count': count, 'total': round(total, 6), 'mean': round(total / count, 6),
+                            'max': round(peak, 6)}
+                    for phase, (count, total, peak) in self.phases.items()}
+
+    def records(self):
+        """
+        Returns:
+            list[dict]: One record per phase, counter and place of the run.
+        """
+        base = {'run': self.run_id, 'elapsed': round(time.time() - self.started, 3)}
+        records = [dict(base, type='phase', phase=phase, **stats) for phase, stats in self.summary().items()]
+        with self._lock:
+            records += [dict(base, type='counter', name=name, value=value) for name, value in self.counters.items()]
+            records += [dict(base, type='place', url=url, **stats) for url, stats in self.places.items()]
+        return records
+
+    def to_prometheus(self):
+        lines = [f'# TYPE {PROMETHEUS_PREFIX}_phase_seconds summary']
+        for phase, stats in self.summary().items():
+            lines.append(f'{PROMETHEUS_PREFIX}_phase_seconds_sum{{phase="{phase}"}} {stats["total"]}')
+            lines.append(f'{PROMETHEUS_PREFIX}_phase_seconds_count{{phase="{phase}"}} {stats["count"]}')
+
+        lines.append(f'# TYPE {PROMETHEUS_PREFIX}_phase_seconds_max gauge')
+        for phase, stats in self.summary().items():
+            lines.append(f'{PROMETHEUS_PREFIX}_phase_seconds_max{{phase="{phase}"}} {stats["max"]}')
+
+        with self._lock:
+            counters = dict(self.counters)
+            places = dict(self.places)
+
+        for name, value in sorted(counters.items()):
+            lines.append(f'# TYPE {PROMETHEUS_PREFIX}_{name}_total counter')
+            lines.append(f'{PROMETHEUS_PREFIX}_{name}_total {value}')
+
+        lines.append(f'# TYPE {PROMETHEUS_PREFIX}_place_seconds gauge')
+        for url, stats in places.items():
+            label = url.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            lines.append(f'{PROMETHEUS_PREFIX}_place_seconds{{url="{label}"}} {stats["seconds"]}')
+
+        lines.append(f'{PROMETHEUS_PREFIX}_run_seconds {round(time.time() - self.started, 3)}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path):
+        """
+        Write the run metrics: Prometheus text format when path ends with .prom,
+        JSON lines otherwise ('-' for stdout, e.g. CloudWatch logs in Lambda).
+        """
+        if path.endswith('.prom'):
+            content = self.to_prometheus()
+        else:
+            content = ''.join(json.dumps(record) + '\n' for record in self.records())
+
+        if path == '-':
+            sys.stdout.write(content)
+            return
+
+        with open(path, 'w') as f:
+            f.write(content)
+
+
+def timed(phase):
+    """
+    Time a GoogleMapsScraper method as `phase` in self.metrics.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.timer(phase):
+                return fn(self, *args, **kwargs)
+        return wrapper
+    return decorate
@@ -7,82 +7,413 @@ from datetime import datetime
 import argparse
 import logging
 import sys
-import csv
 import io
 import pandas as pd
+import threading
+import time
+from contextlib import nullcontext
 from termcolor import colored
 
-from googlemaps import GoogleMapsScraper  # make sure this is importable
+from checkpoint import CheckpointStore
+from metrics import ScraperMetrics
+from place_cache import PlaceCache
+from review_index import ReviewIndex, review_key
+from schedule import PlaceSchedule
+from work_queue import SHARDS, ShardWriter, drain, list_shards, merge_shards, open_queue, remove_shards
 
 BUCKET_NAME = 'naturals-reviews'
+S3_KEY = 'combined/all_4_naturals_salons.csv'
+# consecutive already known reviews after which a newest-first scrape stops
+KNOWN_RUN = 3
+CHECKPOINT_LOCAL = '/tmp/monitor_checkpoint.sqlite'
+CHECKPOINT_KEY = 'monitoring/monitor_checkpoint.sqlite'
+PLACE_CACHE_LOCAL = '/tmp/place_cache.sqlite'
+PLACE_CACHE_KEY = 'monitoring/place_cache.sqlite'
+SCHEDULE_LOCAL = '/tmp/monitor_schedule.sqlite'
+SCHEDULE_KEY = 'monitoring/monitor_schedule.sqlite'
+REVIEW_INDEX_LOCAL = '/tmp/review_index.sqlite'
+REVIEW_INDEX_KEY = 'monitoring/review_index.sqlite'
+# failed attempts after which a place is left to the next pass
+MAX_FAILURES = 3
+# seconds left to the final commit and the place in flight before the Lambda deadline
+LAMBDA_RESERVE = 120
+# returned by scrape_place for places left to the next run once the time budget is spent
+DEFERRED = object()
+SHARD_DIR = f's3://{BUCKET_NAME}/monitoring/shards'
+# browsers kept by a warm Lambda container between invocations
+WARM_POOL = None
 HEADER = ['id_review', 'caption', 'relative_date', 'review_date', 'retrieval_date', 'rating', 'username', 'n_review_user', 'place_id']
+# per-task rows written by queue workers next to their reviews, recorded by the merge
+VISIT_HEADER = ['url', 'new_reviews', 'place_key', 'review_count']
 
 class MonitorS3:
 
-    def __init__(self, url_file, max_reviews):
+    def __init__(self, url_file, max_reviews, workers=1, incremental=False, known_run=KNOWN_RUN, batch_size=0,
+                 store_uri=None, store_endpoint=None, checkpoint=None, lean=False, metrics_path=None, place_cache=None,
+                 schedule=None, time_budget=None, pool=None, review_index=None, max_failures=MAX_FAILURES):
         with open(url_file, 'r') as furl:
             self.urls = [u.strip() for u in furl]
 
         self.max_reviews = max_reviews
+        self.workers = workers
+        self.incremental = incremental
+        self.known_run = known_run
+        # places per S3 commit, 0 commits once at the end of the run
+        self.batch_size = batch_size
+        self.known_ids = {}
         self.logger = self.__get_logger()
         self.s3 = boto3.client('s3')
+        # partitioned Parquet store replacing the combined CSV when set
+        self.store = None
+        if store_uri:
+            from store import ParquetReviewStore  # pyarrow is only loaded when used
+            self.store = ParquetReviewStore(store_uri, endpoint_url=store_endpoint)
+        # CheckpointStore: places already committed in the current pass are skipped,
+        # as are places that failed max_failures times
+        self.checkpoint = checkpoint
+        self.max_failures = max_failures
+        self.lean = lean
+        # per-phase timings and counters, exported to metrics_path at the end of a run
+        self.metrics = ScraperMetrics()
+        self.metrics_path = metrics_path
+        # PlaceCache: places whose review count did not move since the last run are not scraped
+        self.place_cache = place_cache
+        self.pending_counts = {}  # url -> (place key, review count), recorded once committed
+        # PlaceSchedule: only due places are scraped, the most likely to have new reviews first
+        self.schedule = schedule
+        self.pending_visits = {}  # url -> new reviews found, recorded once committed
+        # seconds after which remaining places are deferred to the next run
+        self.time_budget = time_budget
+        self.deadline = None
+        # ReviewIndex: stored review IDs, checked instead of the baseline's
+        self.review_index = review_index
+        # ScraperPool owned by the caller, left open after the run (e.g. WARM_POOL)
+        self.pool = pool
+        if self.pool is not None:
+            self.pool.use_metrics(self.metrics)
 
     def scrape_and_monitor_reviews(self):
-        with GoogleMapsScraper() as scraper:
-            for url in self.urls:
+        if self.time_budget is not None:
+            self.deadline = time.monotonic() + self.time_budget
+
+        previous_reviews = self.load_baseline()
+        # IDs of the baseline when it was read, and of this run, on top of the review index
+        stored_ids = set(previous_reviews['id_review'])
+
+        urls = self.urls
+        if self.checkpoint is not None:
+            urls = self.__unfinished(self.urls)
+            self.logger.info(f"Resuming pass: {len(self.urls) - len(urls)} places done, {len(urls)} left")
+        if self.schedule is not None:
+            n_places = len(urls)
+            urls = self.schedule.plan(urls)
+            self.logger.info(f"{len(urls)} of {n_places} places due")
+            self.metrics.incr('places_not_due', n_places - len(urls))
+
+        new_frames = []
+        scraped_urls = []  # places scraped since the last commit
+        deferred_urls = []
+
+        with self.scraper_pool() as pool:
+            for url, local_reviews in zip(urls, pool.imap(self.scrape_place, urls)):
                 slug = self.get_slug_from_url(url)
-                s3_key = "combined/all_4_naturals_salons.csv"
 
+                if local_reviews is DEFERRED:
+                    deferred_urls.append(url)
+                    continue
+                if local_reviews is None:
+                    if self.checkpoint is not None and self.checkpoint.mark_failed(url) >= self.max_failures:
+                        self.logger.warning(f"{slug} failed {self.max_failures} times, left to the next pass")
+                    continue
+
+                n_new = 0
                 try:
-                    # Sort reviews by newest
-                    error = scraper.sort_by(url, 1)
-                    if error != 0:
-                        self.logger.warning(f"⚠️ Sorting failed for {url}")
-                        continue
-
-                    offset = 0
-                    local_reviews = []
-
-                    while len(local_reviews) < self.max_reviews:
-                        self.logger.info(f"Fetching reviews from offset {offset} for {slug}")
-                        reviews = scraper.get_reviews(offset, url)
-                        if not reviews:
-                            break
-
-                        for r in reviews:
-                            if len(local_reviews) >= self.max_reviews:
-                                break
-                            r['retrieval_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                            local_reviews.append(r)
-
-                        offset += len(reviews)
-
-                    # Compare with existing data in S3
-                    previous_reviews = self.load_s3_reviews(s3_key)
-                    previous_ids = set(previous_reviews['id_review']) if not previous_reviews.empty else set()
-                    new_df = pd.DataFrame(local_reviews)
-                    new_ids = set(new_df['id_review'])
-
-                    diff_ids = new_ids - previous_ids
-
-                    if diff_ids:
-                        updated_df = pd.concat([previous_reviews, new_df[new_df['id_review'].isin(diff_ids)]], ignore_index=True)
-                        self.upload_csv_to_s3(updated_df, HEADER, s3_key)
-                        self.logger.info(f"✅ {len(diff_ids)} new reviews uploaded to all_4_naturals_reviews.csv")
-                    else:
-                        self.logger.info("No new reviews detected for all_4_naturals_reviews.csv")
+                    if local_reviews:
+                        new_reviews = self.new_reviews(local_reviews, stored_ids)
+                        n_new = len(new_reviews)
+
+                        if new_reviews:
+                            new_frames.append(pd.DataFrame(new_reviews))
+                            self.logger.info(f"✅ {n_new} new reviews detected for {slug}")
+                        else:
+                            self.logger.info(f"No new reviews detected for {slug}")
 
                 except Exception as e:
                     exc_type, exc_obj, exc_tb = sys.exc_info()
                     fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
                     self.logger.error(f"{url}: {exc_type}, {fname}, {exc_tb.tb_lineno}")
 
+                self.pending_visits[url] = n_new
+                scraped_urls.append(url)
+                if self.batch_size and len(scraped_urls) >= self.batch_size:
+                    previous_reviews = self.commit_reviews(previous_reviews, new_frames, S3_KEY, scraped_urls)
+                    new_frames = []
+                    scraped_urls = []
+
+        self.commit_reviews(previous_reviews, new_frames, S3_KEY, scraped_urls)
+
+        if deferred_urls:
+            self.logger.info(f"Time budget spent, {len(deferred_urls)} places deferred to the next run")
+            self.metrics.incr('places_deferred', len(deferred_urls))
+
+        if self.place_cache is not None:
+            self.place_cache.push()
+        if self.schedule is not None:
+            self.schedule.push()
+
+        if self.metrics_path:
+            self.metrics.export(self.metrics_path)
+
+        # the pass is complete once every place is done or out of attempts, the next one starts over
+        if self.checkpoint is not None:
+            due = self.schedule.plan(self.urls) if self.schedule is not None else self.urls
+            if not self.__unfinished(due):
+                self.checkpoint.reset()
+
+    def commit_reviews(self, previous_reviews, new_frames, s3_key, urls=()):
+        """
+        Append the new reviews to the baseline and rewrite the S3 file once,
+        or add them as new partitions of the Parquet store, then checkpoint urls.
+
+        Returns:
+            pd.DataFrame: The updated baseline.
+        """
+        start = time.perf_counter()
+
+        if not new_frames:
+            self.logger.info(f"No new reviews to upload to {self.store.uri if self.store else s3_key}")
+            updated_df = previous_reviews
+        elif self.store is not None:
+            n_new = self.store.append(pd.concat(new_frames, ignore_index=True))
+            self.logger.info(f"✅ {n_new} new reviews appended to {self.store.uri}")
+            updated_df = previous_reviews
+        else:
+            updated_df = pd.concat([previous_reviews] + new_frames, ignore_index=True)
+            self.upload_csv_to_s3(updated_df, HEADER, s3_key)
+            self.logger.info(f"✅ {len(updated_df) - len(previous_reviews)} new reviews uploaded to {s3_key}")
+
+        if self.checkpoint is not None:
+            for url in urls:
+                self.checkpoint.mark_done(url)
+
+        # the next run dedups against the index only once it holds these reviews
+        if self.review_index is not None and new_frames:
+            self.review_index.add_frame(pd.concat(new_frames, ignore_index=True))
+            self.review_index.push()
+        self.record_stored(urls)
+
+        self.metrics.observe('commit', time.perf_counter() - start)
+        return updated_df
+
+    def scraper_pool(self):
+        if self.pool is not None:
+            return nullcontext(self.pool)
+        from pool import ScraperPool  # selenium is only loaded by the roles opening a browser
+        return ScraperPool(workers=self.workers, lean=self.lean, metrics=self.metrics)
+
+    def record_stored(self, urls):
+        # counts and visits are only trusted once the reviews behind them are stored
+        if self.place_cache is not None:
+            for url in urls:
+                if url in self.pending_counts:
+                    self.place_cache.record_review_count(*self.pending_counts.pop(url))
+        if self.schedule is not None:
+            for url in urls:
+                if url in self.pending_visits:
+                    self.schedule.record(url, self.pending_visits.pop(url))
+
+    def enqueue(self, work_queue, shards=SHARDS):
+        """
+        Coordinator: put the places to monitor on the work queue.
+        """
+        urls = self.schedule.plan(self.urls) if self.schedule is not None else self.urls
+        work_queue.put(urls, shards=shards)
+        self.logger.info(f"Enqueued {len(urls)} places over {shards} shards")
+
+    def work(self, work_queue, shard_dir=SHARD_DIR):
+        """
+        Worker: scrape the places leased from the work queue and write their new
+        reviews to per-shard outputs, until the queue is empty or the time budget is spent.
+
+        Returns:
+            dict: Tasks completed, failed and released by this worker.
+        """
+        if self.time_budget is not None:
+            self.deadline = time.monotonic() + self.time_budget
+
+        previous_reviews = self.load_baseline()
+        stored_ids = set(previous_reviews['id_review'])
+        ids_lock = threading.Lock()
+
+        def scrape_task(scraper, task):
+            local_reviews = self.scrape_place(scraper, task.url)
+            # started just as the budget ran out: retried by the next worker
+            return None if local_reviews is DEFERRED else local_reviews
+
+        def write_shard(task, local_reviews):
+            with ids_lock:
+                new_reviews = self.new_reviews(local_reviews, stored_ids)
+            writer.write(task.shard, new_reviews)
+            if new_reviews:
+                self.logger.info(f"✅ {len(new_reviews)} new reviews detected for {self.get_slug_from_url(task.url)}")
+
+            # counts and visits are recorded by the merge, once the reviews are committed
+            place_key, n_reviews = self.pending_counts.pop(task.url, ('', ''))
+            visits.write(task.shard, [{'url': task.url, 'new_reviews': len(new_reviews),
+                                       'place_key': place_key, 'review_count': n_reviews}])
+            # the task completes once its rows are safe, a crash before leaves it to another worker
+            writer.flush()
+            visits.flush()
+
+        def out_of_time():
+            return self.deadline is not None and time.monotonic() > self.deadline
+
+        with ShardWriter(shard_dir, HEADER) as writer, ShardWriter(shard_dir, VISIT_HEADER, prefix='visits') as visits, \
+                self.scraper_pool() as pool:
+            counts = drain(work_queue, pool, scrape_task, write_shard, threads=self.workers, stop=out_of_time)
+
+        if self.metrics_path:
+            self.metrics.export(self.metrics_path)
+
+        return counts
+
+    def merge(self, shard_dir=SHARD_DIR):
+        """
+        Coordinator: commit the reviews of every shard output once the queue is drained,
+        record the visits of their places, then remove the merged outputs.
+        """
+        previous_reviews = self.load_baseline()
+        stored_ids = set(previous_reviews['id_review'])
+
+        # visits first: the reviews of a listed visit were flushed before it
+        visit_files = list_shards(shard_dir, prefix='visits')
+        shards = list_shards(shard_dir)
+
+        urls = []
+        for visit in merge_shards(shard_dir, visit_files).to_dict('records'):
+            urls.append(visit['url'])
+            self.pending_visits[visit['url']] = int(visit['new_reviews'])
+            if visit['review_count']:
+                self.pending_counts[visit['url']] = (visit['place_key'], int(visit['review_count']))
+
+        new_reviews = self.new_reviews(merge_shards(shard_dir, shards).to_dict('records'), stored_ids)
+        self.commit_reviews(previous_reviews, [pd.DataFrame(new_reviews)] if new_reviews else [], S3_KEY, urls)
+        remove_shards(shard_dir, shards + visit_files)
+        self.logger.info(f"Merged {len(shards)} shard outputs, {len(new_reviews)} new reviews from {len(urls)} places")
+
+        if self.place_cache is not None:
+            self.place_cache.push()
+        if self.schedule is not None:
+            self.schedule.push()
+
+    def new_reviews(self, local_reviews, stored_ids):
+        """
+        Parameters:
+            local_reviews (list[dict]): Freshly parsed reviews.
+            stored_ids (set): IDs already seen, updated with the new ones.
+
+        Returns:
+            list[dict]: Reviews neither stored (checked in bulk against the
+            review index when set) nor in stored_ids.
+        """
+        if self.review_index is not None:
+            local_reviews = self.review_index.new_reviews(local_reviews)
+
+        new_reviews = {}
+        for r in local_reviews:
+            if r['id_review'] not in stored_ids and r['id_review'] not in new_reviews:
+                new_reviews[r['id_review']] = r
+        stored_ids.update(new_reviews)
+        return list(new_reviews.values())
+
+    def scrape_place(self, scraper, url):
+        # places still queued when the budget is spent are left to the next run
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            return DEFERRED
+
+        slug = self.get_slug_from_url(url)
+        start = time.perf_counter()
+        place_key = scraper.extract_place_id_from_url(url) or url
+
+        # pre-check: the review count in the place header tells if there is anything new
+        n_reviews = None
+        if self.place_cache is not None:
+            n_reviews = scraper.get_review_count(url)
+            if n_reviews is not None and n_reviews == self.place_cache.last_review_count(place_key):
+                self.logger.info(f"Review count of {slug} unchanged ({n_reviews}), skipping")
+                self.metrics.incr('places_unchanged')
+                self.metrics.place(url, time.perf_counter() - start)
+                return []
+
+        # Sort reviews by newest, on the page loaded by the pre-check if any
+        error = scraper.sort_by(url, 1, reload=n_reviews is None)
+        if error != 0:
+            self.logger.warning(f"⚠️ Sorting failed for {url}")
+            self.metrics.place(url, time.perf_counter() - start, ok=False)
+            return None
+
+        local_reviews = []
+        known = self.known_keys(scraper.extract_place_id_from_url(url))
+        known_run = 0
+
+        self.logger.info(f"Streaming up to {self.max_reviews} reviews for {slug}")
+        for r in scraper.iter_reviews(url, limit=self.max_reviews):
+            # newest first: a run of known reviews means the rest is known too
+            if review_key(r['id_review']) in known:
+                known_run += 1
+                if known_run >= self.known_run:
+                    self.logger.info(f"Reached {known_run} known reviews for {slug}, stopping")
+                    break
+                continue
+            known_run = 0
+
+            r['retrieval_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            local_reviews.append(r)
+
+        if n_reviews is not None:
+            self.pending_counts[url] = (place_key, n_reviews)
+
+        self.metrics.place(url, time.perf_counter() - start, reviews=len(local_reviews))
+        return local_reviews
+
     def get_slug_from_url(self, url):
         try:
             return url.strip().split('/')[4]
         except IndexError:
             return "place-" + datetime.today().strftime('%Y%m%d%H%M%S')
 
+    def load_baseline(self):
+        # the store is append only: with a review index its IDs need not be read
+        if self.store is not None and self.review_index is not None and len(self.review_index):
+            return pd.DataFrame(columns=['id_review', 'place_id'])
+
+        # the baseline is downloaded once per run and indexed in memory
+        if self.store is not None:
+            previous_reviews = self.store.read(columns=['id_review', 'place_id'])
+        else:
+            previous_reviews = self.load_s3_reviews(S3_KEY)
+
+        if self.review_index is not None:
+            # the baseline was read anyway: index what a run with a stale or unpushed index stored
+            n_indexed = self.review_index.add_frame(previous_reviews)
+            if n_indexed:
+                self.logger.info(f"Indexed {n_indexed} stored reviews missing from the review index")
+                self.review_index.push()
+        elif self.incremental:
+            self.known_ids = self.index_review_ids(previous_reviews)
+        return previous_reviews
+
+    def known_keys(self, place_id):
+        """
+        Returns:
+            set[int]: review_key of the stored reviews of the place, empty unless incremental.
+        """
+        if not self.incremental:
+            return set()
+        if self.review_index is not None:
+            return self.review_index.keys(place_id)
+        return {review_key(review_id) for review_id in self.known_ids.get(place_id, ())}
+
     def load_s3_reviews(self, key):
         try:
             obj = self.s3.get_object(Bucket=BUCKET_NAME, Key=key)
@@ -92,15 +423,27 @@ class MonitorS3:
             self.logger.warning(f"No existing file at {key}: {e}")
             return pd.DataFrame(columns=['id_review'])
 
+    def index_review_ids(self, df):
+        """
+        Returns:
+            dict[str, set]: place_id -> set of id_review stored in df.
+        """
+        if df.empty or 'place_id' not in df.columns:
+            return {}
+
+        return {place_id: set(ids) for place_id, ids in df.groupby('place_id')['id_review']}
+
     def upload_csv_to_s3(self, df, headers, s3_key):
         csv_buffer = io.StringIO()
-        writer = csv.writer(csv_buffer)
-        writer.writerow(headers)
-        for _, r in df.iterrows():
-            writer.writerow([r.get(k, "") for k in headers])
+        df.reindex(columns=headers).to_csv(csv_buffer, index=False)
         self.s3.put_object(Bucket=BUCKET_NAME, Key=s3_key, Body=csv_buffer.getvalue())
         print(colored(f"✅ Uploaded CSV to s3://{BUCKET_NAME}/{s3_key}", "green"))
 
+    def __unfinished(self, urls):
+        # with a schedule, next_due decides when a place is scraped again, done or not
+        return [u for u in urls if self.checkpoint.failures(u) < self.max_failures
+                and (self.schedule is not None or not self.checkpoint.is_done(u))]
+
     def __get_logger(self):
         logger = logging.getLogger('monitor_s3')
         logger.setLevel(logging.DEBUG)
@@ -111,24 +454,121 @@ class MonitorS3:
         logger.addHandler(fh)
         return logger
     
+def warm_pool():
+    # Chrome is started once per container and reused by the next invocations
+    global WARM_POOL
+    if WARM_POOL is None:
+        from pool import ScraperPool
+
+        lean = os.environ.get('MONITOR_LEAN', '').lower() in ('1', 'true', 'yes')
+        WARM_POOL = ScraperPool(workers=1, lean=lean)
+    return WARM_POOL
+
+
 def lambda_handler(event=None, context=None):
     try:
-        monitor = MonitorS3('urls.txt', 100)
-        monitor.scrape_and_monitor_reviews()
+        # fan out: one coordinator invocation enqueues (and later merges), many work
+        queue_uri = os.environ.get('MONITOR_QUEUE')
+        if queue_uri:
+            return queue_handler(queue_uri, (event or {}).get('queue_role', 'work'), context)
+
+        # Lambda disk is ephemeral: the checkpoint lives in S3 between invocations
+        checkpoint = CheckpointStore(CHECKPOINT_LOCAL, bucket=BUCKET_NAME, key=CHECKPOINT_KEY)
+        place_cache = PlaceCache(PLACE_CACHE_LOCAL, bucket=BUCKET_NAME, key=PLACE_CACHE_KEY)
+        schedule = PlaceSchedule(SCHEDULE_LOCAL, bucket=BUCKET_NAME, key=SCHEDULE_KEY)
+        review_index = ReviewIndex(REVIEW_INDEX_LOCAL, bucket=BUCKET_NAME, key=REVIEW_INDEX_KEY)
+        # stop starting places early enough to commit before the invocation times out
+        time_budget = None
+        if context is not None:
+            reserve = float(os.environ.get('MONITOR_RESERVE_SECONDS', LAMBDA_RESERVE))
+            time_budget = max(0, context.get_remaining_time_in_millis() / 1000 - reserve)
+        try:
+            monitor = MonitorS3('urls.txt', 100, incremental=True,
+                                batch_size=int(os.environ.get('MONITOR_BATCH_SIZE', 0)),
+                                store_uri=os.environ.get('REVIEW_STORE_URI'),
+                                store_endpoint=os.environ.get('REVIEW_STORE_ENDPOINT'),
+                                checkpoint=checkpoint,
+                                metrics_path=os.environ.get('MONITOR_METRICS_PATH', '-'),
+                                place_cache=place_cache,
+                                schedule=schedule,
+                                time_budget=time_budget,
+                                pool=warm_pool(),
+                                review_index=review_index)
+            monitor.scrape_and_monitor_reviews()
+        finally:
+            # a warm container runs the handler again: release the databases of this invocation
+            for db in (checkpoint, place_cache, schedule, review_index):
+                db.close()
         return {"status": "Success"}
     except Exception as e:
         logging.exception("Unhandled error in Lambda execution")
         return {"status": "Error", "message": str(e)}
 
 
+def queue_handler(queue_uri, role, context=None):
+    # workers share no local state: schedule and place cache mirrors would overwrite each other,
+    # the review index is only pushed by the merge
+    time_budget = None
+    if context is not None:
+        reserve = float(os.environ.get('MONITOR_RESERVE_SECONDS', LAMBDA_RESERVE))
+        time_budget = max(0, context.get_remaining_time_in_millis() / 1000 - reserve)
+    monitor = MonitorS3('urls.txt', 100, incremental=True,
+                        store_uri=os.environ.get('REVIEW_STORE_URI'),
+                        store_endpoint=os.environ.get('REVIEW_STORE_ENDPOINT'),
+                        metrics_path=os.environ.get('MONITOR_METRICS_PATH', '-'),
+                        time_budget=time_budget, pool=warm_pool(),
+                        review_index=ReviewIndex(REVIEW_INDEX_LOCAL, bucket=BUCKET_NAME, key=REVIEW_INDEX_KEY))
+    shard_dir = os.environ.get('MONITOR_SHARD_DIR', SHARD_DIR)
+    work_queue = open_queue(queue_uri)
+
+    if role == 'enqueue':
+        monitor.enqueue(work_queue, shards=int(os.environ.get('MONITOR_SHARDS', SHARDS)))
+    elif role == 'work':
+        monitor.work(work_queue, shard_dir)
+    else:
+        monitor.merge(shard_dir)
+
+    return {"status": "Success", "queue": work_queue.stats()}
+
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Monitor Google Maps reviews and store in S3')
     parser.add_argument('--i', type=str, default='urls.txt', help='target URLs file')
     parser.add_argument('--N', type=int, default=100, help='Max number of reviews per place')
+    parser.add_argument('--workers', type=int, default=1, help='Number of browsers scraping places in parallel')
+    parser.add_argument('--incremental', dest='incremental', action='store_true', help='Stop each place at a run of already stored reviews')
+    parser.add_argument('--known-run', dest='known_run', type=int, default=KNOWN_RUN, help='Consecutive known reviews that stop an incremental scrape')
+    parser.add_argument('--batch', dest='batch_size', type=int, default=0, help='Places per S3 commit (0: commit once at the end)')
+    parser.add_argument('--store-uri', dest='store_uri', type=str, default=None, help='Parquet review store (local dir or s3://bucket/prefix) instead of the combined CSV')
+    parser.add_argument('--store-endpoint', dest='store_endpoint', type=str, default=None, help='S3 compatible endpoint URL for the Parquet store')
+    parser.add_argument('--checkpoint', type=str, default=None, help='SQLite checkpoint file used to resume an interrupted run')
+    parser.add_argument('--lean', dest='lean', action='store_true', help='Lightweight browser profile blocking images, fonts, media and map tiles')
+    parser.add_argument('--place-cache', dest='place_cache', type=str, default=None, help='SQLite file of last review counts: places whose count did not change are skipped')
+    parser.add_argument('--schedule', type=str, default=None, help='SQLite visit history: only places due are scraped, the ones with most expected new reviews first')
+    parser.add_argument('--time-budget', dest='time_budget', type=float, default=None, help='Seconds after which remaining places are left to the next run')
+    parser.add_argument('--metrics', type=str, default=None, help='Write per-phase timings and counters to this file (.prom for Prometheus text, JSON lines otherwise)')
+    parser.add_argument('--review-index', dest='review_index', type=str, default=None, help='SQLite index of stored review IDs used for dedup instead of the baseline (built from it on first use)')
+    parser.add_argument('--queue', type=str, default=None, help='Work queue shared by several workers: SQLite file or SQS queue URL')
+    parser.add_argument('--queue-role', dest='queue_role', type=str, default='work', choices=['enqueue', 'work', 'merge'], help='enqueue the places of --i, work on the queue or merge the shard outputs (default: work)')
+    parser.add_argument('--shards', type=int, default=SHARDS, help='Shards the enqueued places are spread over')
+    parser.add_argument('--shard-dir', dest='shard_dir', type=str, default=SHARD_DIR, help='Directory or s3://bucket/prefix of the per-shard outputs')
+    parser.set_defaults(incremental=False, lean=False)
     args = parser.parse_args()
 
-    monitor = MonitorS3(args.i, args.N)
+    monitor = MonitorS3(args.i, args.N, workers=args.workers, incremental=args.incremental, known_run=args.known_run,
+                        batch_size=args.batch_size, store_uri=args.store_uri, store_endpoint=args.store_endpoint,
+                        checkpoint=CheckpointStore(args.checkpoint) if args.checkpoint else None, lean=args.lean,
+                        metrics_path=args.metrics, place_cache=PlaceCache(args.place_cache) if args.place_cache else None,
+                        schedule=PlaceSchedule(args.schedule) if args.schedule else None, time_budget=args.time_budget,
+                        review_index=ReviewIndex(args.review_index) if args.review_index else None)
     try:
-        monitor.scrape_and_monitor_reviews()
+        if args.queue is None:
+            monitor.scrape_and_monitor_reviews()
+        elif args.queue_role == 'enqueue':
+            monitor.enqueue(open_queue(args.queue), shards=args.shards)
+        elif args.queue_role == 'work':
+            monitor.work(open_queue(args.queue), args.shard_dir)
+        else:
+            monitor.merge(args.shard_dir)
     except Exception as e:
         monitor.logger.error(f'Unhandled error: {e}')
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+HTML parser backends for review blocks and place pages.
+
+A backend only locates the raw strings of each field; converting them into
+ratings, dates and counts is left to GoogleMapsScraper so that every backend
+produces exactly the same review and place dicts.
+
+Raw review fields: id_review, username, place_id, caption, rating_label,
+relative_date, n_review_text.
+Raw place fields: name, rating_label, rating_text, photos_text, category,
+description, info (list of address/website/phone/plus code texts), hours_label.
+"""
+import logging
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # optional fast path
+    lxml = None
+
+PARSERS = ('html.parser', 'lxml')
+
+# single class tokens, matched by both backends whatever the other classes of the element
+# TODO: Subject to changes
+REVIEW_BLOCK_CLASS = 'jftiEf'
+PLACE_NAME_CLASS = 'DUwDvf'
+PLACE_INFO_CLASS = 'Io6YTe'
+PLACE_HOURS_CLASS = 't39EBf'
+
+
+class SoupParser:
+    """
+    Reference backend built on BeautifulSoup and the standard html.parser.
+    """
+
+    name = 'html.parser'
+
+    def parse_reviews(self, html):
+        response = BeautifulSoup(html, 'html.parser')
+        return [self.review_fields(review) for review in response.find_all('div', class_=REVIEW_BLOCK_CLASS)]
+
+    def review_fields(self, review):
+        raw = {
+            'id_review': review.get('data-review-id'),
+            'username': review.get('aria-label'),
+            'place_id': review.get('place_id'),
+        }
+
+        span = review.find('span', class_='wiI7pd')
+        raw['caption'] = span.text if span is not None else None
+
+        span = review.find('span', class_='kvMYJc')
+        raw['rating_label'] = span.get('aria-label') if span is not None else None
+
+        span = review.find('span', class_='rsqaWe')
+        raw['relative_date'] = span.text if span is not None else None
+
+        div = review.find('div', class_='RfnDt')
+        raw['n_review_text'] = div.text if div is not None else None
+
+        return raw
+
+    def parse_place(self, html):
+        response = BeautifulSoup(html, 'html.parser')
+        raw = {}
+
+        h1 = response.find('h1', class_=PLACE_NAME_CLASS)
+        raw['name'] = h1.text if h1 is not None else None
+
+        div = response.find('div', class_='F7nice')
+        span = div.find('span', class_='ceNzKf') if div is not None else None
+        raw['rating_label'] = span.get('aria-label') if span is not None else None
+        raw['rating_text'] = div.text if div is not None else None
+
+        div = response.find('div', class_='YkuOqf')
+        raw['photos_text'] = div.text if div is not None else None
+
+        button = response.find('button', jsaction='pane.rating.category')
+        raw['category'] = button.text if button is not None else None
+
+        div = response.find('div', class_='PYvSYb')
+        raw['description'] = div.text if div is not None else None
+
+        raw['info'] = [div.text for div in response.find_all('div', class_=PLACE_INFO_CLASS)]
+
+        div = response.find('div', class_=PLACE_HOURS_CLASS)
+        raw['hours_label'] = div.get('aria-label') if div is not None else None
+
+        return raw
+
+
+def _class_xpath(tag, cls):
+    # match a class token regardless of the other classes of the element
+    return f"{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]"
+
+
+class LxmlParser:
+    """
+    Fast backend: compiled XPath selects the review blocks once, then each block
+    is walked a single time to pick up all of its fields.
+    """
+
+    name = 'lxml'
+
+    # (tag, class token) -> (raw field, attribute or None for text)
+    REVIEW_FIELDS = {
+        ('span', 'wiI7pd'): ('caption', None),
+        ('span', 'kvMYJc'): ('rating_label', 'aria-label'),
+        ('span', 'rsqaWe'): ('relative_date', None),
+        ('div', 'RfnDt'): ('n_review_text', None),
+    }
+
+    def __init__(self):
+        self._blocks = etree.XPath('//' + _class_xpath('div', REVIEW_BLOCK_CLASS))
+        self._name = etree.XPath('//' + _class_xpath('h1', PLACE_NAME_CLASS))
+        self._rating = etree.XPath('//' + _class_xpath('div', 'F7nice'))
+        self._rating_label = etree.XPath('.//' + _class_xpath('span', 'ceNzKf') + '/@aria-label')
+        self._photos = etree.XPath('//' + _class_xpath('div', 'YkuOqf'))
+        self._category = etree.XPath("//button[@jsaction='pane.rating.category']")
+        self._description = etree.XPath('//' + _class_xpath('div', 'PYvSYb'))
+        self._info = etree.XPath('//' + _class_xpath('div', PLACE_INFO_CLASS))
+        self._hours = etree.XPath('//' + _class_xpath('div', PLACE_HOURS_CLASS) + '/@aria-label')
+
+    def parse_reviews(self, html):
+        if not html.strip():
+            return []
+        tree = lxml.html.fromstring(html)
+        return [self.review_fields(block) for block in self._blocks(tree)]
+
+    def review_fields(self, block):
+        raw = {
+            'id_review': block.get('data-review-id'),
+            'username': block.get('aria-label'),
+            'place_id': block.get('place_id'),
+            'caption': None,
+            'rating_label': None,
+            'relative_date': None,
+            'n_review_text': None,
+        }
+
+        # single pass over the block, first match of each field wins
+        missing = len(self.REVIEW_FIELDS)
+        for el in block.iterdescendants('span', 'div'):
+            classes = el.get('class')
+            if not classes:
+                continue
+            for cls in classes.split():
+                field = self.REVIEW_FIELDS.get((el.tag, cls))
+                if field is None or raw[field[0]] is not None:
+                    continue
+                key, attr = field
+                raw[key] = el.text_content() if attr is None else el.get(attr)
+                missing -= 1
+            if missing == 0:
+                break
+
+        return raw
+
+    def parse_place(self, html):
+        tree = lxml.html.fromstring(html)
+
+        def first_text(xpath, root=tree):
+            found = xpath(root)
+            return found[0].text_content() if found else None
+
+        rating = self._rating(tree)
+        rating_label = self._rating_label(rating[0]) if rating else []
+        hours = self._hours(tree)
+
+        return {
+            'name': first_text(self._name),
+            'rating_label': rating_label[0] if rating_label else None,
+            'rating_text': rating[0].text_content() if rating else None,
+            'photos_text': first_text(self._photos),
+            'category': first_text(self._category),
+            'description': first_text(self._description),
+            'info': [div.text_content() for div in self._info(tree)],
+            'hours_label': hours[0] if hours else None,
+        }
+
+
+def get_parser(name='html.parser'):
+    """
+    Parameters:
+        name (str): 'html.parser' (BeautifulSoup) or 'lxml'.
+
+    Returns:
+        Parser backend, BeautifulSoup when lxml is requested but not installed.
+    """
+    if name not in PARSERS:
+        raise ValueError(f"parser must be one of {PARSERS}, got {name!r}")
+
+    if name == 'lxml':
+        if lxml is not None:
+            return LxmlParser()
+        logging.getLogger('googlemaps-scraper').warning("lxml not installed, falling back to html.parser")
+
+    return SoupParser()
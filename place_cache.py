@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import boto3
+
+# a week: name, address, phone, category and coordinates rarely change
+PLACE_TTL = 7 * 24 * 3600
+MAX_ENTRIES = 10000
+
+
+class PlaceCache:
+    """
+    SQLite cache of place metadata returned by GoogleMapsScraper.get_account.
+
+    Entries are keyed by place_id and expire after `ttl` seconds; beyond
+    `max_entries` the least recently used ones are evicted. A lookup given the
+    current number of reviews also misses when that number changed, so only
+    stale or changed places trigger a page load.
+
+    It also keeps the last review count monitored for each place, which never
+    expires. Like CheckpointStore, the database can be mirrored to S3.
+    """
+
+    def __init__(self, path, ttl=PLACE_TTL, max_entries=MAX_ENTRIES, bucket=None, key=None):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.bucket = bucket
+        self.key = key
+        self.logger = logging.getLogger('googlemaps-scraper')
+        self._lock = threading.Lock()
+
+        if self.bucket and self.key:
+            self.__pull()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS places (
+                place_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                n_reviews INTEGER,
+                fetched_at REAL NOT NULL,
+                used_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS places_used_at ON places (used_at);
+            CREATE TABLE IF NOT EXISTS review_counts (
+                place_id TEXT PRIMARY KEY,
+                n_reviews INTEGER NOT NULL,
+                checked_at REAL NOT NULL
+            );
+        """)
+        self.conn.commit()
+        self.evict()
+
+    def get(self, place_id, n_reviews=None):
+        """
+        Parameters:
+            place_id (str): Place ID (or URL) the entry was stored under.
+            n_reviews (int): Current number of reviews of the place, if known.
+
+        Returns:
+            dict: Cached place metadata, None when missing, expired or when
+            n_reviews differs from the cached one.
+        """
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute("SELECT data, n_reviews, fetched_at FROM places WHERE place_id = ?",
+                                    (place_id,)).fetchone()
+            if row is None:
+                return None
+
+            data, cached_reviews, fetched_at = row
+            if now - fetched_at > self.ttl:
+                return None
+            if n_reviews is not None and cached_reviews != n_reviews:
+                self.logger.info(f"{place_id}: {cached_reviews} -> {n_reviews} reviews, refreshing metadata")
+                return None
+
+            self.conn.execute("UPDATE places SET used_at = ? WHERE place_id = ?", (now, place_id))
+            self.conn.commit()
+
+        return json.loads(data)
+
+    def put(self, place_id, place):
+        now = time.time()
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO places (place_id, data, n_reviews, fetched_at, used_at) "
+                              "VALUES (?, ?, ?, ?, ?)",
+                              (place_id, json.dumps(place, default=str), place.get('n_reviews'), now, now))
+            self.conn.commit()
+
+        if self.max_entries and len(self) > self.max_entries:
+            self.evict()
+
+    def last_review_count(self, place_id):
+        """
+        Returns:
+            int: Review count recorded by the last monitoring of the place, None if never recorded.
+        """
+        row = self.conn.execute("SELECT n_reviews FROM review_counts WHERE place_id = ?", (place_id,)).fetchone()
+        return row[0] if row else None
+
+    def record_review_count(self, place_id, n_reviews):
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO review_counts (place_id, n_reviews, checked_at) VALUES (?, ?, ?)",
+                              (place_id, n_reviews, time.time()))
+            self.conn.commit()
+
+    def evict(self):
+        """
+        Drop expired entries and the least recently used ones beyond max_entries.
+        """
+        with self._lock:
+            self.conn.execute("DELETE FROM places WHERE fetched_at < ?", (time.time() - self.ttl,))
+            if self.max_entries:
+                self.conn.execute("""
+                    DELETE FROM places WHERE place_id NOT IN (
+                        SELECT place_id FROM places ORDER BY used_at DESC LIMIT ?
+                    )
+                """, (self.max_entries,))
+            self.conn.commit()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM places").fetchone()[0]
+
+    def push(self):
+        if not (self.bucket and self.key):
+            return
+        try:
+            with self._lock:
+                boto3.client('s3').upload_file(self.path, self.bucket, self.key)
+        except Exception as e:
+            self.logger.warning(f"Failed to mirror place cache to s3://{self.bucket}/{self.key}: {e}")
+
+    def close(self):
+        self.conn.close()
+
+    def __pull(self):
+        if os.path.exists(self.path):
+            return
+        try:
+            boto3.client('s3').download_file(self.bucket, self.key, self.path)
+        except Exception as e:
+            self.logger.info(f"No place cache at s3://{self.bucket}/{self.key}: {e}")
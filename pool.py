@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.common.exceptions import WebDriverException
+
+from googlemaps import GoogleMapsScraper
+
+MAX_RECYCLE = 2
+
+
+class ScraperPool:
+    """
+    Pool of warm GoogleMapsScraper instances shared by worker threads.
+
+    Each worker borrows a scraper (and its Chrome driver) for one place at a time,
+    so the browser start-up cost is paid once per worker instead of once per place.
+    A scraper whose driver crashes is discarded and replaced by a fresh one.
+    """
+
+    def __init__(self, workers=1, max_recycle=MAX_RECYCLE, **scraper_kwargs):
+        self.workers = max(1, workers)
+        self.max_recycle = max_recycle
+        self.scraper_kwargs = scraper_kwargs
+        self.logger = logging.getLogger('googlemaps-scraper')
+
+        self._idle = queue.Queue()
+        self._scrapers = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            scrapers, self._scrapers = self._scrapers, []
+
+        for scraper in scrapers:
+            try:
+                scraper.close()
+            except Exception as e:
+                self.logger.warning(f"Failed to close driver: {e}")
+
+    def use_metrics(self, metrics):
+        """
+        Record into metrics from now on, e.g. when a warm pool is reused by a new run.
+        """
+        self.scraper_kwargs['metrics'] = metrics
+        with self._lock:
+            for scraper in self._scrapers:
+                scraper.metrics = metrics
+
+    def run(self, fn, url):
+        """
+        Call fn(scraper, url) on a pooled scraper, recycling the driver on crashes.
+
+        Parameters:
+            fn (callable): Work to do for a single place.
+            url (str): Place URL handed to fn.
+
+        Returns:
+            Whatever fn returns.
+        """
+        attempt = 0
+        while True:
+            scraper = self.__acquire()
+            crashed = False
+            try:
+                return fn(scraper, url)
+            except WebDriverException as e:
+                crashed = True
+                scraper.metrics.incr('driver_recycles')
+                attempt += 1
+                if attempt > self.max_recycle:
+                    raise
+                self.logger.warning(f"Driver crashed on {url}, recycling ({attempt}/{self.max_recycle}): {e}")
+            finally:
+                # a crashed driver is replaced, any other error leaves it usable for the next place
+                if crashed:
+                    self.__discard(scraper)
+                else:
+                    self._idle.put(scraper)
+
+    def map(self, fn, urls):
+        """
+        Run fn(scraper, url) for every url on up to `workers` browsers in parallel.
+
+        Parameters:
+            fn (callable): Work to do for a single place.
+            urls (list[str]): Place URLs.
+
+        Returns:
+            list: Results in the same order as urls, None for places that failed.
+        """
+        return list(self.imap(fn, urls))
+
+    def imap(self, fn, urls):
+        """
+        Like map, but yield each result (in urls order) as soon as it is ready.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self.run, fn, url) for url in urls]
+
+            for url, future in zip(urls, futures):
+                try:
+                    yield future.result()
+                except Exception as e:
+                    self.logger.error(f"{url}: {type(e).__name__}: {e}")
+                    yield None
+
+    def __acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        # lazily start browsers, at most one per worker thread
+        scraper = GoogleMapsScraper(**self.scraper_kwargs)
+        with self._lock:
+            self._scrapers.append(scraper)
+
+        return scraper
+
+    def __discard(self, scraper):
+        with self._lock:
+            if scraper in self._scrapers:
+                self._scrapers.remove(scraper)
+
+        try:
+            scraper.close()
+        except Exception:
+            pass  # driver is already dead
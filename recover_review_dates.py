@@ -2,27 +2,48 @@
 import pandas as pd
 import boto3
 import io
+import os
 from datetime import datetime
+from dates import review_dates
 from googlemaps import GoogleMapsScraper
+from review_index import ReviewIndex
+from store import ParquetReviewStore
 
 # === CONFIG ===
 BUCKET_NAME = 'naturals-reviews'
 SOURCE_KEY = 'combined/all_4_naturals_salons.csv'
 MISSING_FILE_LOCAL = 'reviews_missing_dates.csv'
 RECOVERED_FILE_LOCAL = 'recovered_review_dates.csv'
+UNRESOLVED_FILE_LOCAL = 'unresolved_review_dates.csv'
 S3_OUTPUT_KEY = f'monitoring/{RECOVERED_FILE_LOCAL}'
-
-# === STEP 1: Load full review CSV from S3 ===
+# read the partitioned Parquet store instead of SOURCE_KEY when set
+STORE_URI = os.environ.get('REVIEW_STORE_URI')
+STORE_ENDPOINT = os.environ.get('REVIEW_STORE_ENDPOINT')
+STORE_COLUMNS = ['id_review', 'place_id', 'relative_date', 'review_date', 'retrieval_date']
+# review ID index shared with monitor.py, synced with the full dataset loaded here
+REVIEW_INDEX_LOCAL = os.environ.get('REVIEW_INDEX_PATH', 'review_index.sqlite')
+REVIEW_INDEX_KEY = 'monitoring/review_index.sqlite'
+
+# === STEP 1: Load reviews from S3 ===
 s3 = boto3.client('s3')
 
 try:
-    response = s3.get_object(Bucket=BUCKET_NAME, Key=SOURCE_KEY)
-    df = pd.read_csv(io.StringIO(response['Body'].read().decode('utf-8')))
+    if STORE_URI:
+        # only the columns needed to find and resolve missing dates
+        df = ParquetReviewStore(STORE_URI, endpoint_url=STORE_ENDPOINT).read(columns=STORE_COLUMNS)
+    else:
+        response = s3.get_object(Bucket=BUCKET_NAME, Key=SOURCE_KEY)
+        df = pd.read_csv(io.StringIO(response['Body'].read().decode('utf-8')))
     print(f"✅ Loaded {len(df)} total reviews from S3.")
 except Exception as e:
     print(f"❌ Failed to read from S3: {e}")
     exit()
 
+review_index = ReviewIndex(REVIEW_INDEX_LOCAL, bucket=BUCKET_NAME, key=REVIEW_INDEX_KEY)
+n_indexed = review_index.add_frame(df)
+review_index.push()
+print(f"🗂️ Review index synced: {n_indexed} reviews added, {len(review_index)} indexed.")
+
 # === STEP 2: Filter reviews missing review_date ===
 missing_df = df[df['review_date'].isna()]
 print(f"🔍 Found {len(missing_df)} reviews missing `review_date`.")
@@ -37,63 +58,75 @@ try:
 except Exception as e:
     print(f"⚠️ Upload of missing list failed: {e}")
 
-# === STEP 3: Scrape to recover missing review dates ===
-recovered_reviews = []
+# === STEP 3: Resolve offline the dates whose relative_date was stored ===
+# one vectorized pass, only the rest needs the browser
+offline_dates = review_dates(missing_df['relative_date'], missing_df['retrieval_date'])
+resolved = offline_dates.notna()
+recovered_reviews = [{
+    'id_review': row['id_review'],
+    'review_date': offline_dates[index].strftime('%Y-%m-%d'),
+    'relative_date': row['relative_date'],
+    'retrieval_date': row['retrieval_date']
+} for index, row in missing_df[resolved].iterrows()]
+print(f"🗓️ Resolved {len(recovered_reviews)} review dates from stored relative dates.")
+missing_df = missing_df[~resolved]
+
+# === STEP 4: Scrape to recover missing review dates ===
+# one newest-first pass per place resolves all of its missing IDs
+unresolved_reviews = []
 
 with GoogleMapsScraper(debug=False) as scraper:
-    for _, row in missing_df.iterrows():
-        review_id = row['id_review']
-        place_id = row['place_id']
+    for place_id, place_missing in missing_df.groupby('place_id'):
+        missing_ids = set(place_missing['id_review'])
         url = f"https://www.google.com/maps/place/?q=place_id:{place_id}"
 
         err = scraper.sort_by(url, 1)
         if err != 0:
             print(f"⚠️ Failed to sort reviews for {place_id}")
+            unresolved_reviews += [{'id_review': review_id, 'place_id': place_id} for review_id in missing_ids]
             continue
 
-        offset = 0
-        found = False
-
-        while not found:
-            reviews = scraper.get_reviews(offset, url)
-            if not reviews:
-                break
-
-            for r in reviews:
-                # DEBUG: Print to see what's in each review object
-                print(f"🔎 Review ID: {r.get('id_review')}, Available Keys: {r.keys()}")
-
-                if r.get('id_review') == review_id:
-                    # Attempt to extract date information
-                    relative_date = r.get('relative_date') or r.get('relative_time_description') or ''
-                    review_date = r.get('review_date') or r.get('time') or ''
-
-                    # Optional: Convert UNIX timestamp to date
-                    if isinstance(review_date, (int, float)):
-                        try:
-                            review_date = datetime.utcfromtimestamp(review_date).strftime('%Y-%m-%d')
-                        except:
-                            review_date = ''
-
-                    recovered_reviews.append({
-                        'id_review': review_id,
-                        'review_date': review_date,
-                        'relative_date': relative_date,
-                        'retrieval_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    })
-                    found = True
-                    break
-
-            offset += len(reviews)
-
-        if not found:
-            print(f"❌ Review {review_id} not found for place_id {place_id}")
-
-# === STEP 4: Save recovered data ===
+        # id_review -> scraped review
+        lookup = {}
+        for r in scraper.iter_reviews(url):
+            review_id = r.get('id_review')
+            if review_id in missing_ids and review_id not in lookup:
+                lookup[review_id] = r
+                if len(lookup) == len(missing_ids):
+                    break  # every missing review of this place is resolved
+
+        for review_id, r in lookup.items():
+            # Attempt to extract date information
+            relative_date = r.get('relative_date') or r.get('relative_time_description') or ''
+            review_date = r.get('review_date') or r.get('time') or ''
+
+            # Optional: Convert UNIX timestamp to date
+            if isinstance(review_date, (int, float)):
+                try:
+                    review_date = datetime.utcfromtimestamp(review_date).strftime('%Y-%m-%d')
+                except:
+                    review_date = ''
+
+            recovered_reviews.append({
+                'id_review': review_id,
+                'review_date': review_date,
+                'relative_date': relative_date,
+                'retrieval_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            })
+
+        not_found = missing_ids - lookup.keys()
+        print(f"🔎 {place_id}: resolved {len(lookup)}/{len(missing_ids)} missing reviews")
+        unresolved_reviews += [{'id_review': review_id, 'place_id': place_id} for review_id in not_found]
+
+# === STEP 5: Save recovered data ===
 recovered_df = pd.DataFrame(recovered_reviews)
 recovered_df.to_csv(RECOVERED_FILE_LOCAL, index=False)
 print(f"✅ Recovered {len(recovered_df)} reviews. Saved to: {RECOVERED_FILE_LOCAL}")
 
+unresolved_df = pd.DataFrame(unresolved_reviews, columns=['id_review', 'place_id'])
+unresolved_df.to_csv(UNRESOLVED_FILE_LOCAL, index=False)
+print(f"❌ {len(unresolved_df)} reviews not found. Saved to: {UNRESOLVED_FILE_LOCAL}")
+
 try:
     with open(RECOVERED_FILE_LOCAL, 'rb') as f:
         s3.upload_fileobj(f, BUCKET_NAME, S3_OUTPUT_KEY)
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import logging
+import sqlite3
+import threading
+
+import boto3
+
+# host parameters per IN (...) query, below SQLite's limit
+CHUNK = 500
+
+
+def review_key(id_review):
+    """
+    Signed 64 bit blake2b hash of a review ID, the compact form stored by ReviewIndex.
+    """
+    digest = hashlib.blake2b(str(id_review).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+class ReviewIndex:
+    """
+    Persistent index of the review IDs already stored, per place_id.
+
+    IDs are kept as 8 byte hashes in a WITHOUT ROWID table, so membership of a
+    batch of freshly parsed reviews is checked with a few indexed queries instead
+    of downloading the stored reviews. Shared by scraper.py, monitor.py and
+    recover_review_dates.py. Like CheckpointStore, the database can be mirrored to S3.
+    """
+
+    def __init__(self, path, bucket=None, key=None):
+        self.path = path
+        self.bucket = bucket
+        self.key = key
+        self.logger = logging.getLogger('googlemaps-scraper')
+        self._lock = threading.Lock()
+
+        if self.bucket and self.key:
+            self.__pull()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS reviews (
+                place_id TEXT NOT NULL,
+                review_key INTEGER NOT NULL,
+                PRIMARY KEY (place_id, review_key)
+            ) WITHOUT ROWID;
+        """)
+        self.conn.commit()
+
+    def known(self, place_id, review_ids):
+        """
+        Parameters:
+            place_id (str): Place the reviews belong to.
+            review_ids (iterable): Review IDs to check.
+
+        Returns:
+            set: The review_ids already indexed for the place.
+        """
+        keys = {review_key(review_id): review_id for review_id in review_ids}
+        found = set()
+        items = list(keys)
+        with self._lock:
+            for i in range(0, len(items), CHUNK):
+                chunk = items[i:i + CHUNK]
+                found.update(row[0] for row in self.conn.execute(
+                    f"SELECT review_key FROM reviews WHERE place_id = ? AND review_key IN ({','.join('?' * len(chunk))})",
+                    [self.__place(place_id)] + chunk))
+        return {keys[key] for key in found}
+
+    def new_reviews(self, reviews, place_id=None):
+        """
+        Parameters:
+            reviews (list[dict]): Parsed reviews.
+            place_id (str): Place of all the reviews, their own place_id field by default.
+
+        Returns:
+            list[dict]: Reviews not indexed yet, in their order, each ID once.
+        """
+        by_place = {}
+        for r in reviews:
+            by_place.setdefault(place_id or r.get('place_id'), []).append(r['id_review'])
+        known = {(place, review_id) for place, ids in by_place.items() for review_id in self.known(place, ids)}
+
+        out = []
+        seen = set()
+        for r in reviews:
+            entry = (place_id or r.get('place_id'), r['id_review'])
+            if entry not in known and entry not in seen:
+                seen.add(entry)
+                out.append(r)
+        return out
+
+    def keys(self, place_id):
+        """
+        Returns:
+            set[int]: review_key of every review indexed for the place, e.g. for
+            per-review checks while streaming.
+        """
+        with self._lock:
+            return {row[0] for row in self.conn.execute("SELECT review_key FROM reviews WHERE place_id = ?",
+                                                        (self.__place(place_id),))}
+
+    def add(self, reviews, place_id=None):
+        """
+        Index reviews once they are stored.
+        """
+        rows = [(self.__place(place_id or r.get('place_id')), review_key(r['id_review']))
+                for r in reviews if r.get('id_review')]
+        self.__insert(rows)
+
+    def add_frame(self, df):
+        """
+        Index the id_review and place_id columns of stored reviews, e.g. to build the index from a baseline.
+
+        Returns:
+            int: Reviews not indexed before.
+        """
+        if df.empty or 'place_id' not in df.columns:
+            return 0
+        df = df.dropna(subset=['id_review'])
+        n_before = len(self)
+        self.__insert(zip(map(self.__place, df['place_id']), map(review_key, df['id_review'])))
+        return len(self) - n_before
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM reviews").fetchone()[0]
+
+    def push(self):
+        if not (self.bucket and self.key):
+            return
+        try:
+            with self._lock:
+                boto3.client('s3').upload_file(self.path, self.bucket, self.key)
+        except Exception as e:
+            self.logger.warning(f"Failed to mirror review index to s3://{self.bucket}/{self.key}: {e}")
+
+    def close(self):
+        self.conn.close()
+
+    def __place(self, place_id):
+        # reviews without place (None or NaN once in a DataFrame) share one key
+        return '' if place_id is None or place_id != place_id else str(place_id)
+
+    def __insert(self, rows):
+        with self._lock:
+            self.conn.executemany("INSERT OR IGNORE INTO reviews (place_id, review_key) VALUES (?, ?)", rows)
+            self.conn.commit()
+
+    def __pull(self):
+        # other runs push their own copy: a local file left by a previous run may be stale
+        try:
+            boto3.client('s3').download_file(self.bucket, self.key, self.path)
+        except Exception as e:
+            self.logger.info(f"No review index at s3://{self.bucket}/{self.key}, keeping the local one: {e}")
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+
+import boto3
+
+DAY = 24 * 3600
+# bounds of the revisit interval of a place, whatever its review velocity
+MIN_INTERVAL = 3600
+MAX_INTERVAL = 7 * DAY
+# visits kept per place to estimate its review velocity
+HISTORY = 10
+
+
+class PlaceSchedule:
+    """
+    SQLite history of monitoring visits, used to revisit busy places more often than quiet ones.
+
+    Every visit records the number of new reviews found. The review velocity of
+    a place (new reviews per day over its last HISTORY visits) sets when it is
+    due again: after the time expected to bring one new review, bounded by
+    min_interval and max_interval. Due places are planned by decreasing number
+    of expected new reviews, places never visited (or visited once) first.
+    Like CheckpointStore, the database can be mirrored to S3.
+    """
+
+    def __init__(self, path, bucket=None, key=None, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL):
+        self.path = path
+        self.bucket = bucket
+        self.key = key
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.logger = logging.getLogger('googlemaps-scraper')
+        self._lock = threading.Lock()
+
+        if self.bucket and self.key:
+            self.__pull()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS visits (
+                url TEXT NOT NULL,
+                visited_at REAL NOT NULL,
+                new_reviews INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS visits_url ON visits (url, visited_at);
+        """)
+        self.conn.commit()
+
+    def record(self, url, new_reviews, visited_at=None):
+        with self._lock:
+            self.conn.execute("INSERT INTO visits (url, visited_at, new_reviews) VALUES (?, ?, ?)",
+                              (url, visited_at or time.time(), new_reviews))
+            self.conn.execute("""
+                DELETE FROM visits WHERE url = ? AND rowid NOT IN (
+                    SELECT rowid FROM visits WHERE url = ? ORDER BY visited_at DESC LIMIT ?
+                )
+            """, (url, url, HISTORY))
+            self.conn.commit()
+
+    def velocity(self, url):
+        """
+        Returns:
+            float: New reviews per day, None with less than two visits.
+        """
+        return self.__velocity(self.__history(url))
+
+    def next_due(self, url):
+        """
+        Returns:
+            float: Timestamp from which the place is due, None if it was never visited.
+        """
+        return self.__next_due(self.__history(url))
+
+    def plan(self, urls, now=None):
+        """
+        Parameters:
+            urls (list[str]): Place URLs to monitor.
+            now (float): Planning timestamp, defaults to the current time.
+
+        Returns:
+            list[str]: Due URLs, the ones most likely to have new reviews first.
+        """
+        now = now or time.time()
+        histories = {}
+        for url, visited_at, new_reviews in self.conn.execute(
+                "SELECT url, visited_at, new_reviews FROM visits ORDER BY url, visited_at"):
+            histories.setdefault(url, []).append((visited_at, new_reviews))
+
+        priorities = {}
+        for url in urls:
+            history = histories.get(url, [])
+            next_due = self.__next_due(history)
+            if next_due is not None and next_due > now:
+                continue
+
+            velocity = self.__velocity(history)
+            if velocity is None:
+                priorities[url] = math.inf
+            else:
+                priorities[url] = velocity * (now - history[-1][0]) / DAY
+
+        # sorted is stable: equal priorities keep the urls order
+        return sorted(priorities, key=priorities.get, reverse=True)
+
+    def push(self):
+        if not (self.bucket and self.key):
+            return
+        try:
+            with self._lock:
+                boto3.client('s3').upload_file(self.path, self.bucket, self.key)
+        except Exception as e:
+            self.logger.warning(f"Failed to mirror schedule to s3://{self.bucket}/{self.key}: {e}")
+
+    def close(self):
+        self.conn.close()
+
+    def __history(self, url):
+        return self.conn.execute("SELECT visited_at, new_reviews FROM visits WHERE url = ? ORDER BY visited_at",
+                                 (url,)).fetchall()
+
+    def __velocity(self, history):
+        # reviews found by the first visit of the window predate it
+        if len(history) < 2:
+            return None
+        days = (history[-1][0] - history[0][0]) / DAY
+        if days <= 0:
+            return None
+        return sum(new_reviews for _, new_reviews in history[1:]) / days
+
+    def __next_due(self, history):
+        if not history:
+            return None
+
+        velocity = self.__velocity(history)
+        if velocity is None:
+            interval = self.min_interval
+        elif velocity == 0:
+            interval = self.max_interval
+        else:
+            interval = min(max(DAY / velocity, self.min_interval), self.max_interval)
+
+        return history[-1][0] + interval
+
+    def __pull(self):
+        if os.path.exists(self.path):
+            return
+        try:
+            boto3.client('s3').download_file(self.bucket, self.key, self.path)
+        except Exception as e:
+            self.logger.info(f"No schedule at s3://{self.bucket}/{self.key}: {e}")
@@ -1,34 +1,146 @@
 # -*- coding: utf-8 -*-
-from googlemaps import GoogleMapsScraper
+from checkpoint import CheckpointStore
+from googlemaps import EXTRACTION_MODES
+from metrics import ScraperMetrics
+from place_cache import PLACE_TTL, PlaceCache
+from parsers import PARSERS
+from pool import ScraperPool
+from review_index import ReviewIndex
+from sink import S3CsvSink
+from work_queue import SHARDS, ShardWriter, drain, list_shards, merge_shards, open_queue, remove_shards
 from datetime import datetime
 import argparse
-import boto3
-import csv
-import io
+import threading
+import time
 from termcolor import colored
 
 ind = {'most_relevant': 0, 'newest': 1, 'highest_rating': 2, 'lowest_rating': 3}
 BUCKET_NAME = 'naturals-reviews'
+# reviews handed to the sink (and checkpoint) at a time while scraping a place
+CHECKPOINT_EVERY = 50
 
 HEADER = ['id_review', 'caption', 'relative_date', 'review_date', 'retrieval_date', 'rating', 'username', 'n_review_user', 'place_id']
 HEADER_W_SOURCE = ['id_review', 'caption', 'relative_date','retrieval_date', 'rating', 'username', 'n_review_user', 'n_photo_user', 'url_user', 'url_source']
 
-def upload_csv_to_s3(reviews, headers, s3_key):
-    csv_buffer = io.StringIO()
-    writer = csv.writer(csv_buffer)
-    writer.writerow(headers)
-    for r in reviews:
-        writer.writerow([r.get(k, "") for k in headers])
-    s3 = boto3.client('s3')
-    s3.put_object(Bucket=BUCKET_NAME, Key=s3_key, Body=csv_buffer.getvalue())
-    print(colored(f"✅ Uploaded CSV to s3://{BUCKET_NAME}/{s3_key}", "green"))
-
 def get_slug_from_url(url):
     try:
         return url.strip().split('/')[4]
     except IndexError:
         return "place-" + datetime.today().strftime('%Y%m%d%H%M%S')
 
+def scrape_place(scraper, url, args, save, checkpoint=None):
+    """
+    Scrape one place, handing reviews to save(url, reviews, offset) in batches.
+
+    Returns:
+        bool: True when the place was scraped to the end.
+    """
+    start = time.perf_counter()
+
+    if args.place:
+        # the header count tells if the cached metadata is stale, on the page get_account parses on a miss
+        n_reviews = scraper.get_review_count(url) if args.place_check_count and scraper.place_cache is not None else None
+        print(scraper.get_account(url, n_reviews=n_reviews, reload=n_reviews is None))
+        scraper.metrics.place(url, time.perf_counter() - start)
+        return True
+
+    source_url = url
+    if "place_id:" in url:
+        place_id = url.split("place_id:")[-1]
+        url = f"https://www.google.com/maps/place/?q=place_id:{place_id}"
+
+    error = scraper.sort_by(url, ind[args.sort_by])
+
+    if error != 0:
+        print(colored(f'⚠️  Failed to sort reviews for {url}', 'red'))
+        scraper.metrics.place(source_url, time.perf_counter() - start, ok=False)
+        return False
+
+    # resume a place interrupted by a previous run
+    seen_ids = checkpoint.seen_ids(source_url) if checkpoint is not None else set()
+    offset = checkpoint.offset(source_url) if checkpoint is not None else 0
+    # xhr responses always start from the top of the pane: the offset cannot be skipped there
+    if scraper.extraction == 'xhr':
+        offset = 0
+    limit = max(0, args.N - len(seen_ids))
+
+    batch = []
+    n_scraped = 0
+
+    print(colored(f'[Streaming up to {limit} reviews from offset {offset}]', 'cyan'))
+    # only new reviews count toward the limit, the ones seen before the interruption may come again
+    reviews = scraper.iter_reviews(url, skip=offset, max_scrolls=args.max_scrolls) if limit else ()
+    for r in reviews:
+        offset += 1
+        if r['id_review'] in seen_ids:
+            continue
+
+        r['retrieval_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        if args.source:
+            r['source_url'] = url
+        batch.append(r)
+        n_scraped += 1
+
+        if len(batch) >= CHECKPOINT_EVERY:
+            save(source_url, batch, offset)
+            batch = []
+        if n_scraped >= limit:
+            break
+
+    save(source_url, batch, offset)
+    scraper.metrics.place(source_url, time.perf_counter() - start, reviews=n_scraped)
+
+    return True
+
+def run_queue(args, urls, headers, metrics, place_cache, review_index=None):
+    """
+    Work queue mode: enqueue the places, scrape them as one of many workers into
+    per-shard outputs, or merge the shard outputs into the S3 file.
+    """
+    work_queue = open_queue(args.queue)
+
+    if args.queue_role == 'enqueue':
+        work_queue.put(urls, shards=args.shards)
+        print(colored(f'Enqueued {len(urls)} places over {args.shards} shards to {args.queue}', 'cyan'))
+
+    elif args.queue_role == 'work':
+        with ShardWriter(args.shard_dir, headers) as writer, \
+                ScraperPool(workers=args.workers, debug=args.debug, extraction=args.extraction, parser=args.parser,
+                            lean=args.lean, metrics=metrics, place_cache=place_cache) as pool:
+
+            def scrape_task(scraper, task):
+                def save(url, reviews, offset):
+                    # reviews are indexed by the merge, once stored
+                    if review_index is not None:
+                        reviews = review_index.new_reviews(reviews)
+                    writer.write(task.shard, reviews)
+
+                return scrape_place(scraper, task.url, args, save)
+
+            # reviews are uploaded before their task completes
+            counts = drain(work_queue, pool, scrape_task, lambda task, result: writer.flush(), threads=args.workers)
+        print(colored(f'Worker done: {counts}', 'cyan'))
+
+        if args.metrics:
+            metrics.export(args.metrics)
+
+    else:
+        shards = list_shards(args.shard_dir)
+        reviews = merge_shards(args.shard_dir, shards).to_dict('records')
+        spool_path = args.spool or f"{args.o}.spool"
+        # with an index, the S3 file keeps the reviews of previous merges it was built from
+        with S3CsvSink(BUCKET_NAME, f"combined/{args.o}", headers, spool_path, append=review_index is not None) as sink:
+            if review_index is not None:
+                reviews = review_index.new_reviews(reviews)
+            sink.write(reviews)
+            stored = sink.rows(['id_review', 'place_id']) if review_index is not None else []
+        if review_index is not None:
+            review_index.add(stored)
+        remove_shards(args.shard_dir, shards)
+
+    print(colored(f'Queue: {work_queue.stats()}', 'cyan'))
+    work_queue.close()
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Google Maps reviews scraper.')
     parser.add_argument('--N', type=int, default=100, help='Number of reviews to scrape')
@@ -38,54 +150,85 @@ if __name__ == '__main__':
     parser.add_argument('--place', dest='place', action='store_true', help='Scrape place metadata')
     parser.add_argument('--debug', dest='debug', action='store_true', help='Run scraper using browser graphical interface')
     parser.add_argument('--source', dest='source', action='store_true', help='Add source url to review data')
-    parser.set_defaults(place=False, debug=False, source=False)
+    parser.add_argument('--extraction', type=str, default='dom', choices=EXTRACTION_MODES, help='dom (parse review pane), js (extract in page) or xhr (review network responses)')
+    parser.add_argument('--parser', type=str, default='html.parser', choices=PARSERS, help='HTML parser backend: html.parser or lxml')
+    parser.add_argument('--spool', type=str, default=None, help='local spool file for the CSV being uploaded (default: <o>.spool)')
+    parser.add_argument('--lean', dest='lean', action='store_true', help='Lightweight browser profile blocking images, fonts, media and map tiles')
+    parser.add_argument('--workers', type=int, default=1, help='Number of browsers scraping places in parallel')
+    parser.add_argument('--checkpoint', type=str, default=None, help='SQLite checkpoint file used to resume an interrupted run')
+    parser.add_argument('--max-scrolls', dest='max_scrolls', type=int, default=None, help='Scroll budget per place (default: scroll until --N reviews are loaded or the list ends)')
+    parser.add_argument('--place-cache', dest='place_cache', type=str, default=None, help='SQLite cache of place metadata reused by --place while fresh')
+    parser.add_argument('--place-check-count', dest='place_check_count', action='store_true', help='Load each place to read its review count and refresh cached metadata whose count changed')
+    parser.add_argument('--place-ttl', dest='place_ttl', type=float, default=PLACE_TTL / 3600, help='Hours a cached place stays fresh (default: 168)')
+    parser.add_argument('--metrics', type=str, default=None, help='Write per-phase timings and counters to this file (.prom for Prometheus text, JSON lines otherwise)')
+    parser.add_argument('--review-index', dest='review_index', type=str, default=None, help='SQLite index of review IDs already stored: known reviews are not written again and the S3 file is appended to instead of replaced')
+    parser.add_argument('--queue', type=str, default=None, help='Work queue shared by several workers: SQLite file or SQS queue URL')
+    parser.add_argument('--queue-role', dest='queue_role', type=str, default='work', choices=['enqueue', 'work', 'merge'], help='enqueue the places of --i, work on the queue or merge the shard outputs to S3 (default: work)')
+    parser.add_argument('--shards', type=int, default=SHARDS, help='Shards the enqueued places are spread over')
+    parser.add_argument('--shard-dir', dest='shard_dir', type=str, default='shards', help='Directory or s3://bucket/prefix of the per-shard outputs')
+    parser.set_defaults(place=False, debug=False, source=False, lean=False, place_check_count=False)
 
     args = parser.parse_args()
 
-    all_reviews = []
-
-    with GoogleMapsScraper(debug=args.debug) as scraper:
-        with open(args.i, 'r') as urls_file:
-            for url in urls_file:
-                url = url.strip()
-                slug = get_slug_from_url(url)
-
-                if args.place:
-                    print(scraper.get_account(url))
-                    continue
-
-                if "place_id:" in url:
-                    place_id = url.split("place_id:")[-1]
-                    url = f"https://www.google.com/maps/place/?q=place_id:{place_id}"
-
-                error = scraper.sort_by(url, ind[args.sort_by])
-
-                if error != 0:
-                    print(colored(f'⚠️  Failed to sort reviews for {url}', 'red'))
-                    continue
-
-                offset = 0
-                local_reviews = []
-
-                while len(local_reviews) < args.N:
-                    print(colored(f'[Fetching from offset {offset}]', 'cyan'))
-                    reviews = scraper.get_reviews(offset, url)
-                    if not reviews:
-                        break
-
-                    for r in reviews:
-                        if len(local_reviews) >= args.N:
-                            break
-                        r['retrieval_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                        if args.source:
-                            r['source_url'] = url
-                        local_reviews.append(r)
-
-                    offset += len(reviews)
-
-                all_reviews.extend(local_reviews)  # append to global list
+    with open(args.i, 'r') as urls_file:
+        urls = [u.strip() for u in urls_file if u.strip()]
 
-    # 🔁 One S3 file with all reviews
-    s3_key = f"combined/{args.o}"
     headers = HEADER_W_SOURCE if args.source else HEADER
-    upload_csv_to_s3(all_reviews, headers, s3_key)
\ No newline at end of file
+    metrics = ScraperMetrics()
+    place_cache = PlaceCache(args.place_cache, ttl=args.place_ttl * 3600) if args.place_cache else None
+    review_index = ReviewIndex(args.review_index) if args.review_index else None
+
+    if args.queue:
+        run_queue(args, urls, headers, metrics, place_cache, review_index)
+    else:
+        checkpoint = CheckpointStore(args.checkpoint) if args.checkpoint else None
+        if checkpoint is not None:
+            done = [u for u in urls if checkpoint.is_done(u)]
+            urls = [u for u in urls if not checkpoint.is_done(u)]
+            print(colored(f'Resuming from {args.checkpoint}: {len(done)} places done, {len(urls)} left', 'cyan'))
+
+        # 🔁 One S3 file with all reviews, streamed place by place
+        s3_key = f"combined/{args.o}"
+        spool_path = args.spool or f"{args.o}.spool"
+        write_lock = threading.Lock()
+
+        # with an index, the S3 file keeps the reviews of the previous runs it was built from
+        with S3CsvSink(BUCKET_NAME, s3_key, headers, spool_path, resume=checkpoint is not None,
+                       append=review_index is not None) as sink:
+            spooled = set()  # (place_id, id_review) written by this run, indexed once uploaded
+
+            def save(url, reviews, offset):
+                with write_lock:
+                    if review_index is not None:
+                        reviews = [r for r in review_index.new_reviews(reviews)
+                                   if (r.get('place_id'), r['id_review']) not in spooled]
+                        spooled.update((r.get('place_id'), r['id_review']) for r in reviews)
+                    sink.write(reviews)
+                    sink.flush()
+                    if checkpoint is not None:
+                        checkpoint.record(url, reviews, offset)
+
+            failed = []
+            with ScraperPool(workers=args.workers, debug=args.debug, extraction=args.extraction, parser=args.parser,
+                             lean=args.lean, metrics=metrics, place_cache=place_cache) as pool:
+                results = pool.imap(lambda scraper, url: scrape_place(scraper, url, args, save, checkpoint), urls)
+                for url, completed in zip(urls, results):
+                    if not completed:
+                        failed.append(url)
+                    elif checkpoint is not None:
+                        checkpoint.mark_done(url)
+
+            if args.metrics:
+                metrics.export(args.metrics)
+
+            # keep spool and checkpoint so that a rerun only retries the failed places
+            if failed and checkpoint is not None:
+                raise RuntimeError(f"{len(failed)} places failed, rerun to resume from {args.checkpoint}")
+
+            # the whole spool, including the rows of a resumed run, is indexed after the upload
+            stored = sink.rows(['id_review', 'place_id']) if review_index is not None else []
+
+        if review_index is not None:
+            review_index.add(stored)
+        if checkpoint is not None:
+            checkpoint.reset()
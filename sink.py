@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+import csv
+import logging
+import os
+
+import boto3
+from termcolor import colored
+
+# S3 multipart parts must be at least 5 MiB, except the last one
+MIN_PART_SIZE = 5 * 1024 * 1024
+PART_SIZE = 8 * 1024 * 1024
+
+
+class S3CsvSink:
+    """
+    Streaming CSV output: rows are appended to a local spool file as they are
+    produced and shipped to S3 as multipart upload parts once enough bytes have
+    accumulated, so memory stays bounded by one place.
+
+    If the run dies, the spool file is left on disk with every row written so far.
+    """
+
+    def __init__(self, bucket, key, headers, spool_path, part_size=PART_SIZE, resume=False, append=False):
+        """
+        Parameters:
+            resume (bool): Keep appending to the spool file left by an interrupted run.
+            append (bool): Keep the rows already stored under key: a new spool
+                starts with a copy of them instead of replacing the object.
+        """
+        self.bucket = bucket
+        self.key = key
+        self.headers = headers
+        self.spool_path = spool_path
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.logger = logging.getLogger('googlemaps-scraper')
+        self.s3 = boto3.client('s3')
+
+        self.n_rows = 0
+        self._upload_id = None
+        self._parts = []
+        self._uploaded = 0  # spool bytes already sent as parts
+
+        spool_dir = os.path.dirname(spool_path)
+        if spool_dir:
+            os.makedirs(spool_dir, exist_ok=True)
+
+        if resume and os.path.exists(spool_path):
+            with open(spool_path, 'r', newline='', encoding='utf-8') as f:
+                self.n_rows = max(0, sum(1 for _ in csv.reader(f)) - 1)
+            self._file = open(spool_path, 'a', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file)
+            print(colored(f"Resuming {self.n_rows} reviews from {spool_path}", "cyan"))
+        else:
+            self._file = open(spool_path, 'w', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(headers)
+            if append:
+                self.__copy_existing()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, reviews):
+        for r in reviews:
+            self._writer.writerow([r.get(k, "") for k in self.headers])
+            self.n_rows += 1
+
+        if self._file.tell() - self._uploaded >= self.part_size:
+            self.__upload_part()
+
+    def rows(self, columns):
+        """
+        Parameters:
+            columns (list[str]): Columns to read back.
+
+        Returns:
+            list[dict]: Those columns of every row in the spool, e.g. to index them once uploaded.
+        """
+        self.flush()
+        with open(self.spool_path, 'r', newline='', encoding='utf-8') as f:
+            return [{c: row.get(c) for c in columns} for row in csv.DictReader(f)]
+
+    def flush(self):
+        # make rows written so far durable, e.g. after each place
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+        if self._upload_id is None:
+            # small output: a single put is enough
+            with open(self.spool_path, 'rb') as f:
+                self.s3.put_object(Bucket=self.bucket, Key=self.key, Body=f)
+        else:
+            self.__upload_part()
+            self.s3.complete_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+                                              MultipartUpload={'Parts': self._parts})
+
+        os.remove(self.spool_path)
+        print(colored(f"✅ Uploaded {self.n_rows} reviews to s3://{self.bucket}/{self.key}", "green"))
+
+    def abort(self):
+        self.flush()
+        self._file.close()
+
+        if self._upload_id is not None:
+            self.s3.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id)
+
+        print(colored(f"⚠️  Upload aborted, {self.n_rows} reviews kept in {self.spool_path}", "red"))
+
+    def __copy_existing(self):
+        try:
+            body = self.s3.get_object(Bucket=self.bucket, Key=self.key)['Body']
+        except self.s3.exceptions.NoSuchKey:
+            return
+
+        lines = (line.decode('utf-8') for line in body.iter_lines(keepends=True))
+        for row in csv.DictReader(lines):
+            self._writer.writerow([row.get(k) or "" for k in self.headers])
+            self.n_rows += 1
+        print(colored(f"Appending to the {self.n_rows} reviews of s3://{self.bucket}/{self.key}", "cyan"))
+
+    def __upload_part(self):
+        if not self._file.closed:
+            self._file.flush()
+        end = os.path.getsize(self.spool_path)
+        if end == self._uploaded:
+            return
+
+        if self._upload_id is None:
+            self._upload_id = self.s3.create_multipart_upload(Bucket=self.bucket, Key=self.key)['UploadId']
+
+        with open(self.spool_path, 'rb') as f:
+            f.seek(self._uploaded)
+            body = f.read(end - self._uploaded)
+
+        part_number = len(self._parts) + 1
+        resp = self.s3.upload_part(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+                                   PartNumber=part_number, Body=body)
+        self._parts.append({'PartNumber': part_number, 'ETag': resp['ETag']})
+        self._uploaded = end
+        self.logger.info(f"Uploaded part {part_number} ({len(body)} bytes) of s3://{self.bucket}/{self.key}")
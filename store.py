@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+import logging
+import os
+import uuid
+from datetime import datetime
+from urllib.parse import urlparse
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+
+# review columns stored in the files, partition columns live in the paths
+REVIEW_SCHEMA = pa.schema([
+    ('id_review', pa.string()),
+    ('caption', pa.string()),
+    ('relative_date', pa.string()),
+    ('review_date', pa.timestamp('us')),
+    ('retrieval_date', pa.timestamp('us')),
+    ('rating', pa.float64()),
+    ('username', pa.string()),
+    ('n_review_user', pa.int64()),
+])
+PARTITIONING = ds.partitioning(pa.schema([('place_id', pa.string()), ('scrape_date', pa.string())]), flavor='hive')
+UNKNOWN_PLACE = 'unknown'
+
+
+class ParquetReviewStore:
+    """
+    Review store made of Parquet files partitioned by place_id and scrape date:
+
+        <root>/place_id=<place_id>/scrape_date=<YYYY-MM-DD>/part-<uuid>.parquet
+
+    New reviews are written as new files, history is never rewritten, and readers
+    only open the partitions and columns they ask for.
+    """
+
+    def __init__(self, uri, endpoint_url=None):
+        """
+        Parameters:
+            uri (str): Local directory or s3://bucket/prefix.
+            endpoint_url (str): S3 compatible endpoint (e.g. a local MinIO) instead of AWS.
+        """
+        self.uri = uri
+        self.fs, self.root = self.__get_filesystem(uri, endpoint_url)
+        self.logger = logging.getLogger('review_store')
+
+    def append(self, df, scrape_date=None):
+        """
+        Write reviews as one new file per place partition.
+
+        Parameters:
+            df (pd.DataFrame): Reviews with the HEADER columns of monitor.py.
+            scrape_date (str): Partition date, defaults to today (YYYY-MM-DD).
+
+        Returns:
+            int: Number of reviews written.
+        """
+        if df.empty:
+            return 0
+
+        scrape_date = scrape_date or datetime.now().strftime('%Y-%m-%d')
+        df = df.copy()
+        df['place_id'] = df['place_id'].fillna(UNKNOWN_PLACE) if 'place_id' in df.columns else UNKNOWN_PLACE
+
+        for place_id, place_df in df.groupby('place_id'):
+            table = pa.Table.from_pandas(self.__conform(place_df), schema=REVIEW_SCHEMA, preserve_index=False)
+            path = f"{self.root}/place_id={place_id}/scrape_date={scrape_date}/part-{uuid.uuid4().hex}.parquet"
+            self.fs.create_dir(path.rsplit('/', 1)[0], recursive=True)
+            pq.write_table(table, path, filesystem=self.fs)
+
+        self.logger.info(f"Appended {len(df)} reviews to {self.uri}")
+        return len(df)
+
+    def read(self, place_ids=None, columns=None, since=None):
+        """
+        Read reviews, pruning partitions and columns.
+
+        Parameters:
+            place_ids (list[str]): Only these places, None for all.
+            columns (list[str]): Only these columns (place_id/scrape_date allowed), None for all.
+            since (str): Only partitions scraped on or after this date (YYYY-MM-DD).
+
+        Returns:
+            pd.DataFrame: Matching reviews.
+        """
+        all_columns = REVIEW_SCHEMA.names + ['place_id', 'scrape_date']
+        columns = all_columns if columns is None else list(columns)
+
+        if self.fs.get_file_info(self.root).type == fs.FileType.NotFound:
+            return pd.DataFrame(columns=columns)
+
+        schema = pa.schema(list(REVIEW_SCHEMA) + list(PARTITIONING.schema))
+        dataset = ds.dataset(self.root, schema=schema, filesystem=self.fs, format='parquet', partitioning=PARTITIONING)
+
+        condition = None
+        if place_ids is not None:
+            condition = ds.field('place_id').isin(list(place_ids))
+        if since is not None:
+            since_condition = ds.field('scrape_date') >= since
+            condition = since_condition if condition is None else condition & since_condition
+
+        return dataset.to_table(columns=columns, filter=condition).to_pandas()
+
+    def __conform(self, df):
+        out = pd.DataFrame(index=df.index)
+        for name in REVIEW_SCHEMA.names:
+            col = df[name] if name in df.columns else pd.Series(None, index=df.index, dtype=object)
+            if name in ('review_date', 'retrieval_date'):
+                out[name] = pd.to_datetime(col, errors='coerce')
+            elif name == 'rating':
+                out[name] = pd.to_numeric(col, errors='coerce')
+            elif name == 'n_review_user':
+                out[name] = pd.to_numeric(col, errors='coerce').astype('Int64')
+            else:
+                out[name] = col.astype(object).where(col.notna(), None).map(lambda v: v if v is None else str(v))
+        return out
+
+    def __get_filesystem(self, uri, endpoint_url):
+        parsed = urlparse(uri)
+
+        if parsed.scheme == 's3':
+            if endpoint_url:
+                endpoint = urlparse(endpoint_url)
+                s3 = fs.S3FileSystem(endpoint_override=endpoint.netloc or endpoint_url,
+                                     scheme=endpoint.scheme or 'https')
+            else:
+                s3 = fs.S3FileSystem()
+            return s3, f"{parsed.netloc}{parsed.path}".rstrip('/')
+
+        return fs.LocalFileSystem(), os.path.abspath(uri)
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+
+import pytest
+
+# the modules live flat at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.parse_bench import make_scraper  # noqa: E402
+from parsers import PARSERS  # noqa: E402
+
+
+@pytest.fixture(params=PARSERS)
+def scraper(request):
+    """
+    Browserless GoogleMapsScraper for each parser backend, skipped when lxml is not installed.
+    """
+    scraper = make_scraper(request.param)
+    if scraper.parser.name != request.param:
+        pytest.skip(f"{request.param} not installed")
+    return scraper
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import pandas as pd
+import pytest
+
+import monitor
+from checkpoint import CheckpointStore
+from schedule import PlaceSchedule
+
+URLS = ['https://www.google.com/maps/place/a', 'https://www.google.com/maps/place/b']
+
+
+def test_failures_are_counted_until_reset(tmp_path):
+    checkpoint = CheckpointStore(str(tmp_path / 'checkpoint.sqlite'))
+    assert checkpoint.failures(URLS[0]) == 0
+    assert checkpoint.mark_failed(URLS[0]) == 1
+    assert checkpoint.mark_failed(URLS[0]) == 2
+
+    checkpoint.reset()
+    assert checkpoint.failures(URLS[0]) == 0
+
+
+class FakePool:
+    """
+    Stands for a ScraperPool: place a never sorts, place b has no review.
+    """
+
+    def __init__(self):
+        self.scraped = []
+
+    def use_metrics(self, metrics):
+        pass
+
+    def imap(self, fn, urls):
+        for url in urls:
+            self.scraped.append(url)
+            yield None if url == URLS[0] else []
+
+
+@pytest.fixture
+def monitor_s3(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(monitor.MonitorS3, 'load_s3_reviews', lambda self, key: pd.DataFrame(columns=['id_review']))
+    (tmp_path / 'urls.txt').write_text('\n'.join(URLS))
+
+    def make(checkpoint, schedule=None):
+        return monitor.MonitorS3('urls.txt', 10, checkpoint=checkpoint, schedule=schedule, pool=FakePool(),
+                                 max_failures=2)
+    return make
+
+
+def test_failing_place_does_not_block_the_pass(tmp_path, monitor_s3):
+    checkpoint = CheckpointStore(str(tmp_path / 'checkpoint.sqlite'))
+
+    first = monitor_s3(checkpoint)
+    first.scrape_and_monitor_reviews()
+    assert first.pool.scraped == URLS
+    assert checkpoint.is_done(URLS[1]) and checkpoint.failures(URLS[0]) == 1
+
+    # only the failed place is retried, then the pass is over
+    second = monitor_s3(checkpoint)
+    second.scrape_and_monitor_reviews()
+    assert second.pool.scraped == URLS[:1]
+    assert not checkpoint.is_done(URLS[1]) and checkpoint.failures(URLS[0]) == 0
+
+    third = monitor_s3(checkpoint)
+    third.scrape_and_monitor_reviews()
+    assert third.pool.scraped == URLS
+
+
+def test_schedule_revisits_done_places(tmp_path, monitor_s3):
+    checkpoint = CheckpointStore(str(tmp_path / 'checkpoint.sqlite'))
+    # a place visited once is due again right away
+    schedule = PlaceSchedule(str(tmp_path / 'schedule.sqlite'), min_interval=0)
+
+    first = monitor_s3(checkpoint, schedule=schedule)
+    first.scrape_and_monitor_reviews()
+    assert checkpoint.is_done(URLS[1])
+
+    second = monitor_s3(checkpoint, schedule=schedule)
+    second.scrape_and_monitor_reviews()
+    assert second.pool.scraped == URLS
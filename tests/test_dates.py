@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from dates import parse_relative, review_date, review_dates
+
+RETRIEVAL = datetime(2024, 3, 31, 12, 0)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('2 days ago', ('days', 2)),
+    ('a week ago', ('weeks', 1)),
+    ('an hour ago', ('hours', 1)),
+    ('Edited 3 months ago', ('months', 3)),
+    ('a year ago', ('years', 1)),
+    ('a moment ago', ('minutes', 0)),
+    ('hace un mes', ('months', 1)),
+    ('hace 2 años', ('years', 2)),
+    ('há 5 dias', ('days', 5)),
+    ('il y a un an', ('years', 1)),
+    ('il y a 2 jours', ('days', 2)),
+    ('il y a une semaine', ('weeks', 1)),
+    ('un mese fa', ('months', 1)),
+    ('3 settimane fa', ('weeks', 3)),
+    ('vor einer Woche', ('weeks', 1)),
+    ('vor 4 Jahren', ('years', 4)),
+    ('gerade eben', ('minutes', 0)),
+    ('2 maanden geleden', ('months', 2)),
+    ('een jaar geleden', ('years', 1)),
+])
+def test_parse_relative(text, expected):
+    assert parse_relative(text) == expected
+
+
+@pytest.mark.parametrize('text', ['', 'yesterday', 'a long time ago', None, float('nan')])
+def test_parse_relative_unknown(text):
+    assert parse_relative(text) is None
+
+
+def test_review_date_is_calendar_aware():
+    assert review_date('a month ago', RETRIEVAL) == datetime(2024, 2, 29, 12, 0)
+    assert review_date('someday', RETRIEVAL) is None
+
+
+def test_review_dates_column():
+    relative = pd.Series(['2 days ago', 'someday', 'il y a un an', '2 days ago', None])
+    out = review_dates(relative, RETRIEVAL)
+
+    assert out.dtype == 'datetime64[ns]'
+    assert out[0] == out[3] == pd.Timestamp(2024, 3, 29, 12)
+    assert out[2] == pd.Timestamp(2023, 3, 31, 12)
+    assert pd.isna(out[1]) and pd.isna(out[4])
+
+
+def test_review_dates_per_row_retrieval():
+    relative = pd.Series(['an hour ago', 'a week ago', 'unknown'], index=[10, 11, 12])
+    retrieval = pd.Series(['2024-03-31 12:00:00', '2024-01-01 00:00:00', '2024-01-01 00:00:00'])
+    out = review_dates(relative, retrieval)
+
+    assert list(out.index) == [10, 11, 12]
+    assert out[10] == pd.Timestamp(2024, 3, 31, 11)
+    assert out[11] == pd.Timestamp(2023, 12, 25)
+    assert pd.isna(out[12])
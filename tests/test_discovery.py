@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+import csv
+
+import pytest
+
+from discovery import CELL_SPAN, ZOOM, Cell, GridSearch, PlaceIndex, PlacesWriter, place_key, subdivide
+
+SEARCH_URL = 'https://www.google.com/maps/search/'
+ROOT = Cell(12.9, 77.6, ZOOM, CELL_SPAN, 0)
+
+
+def href(i, query='?authuser=0&hl=en'):
+    return f"https://www.google.com/maps/place/P{i}/data=!4m7!3m6!1s0x3bae:0x{i:x}!8m2{query}"
+
+
+class FakeSearch:
+    """
+    Search stub: each call lists `n` places starting `step` after those of the
+    previous call, so neighbouring cells share places.
+    """
+
+    def __init__(self, n=100, step=50, reached_end=False):
+        self.n = n
+        self.step = step
+        self.reached_end = reached_end
+        self.urls = []
+
+    def __call__(self, url):
+        start = len(self.urls) * self.step
+        self.urls.append(url)
+        return [{'href': href(i), 'name': f'P{i}'} for i in range(start, start + self.n)], self.reached_end
+
+    def zooms(self):
+        return [int(url.rsplit(',', 1)[1].rstrip('z')) for url in self.urls]
+
+
+class ListWriter:
+
+    def __init__(self):
+        self.places = []
+
+    def write(self, places):
+        self.places += places
+
+
+def test_subdivide():
+    children = subdivide(ROOT)
+    assert [(c.zoom, c.span, c.depth) for c in children] == [(ZOOM + 1, CELL_SPAN / 2, 1)] * 4
+    assert sorted((round(c.lat - ROOT.lat, 6), round(c.lng - ROOT.lng, 6)) for c in children) == [
+        (-0.005, -0.005), (-0.005, 0.005), (0.005, -0.005), (0.005, 0.005)]
+
+
+def test_dense_cells_are_subdivided_down_to_max_depth():
+    search = FakeSearch()
+    writer = ListWriter()
+    n_new = GridSearch(search, ['salon'], SEARCH_URL, max_depth=2).run([ROOT], writer, PlaceIndex())
+
+    # every list is cut off: 1 cell, its 4 children and their 16 children, no deeper
+    assert search.zooms() == [ZOOM] + [ZOOM + 1] * 4 + [ZOOM + 2] * 16
+    assert search.urls[0] == f"{SEARCH_URL}salon/@12.900000,77.600000,{ZOOM}z"
+
+    # overlapping lists: half of every list after the first is new
+    assert n_new == len(writer.places) == 100 + 20 * 50
+    assert len({p['href'] for p in writer.places}) == n_new
+    assert writer.places[0] == {'href': href(0), 'name': 'P0', 'search_point_url': f"salon/@12.900000,77.600000,{ZOOM}z"}
+
+
+@pytest.mark.parametrize('search', [FakeSearch(n=100, reached_end=True), FakeSearch(n=99)])
+def test_complete_or_short_lists_are_not_subdivided(search):
+    GridSearch(search, ['salon'], SEARCH_URL).run([ROOT], ListWriter(), PlaceIndex())
+    assert len(search.urls) == 1
+
+
+def test_max_depth_zero_never_subdivides():
+    search = FakeSearch()
+    GridSearch(search, ['salon', 'spa'], SEARCH_URL, max_depth=0).run([ROOT, ROOT._replace(lat=13.0)],
+                                                                       ListWriter(), PlaceIndex())
+    assert len(search.urls) == 4
+    assert sorted(url.split('/@')[0].rsplit('/', 1)[1] for url in search.urls) == ['salon', 'salon', 'spa', 'spa']
+
+
+def test_place_index_dedups_on_place_identity():
+    index = PlaceIndex()
+    assert index.add(href(1))
+    # same feature ID, other name and query string
+    assert not index.add(href(1, query='?hl=fr').replace('/P1/', '/Salon/'))
+    assert index.add(href(2))
+
+    assert place_key('https://www.google.com/maps/search/?api=1&query=x&query_place_id=place_id:ChIJ1') == \
+        place_key('https://www.google.com/maps/place/?q=place_id:ChIJ1')
+    # neither ID: the URL without query string
+    assert index.add('https://www.google.com/maps/place/Salon?hl=en')
+    assert 'https://www.google.com/maps/place/Salon?hl=fr' in index
+    assert len(index) == 3
+
+
+def test_resume_skips_places_already_written(tmp_path):
+    output = str(tmp_path / 'places' / 'places.csv')
+    with PlacesWriter(output) as writer:
+        first = GridSearch(FakeSearch(), ['salon'], SEARCH_URL, max_depth=0).run([ROOT], writer, PlaceIndex())
+
+    index = PlaceIndex()
+    index.load(output)
+    assert len(index) == first == 100
+
+    # the next run lists places 0-119: only the last 20 are new, appended under the same header
+    with PlacesWriter(output, resume=True) as writer:
+        second = GridSearch(FakeSearch(n=120), ['salon'], SEARCH_URL, max_depth=0).run([ROOT], writer, index)
+    assert second == 20
+
+    with open(output, 'r', newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 120 and rows[-1]['name'] == 'P119'
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from metrics import ScraperMetrics
+
+
+@pytest.fixture
+def metrics():
+    metrics = ScraperMetrics(run_id='run1')
+    metrics.observe('scroll', 0.5)
+    metrics.observe('scroll', 1.5)
+    metrics.observe('parse', 0.25)
+    metrics.incr('reviews', 12)
+    metrics.place('https://www.google.com/maps/place/a', 3.21, reviews=12)
+    metrics.place('https://www.google.com/maps/place/"b"\\c\nd', 1.0, ok=False)
+    return metrics
+
+
+def test_export_json_lines(metrics, tmp_path):
+    path = tmp_path / 'metrics.jsonl'
+    metrics.export(str(path))
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert all(r['run'] == 'run1' and 'elapsed' in r for r in records)
+    by_type = {}
+    for r in records:
+        by_type.setdefault(r['type'], []).append(r)
+
+    scroll = next(r for r in by_type['phase'] if r['phase'] == 'scroll')
+    assert (scroll['count'], scroll['total'], scroll['mean'], scroll['max']) == (2, 2.0, 1.0, 1.5)
+    assert {r['name']: r['value'] for r in by_type['counter']} == {'reviews': 12, 'places': 2, 'failures': 1}
+    assert [(r['url'], r['seconds'], r['reviews'], r['ok']) for r in by_type['place']] == [
+        ('https://www.google.com/maps/place/a', 3.21, 12, True),
+        ('https://www.google.com/maps/place/"b"\\c\nd', 1.0, 0, False),
+    ]
+
+
+def test_export_to_stdout(metrics, capsys):
+    metrics.export('-')
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 2 + 3 + 2
+    assert all(json.loads(line)['run'] == 'run1' for line in lines)
+
+
+def test_export_prometheus(metrics, tmp_path):
+    path = tmp_path / 'metrics.prom'
+    metrics.export(str(path))
+    lines = path.read_text().splitlines()
+
+    assert lines[:5] == [
+        '# TYPE gmscraper_phase_seconds summary',
+        'gmscraper_phase_seconds_sum{phase="scroll"} 2.0',
+        'gmscraper_phase_seconds_count{phase="scroll"} 2',
+        'gmscraper_phase_seconds_sum{phase="parse"} 0.25',
+        'gmscraper_phase_seconds_count{phase="parse"} 1',
+    ]
+    assert lines[5:8] == [
+        '# TYPE gmscraper_phase_seconds_max gauge',
+        'gmscraper_phase_seconds_max{phase="scroll"} 1.5',
+        'gmscraper_phase_seconds_max{phase="parse"} 0.25',
+    ]
+    # one counter family per counter, sorted by name
+    assert lines[8:14] == [
+        '# TYPE gmscraper_failures_total counter', 'gmscraper_failures_total 1',
+        '# TYPE gmscraper_places_total counter', 'gmscraper_places_total 2',
+        '# TYPE gmscraper_reviews_total counter', 'gmscraper_reviews_total 12',
+    ]
+    # label values escape backslashes, quotes and new lines
+    assert lines[14:17] == [
+        '# TYPE gmscraper_place_seconds gauge',
+        'gmscraper_place_seconds{url="https://www.google.com/maps/place/a"} 3.21',
+        'gmscraper_place_seconds{url="https://www.google.com/maps/place/\\"b\\"\\\\c\\nd"} 1.0',
+    ]
+    assert lines[17].startswith('gmscraper_run_seconds ') and len(lines) == 18
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Golden field checks of both parser backends, see benchmarks/parse_bench.py for their timing.
+"""
+import json
+import os
+
+import pytest
+from dateutil.relativedelta import relativedelta
+
+from benchmarks.parse_bench import DATE_SLACK, GOLDEN, REVIEW_FIELDS, load_place
+from benchmarks.server import FIXTURES_DIR, load_fixture
+from parsers import SoupParser
+
+with open(os.path.join(FIXTURES_DIR, GOLDEN), 'r', encoding='utf-8') as f:
+    GOLDEN_FIELDS = json.load(f)
+REVIEWS = GOLDEN_FIELDS['reviews']
+PLACES = GOLDEN_FIELDS['places']
+
+
+def test_review_blocks(scraper):
+    assert len(scraper.parser.parse_reviews(load_fixture(REVIEWS['file']))) == len(REVIEWS['expected'])
+
+
+@pytest.mark.parametrize('i', range(len(REVIEWS['expected'])))
+def test_review_fields(scraper, i):
+    expected = REVIEWS['expected'][i]
+    raw = scraper.parser.parse_reviews(load_fixture(REVIEWS['file']))[i]
+    item = scraper._GoogleMapsScraper__parse(raw)
+
+    for key in REVIEW_FIELDS:
+        assert item[key] == expected[key], key
+
+    age = expected['review_age']
+    if age is None:
+        assert item['review_date'] is None
+    else:
+        assert abs(item['review_date'] - (item['retrieval_date'] - relativedelta(**age))) <= DATE_SLACK
+
+
+@pytest.mark.parametrize('entry', PLACES, ids=[entry.get('file', entry.get('name')) for entry in PLACES])
+def test_place_fields(scraper, entry):
+    place = scraper._GoogleMapsScraper__parse_place(scraper.parser.parse_place(load_place(entry)), entry['url'])
+    for key, value in entry['expected'].items():
+        assert place.get(key) == value, key
+
+
+def test_backends_agree(scraper):
+    html = load_fixture(REVIEWS['file'])
+    assert scraper.parser.parse_reviews(html) == SoupParser().parse_reviews(html)
+    for entry in PLACES:
+        assert scraper.parser.parse_place(load_place(entry)) == SoupParser().parse_place(load_place(entry))
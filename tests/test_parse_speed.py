@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+Parse cost per backend, with pytest-benchmark (skipped when it is not installed):
+
+    python -m pytest tests/test_parse_speed.py --benchmark-autosave
+    python -m pytest tests/test_parse_speed.py --benchmark-compare
+"""
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from benchmarks.parse_bench import load_place
+from benchmarks.server import load_fixture
+from test_parse import PLACES, REVIEWS
+
+
+def test_parse_reviews(benchmark, scraper):
+    html = load_fixture(REVIEWS['file'])
+    parse = scraper._GoogleMapsScraper__parse
+
+    reviews = benchmark(lambda: [parse(fields) for fields in scraper.parser.parse_reviews(html)])
+    assert len(reviews) == len(REVIEWS['expected'])
+
+
+def test_parse_place(benchmark, scraper):
+    pages = [(load_place(entry), entry['url']) for entry in PLACES]
+    parse_place = scraper._GoogleMapsScraper__parse_place
+
+    places = benchmark(lambda: [parse_place(scraper.parser.parse_place(page), url) for page, url in pages])
+    assert [p['name'] for p in places] == [entry['expected']['name'] for entry in PLACES]
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+from place_cache import PlaceCache
+
+
+def test_entry_with_another_review_count_is_stale(tmp_path):
+    cache = PlaceCache(str(tmp_path / 'places.sqlite'))
+    cache.put('p', {'name': 'Salon', 'n_reviews': 12})
+
+    assert cache.get('p') == {'name': 'Salon', 'n_reviews': 12}
+    assert cache.get('p', n_reviews=12) == {'name': 'Salon', 'n_reviews': 12}
+    assert cache.get('p', n_reviews=13) is None
+
+
+def test_expired_entry_is_stale(tmp_path):
+    cache = PlaceCache(str(tmp_path / 'places.sqlite'), ttl=-1)
+    cache.put('p', {'name': 'Salon', 'n_reviews': 12})
+    assert cache.get('p') is None
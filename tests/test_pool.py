@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+import pool
+from metrics import ScraperMetrics
+
+
+class FakeScraper:
+    started = 0
+
+    def __init__(self, **kwargs):
+        FakeScraper.started += 1
+        self.metrics = kwargs.get('metrics') or ScraperMetrics()
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def scraper_pool(monkeypatch):
+    FakeScraper.started = 0
+    monkeypatch.setattr(pool, 'GoogleMapsScraper', FakeScraper)
+    with pool.ScraperPool(workers=1) as p:
+        yield p
+
+
+def test_error_keeps_scraper(scraper_pool):
+    def fail(scraper, url):
+        raise ValueError(url)
+
+    with pytest.raises(ValueError):
+        scraper_pool.run(fail, 'a')
+    assert scraper_pool.run(lambda scraper, url: url, 'b') == 'b'
+    assert FakeScraper.started == 1
+
+
+def test_driver_crash_recycles_scraper(scraper_pool):
+    crashed = []
+
+    def crash_once(scraper, url):
+        if not crashed:
+            crashed.append(scraper)
+            raise WebDriverException('gone')
+        return scraper
+
+    scraper = scraper_pool.run(crash_once, 'a')
+    assert scraper is not crashed[0] and crashed[0].closed
+    assert FakeScraper.started == 2
+    assert crashed[0].metrics.counters['driver_recycles'] == 1
+
+
+def test_driver_crash_gives_up_after_max_recycle(scraper_pool):
+    def crash(scraper, url):
+        raise WebDriverException('gone')
+
+    with pytest.raises(WebDriverException):
+        scraper_pool.run(crash, 'a')
+    assert FakeScraper.started == pool.MAX_RECYCLE + 1
+    assert scraper_pool._idle.empty()
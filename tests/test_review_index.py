@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import pandas as pd
+import pytest
+
+import monitor
+from review_index import CHUNK, ReviewIndex, review_key
+
+URL = 'https://www.google.com/maps/place/a'
+
+
+@pytest.fixture
+def index(tmp_path):
+    review_index = ReviewIndex(str(tmp_path / 'index.sqlite'))
+    yield review_index
+    review_index.close()
+
+
+def ids(start, stop):
+    return [f'r{i}' for i in range(start, stop)]
+
+
+@pytest.mark.parametrize('n', [CHUNK - 1, CHUNK, CHUNK + 1, 2 * CHUNK + 7])
+def test_known_across_chunks(index, n):
+    index.add([{'id_review': review_id, 'place_id': 'p'} for review_id in ids(0, n)])
+    assert len(index) == n
+
+    # every other ID known, on both sides of each chunk boundary
+    assert index.known('p', ids(0, 2 * n)[::2]) == set(ids(0, n)[::2])
+    assert index.known('other', ids(0, n)) == set()
+
+
+def test_new_reviews_across_chunks(index):
+    n = 2 * CHUNK + 3
+    index.add([{'id_review': review_id, 'place_id': 'p'} for review_id in ids(0, n)])
+
+    fresh = [{'id_review': review_id, 'place_id': 'p'} for review_id in ids(n - CHUNK, n + CHUNK)]
+    # repeated and other place IDs are not mixed up
+    fresh += [fresh[-1], {'id_review': 'r0', 'place_id': 'q'}]
+
+    assert [r['id_review'] for r in index.new_reviews(fresh)] == ids(n, n + CHUNK) + ['r0']
+    # all of them are new to place q, each ID once
+    assert index.new_reviews(fresh, place_id='q') == fresh[:2 * CHUNK] + fresh[-1:]
+
+
+def test_add_frame_and_keys(index):
+    df = pd.DataFrame({'id_review': ['a', 'b', None, 'a'], 'place_id': ['p', None, 'p', 'p']})
+    assert index.add_frame(df) == 2
+    assert index.add_frame(df) == 0
+    assert index.keys('p') == {review_key('a')}
+    # reviews without place, None or NaN, share one key
+    assert index.known(None, ['b']) == {'b'}
+
+
+class FakePool:
+
+    def __init__(self, reviews):
+        self.reviews = reviews
+
+    def use_metrics(self, metrics):
+        pass
+
+    def imap(self, fn, urls):
+        for url in urls:
+            yield [dict(r) for r in self.reviews]
+
+
+def test_stale_index_still_dedups_against_baseline(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'urls.txt').write_text(URL)
+    # r1 was stored by a run whose index never reached this one
+    baseline = pd.DataFrame([{'id_review': 'r1', 'place_id': 'p'}])
+    uploaded = []
+    monkeypatch.setattr(monitor.MonitorS3, 'load_s3_reviews', lambda self, key: baseline)
+    monkeypatch.setattr(monitor.MonitorS3, 'upload_csv_to_s3', lambda self, df, headers, key: uploaded.append(df))
+
+    review_index = ReviewIndex(str(tmp_path / 'index.sqlite'))
+    review_index.add([{'id_review': 'r0', 'place_id': 'p'}])
+    pool = FakePool([{'id_review': i, 'place_id': 'p'} for i in ('r0', 'r1', 'r2')])
+
+    monitor.MonitorS3('urls.txt', 10, pool=pool, review_index=review_index).scrape_and_monitor_reviews()
+
+    assert list(uploaded[-1]['id_review']) == ['r1', 'r2']
+    assert review_index.known('p', ['r0', 'r1', 'r2']) == {'r0', 'r1', 'r2'}
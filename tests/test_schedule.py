@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from schedule import DAY, HISTORY, MAX_INTERVAL, MIN_INTERVAL, PlaceSchedule
+
+T0 = 1_700_000_000.0
+
+
+@pytest.fixture
+def schedule(tmp_path):
+    s = PlaceSchedule(str(tmp_path / 'schedule.sqlite'))
+    yield s
+    s.close()
+
+
+def visit(schedule, url, new_reviews, days):
+    # one visit per day, new_reviews found by each after the first
+    for i in range(days + 1):
+        schedule.record(url, 0 if i == 0 else new_reviews, visited_at=T0 + i * DAY)
+
+
+def test_next_due_bounds(schedule):
+    assert schedule.next_due('never') is None
+
+    schedule.record('once', 5, visited_at=T0)
+    assert schedule.next_due('once') == T0 + MIN_INTERVAL
+
+    visit(schedule, 'quiet', 0, 3)
+    assert schedule.next_due('quiet') == T0 + 3 * DAY + MAX_INTERVAL
+
+    visit(schedule, 'busy', 100, 3)
+    assert schedule.next_due('busy') == T0 + 3 * DAY + MIN_INTERVAL
+
+    # two reviews a day: due half a day after the last visit
+    visit(schedule, 'steady', 2, 3)
+    assert schedule.velocity('steady') == pytest.approx(2)
+    assert schedule.next_due('steady') == pytest.approx(T0 + 3.5 * DAY)
+
+
+def test_history_is_capped(schedule):
+    visit(schedule, 'url', 1, HISTORY + 5)
+    # the first visits of the window are dropped, velocity is over the last HISTORY visits
+    assert schedule.velocity('url') == pytest.approx(1)
+    assert len(schedule.conn.execute("SELECT * FROM visits WHERE url = 'url'").fetchall()) == HISTORY
+
+
+def test_plan_orders_by_expected_new_reviews(schedule):
+    visit(schedule, 'slow', 1, 3)
+    visit(schedule, 'fast', 4, 3)
+    visit(schedule, 'quiet', 0, 3)
+    schedule.record('once', 3, visited_at=T0 + 3 * DAY)
+
+    now = T0 + 4 * DAY
+    # never visited first (in input order), quiet is not due for a week
+    assert schedule.plan(['quiet', 'slow', 'new1', 'fast', 'once', 'new2'], now=now) == \
+        ['new1', 'once', 'new2', 'fast', 'slow']
+
+
+def test_plan_skips_places_not_due(schedule):
+    visit(schedule, 'steady', 2, 3)
+    last = T0 + 3 * DAY
+    assert schedule.plan(['steady'], now=last + DAY / 4) == []
+    assert schedule.plan(['steady'], now=last + DAY / 2) == ['steady']
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+from argparse import Namespace
+
+import pytest
+
+from checkpoint import CheckpointStore
+from metrics import ScraperMetrics
+from scraper import scrape_place
+
+URL = 'https://www.google.com/maps/place/a'
+
+
+class FakeScraper:
+    """
+    Stands for GoogleMapsScraper on a place with 10 reviews, r0 the newest.
+    """
+
+    def __init__(self, extraction):
+        self.extraction = extraction
+        self.metrics = ScraperMetrics()
+        self.skips = []
+
+    def sort_by(self, url, ind):
+        return 0
+
+    def iter_reviews(self, url, limit=None, skip=0, max_scrolls=None):
+        self.skips.append(skip)
+        # xhr ignores skip, like GoogleMapsScraper
+        start = 0 if self.extraction == 'xhr' else skip
+        for i in range(start, 10):
+            if limit is not None and i - start >= limit:
+                return
+            yield {'id_review': f'r{i}'}
+
+
+def args(n):
+    return Namespace(place=False, sort_by='newest', N=n, max_scrolls=None, source=False)
+
+
+@pytest.mark.parametrize('extraction, skip', [('dom', 3), ('js', 3), ('xhr', 0)])
+def test_resume_counts_only_new_reviews(tmp_path, extraction, skip):
+    checkpoint = CheckpointStore(str(tmp_path / 'checkpoint.sqlite'))
+    checkpoint.record(URL, [{'id_review': f'r{i}'} for i in range(3)], 3)
+    saved = []
+    scraper = FakeScraper(extraction)
+
+    assert scrape_place(scraper, URL, args(6), lambda url, reviews, offset: saved.extend(reviews), checkpoint)
+    assert scraper.skips == [skip]
+    assert [r['id_review'] for r in saved] == ['r3', 'r4', 'r5']
+
+
+def test_no_review_left_to_scrape(tmp_path):
+    checkpoint = CheckpointStore(str(tmp_path / 'checkpoint.sqlite'))
+    checkpoint.record(URL, [{'id_review': f'r{i}'} for i in range(3)], 3)
+    saved = []
+    scraper = FakeScraper('dom')
+
+    assert scrape_place(scraper, URL, args(3), lambda url, reviews, offset: saved.extend(reviews), checkpoint)
+    assert scraper.skips == [] and saved == []
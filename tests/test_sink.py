@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import io
+
+import pytest
+from botocore.response import StreamingBody
+
+import sink
+from sink import S3CsvSink
+
+HEADERS = ['id_review', 'caption', 'place_id']
+
+
+class FakeS3:
+
+    class exceptions:
+        class NoSuchKey(Exception):
+            pass
+
+    def __init__(self, objects=None):
+        self.objects = dict(objects or {})
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise self.exceptions.NoSuchKey(Key)
+        body = self.objects[(Bucket, Key)]
+        return {'Body': StreamingBody(io.BytesIO(body), len(body))}
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[(Bucket, Key)] = Body.read()
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    s3 = FakeS3({('b', 'combined/out.csv'): b'id_review,caption,place_id\r\nr1,"two\r\nlines",p\r\nr2,,p\r\n'})
+    monkeypatch.setattr(sink.boto3, 'client', lambda name: s3)
+    return s3
+
+
+def test_replace_by_default(tmp_path, s3):
+    with S3CsvSink('b', 'combined/out.csv', HEADERS, str(tmp_path / 'out.spool')) as out:
+        out.write([{'id_review': 'r3', 'place_id': 'p'}])
+
+    assert s3.objects[('b', 'combined/out.csv')] == b'id_review,caption,place_id\r\nr3,,p\r\n'
+
+
+def test_append_keeps_stored_rows(tmp_path, s3):
+    with S3CsvSink('b', 'combined/out.csv', HEADERS, str(tmp_path / 'out.spool'), append=True) as out:
+        out.write([{'id_review': 'r3', 'caption': 'new', 'place_id': 'p'}])
+        assert out.n_rows == 3
+        assert out.rows(['id_review', 'place_id']) == [{'id_review': f'r{i}', 'place_id': 'p'} for i in (1, 2, 3)]
+
+    assert s3.objects[('b', 'combined/out.csv')] == \
+        b'id_review,caption,place_id\r\nr1,"two\r\nlines",p\r\nr2,,p\r\nr3,new,p\r\n'
+
+
+def test_append_to_missing_object(tmp_path, s3):
+    with S3CsvSink('b', 'combined/new.csv', HEADERS, str(tmp_path / 'new.spool'), append=True) as out:
+        out.write([{'id_review': 'r1', 'place_id': 'p'}])
+        assert out.n_rows == 1
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import os
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from store import ParquetReviewStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ParquetReviewStore(str(tmp_path / 'reviews'))
+
+
+def reviews(place_id, ids):
+    return pd.DataFrame([{'id_review': review_id, 'caption': f'text {review_id}', 'relative_date': 'a week ago',
+                          'review_date': datetime(2024, 10, 1), 'retrieval_date': datetime(2024, 10, 8),
+                          'rating': 4.0, 'username': 'u', 'n_review_user': 3, 'place_id': place_id}
+                         for review_id in ids])
+
+
+def test_read_empty_store(store):
+    df = store.read(columns=['id_review', 'place_id'])
+    assert df.empty and list(df.columns) == ['id_review', 'place_id']
+
+
+def test_append_and_read_back(store, tmp_path):
+    assert store.append(reviews('p1', ['a', 'b']), scrape_date='2024-10-08') == 2
+    assert store.append(reviews('p2', ['c']), scrape_date='2024-10-08') == 1
+    assert store.append(pd.DataFrame()) == 0
+
+    # one new file per place partition, history untouched
+    assert store.append(reviews('p1', ['d']), scrape_date='2024-10-09') == 1
+    assert len(os.listdir(tmp_path / 'reviews' / 'place_id=p1' / 'scrape_date=2024-10-08')) == 1
+
+    df = store.read().sort_values('id_review', ignore_index=True)
+    assert list(df['id_review']) == ['a', 'b', 'c', 'd']
+    assert list(df['place_id']) == ['p1', 'p1', 'p2', 'p1']
+    assert list(df['scrape_date']) == ['2024-10-08', '2024-10-08', '2024-10-08', '2024-10-09']
+    assert df.loc[0, 'caption'] == 'text a'
+    assert df.loc[0, 'rating'] == 4.0 and df.loc[0, 'n_review_user'] == 3
+    assert df.loc[0, 'review_date'] == pd.Timestamp(2024, 10, 1)
+
+
+def test_missing_place_id_goes_to_unknown_partition(store, tmp_path):
+    df = reviews(None, ['a'])
+    store.append(df, scrape_date='2024-10-08')
+    assert (tmp_path / 'reviews' / 'place_id=unknown' / 'scrape_date=2024-10-08').is_dir()
+    assert list(store.read(columns=['place_id'])['place_id']) == ['unknown']
+
+
+def test_read_prunes_partitions_and_columns(store):
+    store.append(reviews('p1', ['a']), scrape_date='2024-10-07')
+    store.append(reviews('p1', ['b']), scrape_date='2024-10-09')
+    store.append(reviews('p2', ['c']), scrape_date='2024-10-09')
+    store.append(reviews('p3', ['d']), scrape_date='2024-10-10')
+
+    df = store.read(place_ids=['p1', 'p2'], columns=['id_review', 'place_id'])
+    assert list(df.columns) == ['id_review', 'place_id']
+    assert sorted(df['id_review']) == ['a', 'b', 'c']
+
+    assert sorted(store.read(since='2024-10-09', columns=['id_review'])['id_review']) == ['b', 'c', 'd']
+    assert sorted(store.read(place_ids=['p1'], since='2024-10-08', columns=['id_review'])['id_review']) == ['b']
+    assert store.read(place_ids=['p4']).empty
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+import waits as waits_module
+from waits import MAX_TIMEOUT, MIN_TIMEOUT, AdaptiveWait
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # conditions advance the clock by the time the wait should take
+    now = [0.0]
+    monkeypatch.setattr(waits_module.time, 'perf_counter', lambda: now[0])
+    return now
+
+
+def takes(clock, seconds):
+    def condition(driver):
+        clock[0] += seconds
+        return True
+    return condition
+
+
+def never(driver):
+    return False
+
+
+def test_records_are_capped():
+    waits = AdaptiveWait(driver=object(), max_records=3)
+    for i in range(5):
+        assert waits.until(f'wait{i}', lambda driver: True)
+
+    assert [r['name'] for r in waits.records] == ['wait2', 'wait3', 'wait4']
+    assert waits.summary()['wait4'] == {'calls': 1, 'timeouts': 0, 'total': waits.records[-1]['elapsed']}
+
+
+def test_timeout_shrinks_after_fast_waits(clock):
+    waits = AdaptiveWait(driver=object(), min_timeout=1)
+    assert waits.timeout_for('scroll') == MAX_TIMEOUT
+
+    waits.until('scroll', takes(clock, 2.0))
+    assert waits.timeout_for('scroll') == pytest.approx(8.0)
+
+    # running average of 2.0 and 0.5
+    waits.until('scroll', takes(clock, 0.5))
+    assert waits.timeout_for('scroll') == pytest.approx(4 * (0.3 * 0.5 + 0.7 * 2.0))
+
+    for _ in range(20):
+        waits.until('scroll', takes(clock, 0.01))
+    assert waits.timeout_for('scroll') == 1
+
+
+def test_timeout_doubles_up_to_max():
+    waits = AdaptiveWait(driver=object())
+    waits.until('scroll', lambda driver: True)
+    assert waits.timeout_for('scroll') == MIN_TIMEOUT
+
+    expected = MIN_TIMEOUT
+    for _ in range(4):
+        assert waits.until('scroll', never, timeout=0.01) is False
+        expected = min(MAX_TIMEOUT, expected * 2)
+        assert waits.timeout_for('scroll') == expected
+    assert expected == MAX_TIMEOUT
+    assert [r['ok'] for r in waits.records] == [True, False, False, False, False]
+
+
+def test_timeouts_are_per_wait(clock):
+    waits = AdaptiveWait(driver=object())
+    waits.until('scroll', takes(clock, 0.1))
+    waits.until('sort_menu', takes(clock, 2.0))
+    waits.until('spinner', never, timeout=0.01)
+
+    assert waits.timeout_for('scroll') == MIN_TIMEOUT
+    assert waits.timeout_for('sort_menu') == pytest.approx(8.0)
+    # the first timeout of a wait doubles the default, capped
+    assert waits.timeout_for('spinner') == MAX_TIMEOUT
+    assert waits.timeout_for('places') == MAX_TIMEOUT
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pandas as pd
+import pytest
+
+import monitor
+import work_queue
+from schedule import PlaceSchedule
+from work_queue import ShardWriter, SqliteWorkQueue, SqsWorkQueue, drain, list_shards, merge_shards, remove_shards
+
+URLS = ['https://www.google.com/maps/place/a', 'https://www.google.com/maps/place/b']
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(work_queue, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    q = SqliteWorkQueue(str(tmp_path / 'queue.sqlite'), lease=60, max_attempts=2)
+    q.put(URLS, shards=2)
+    yield q
+    q.close()
+
+
+def test_lease_hides_task_until_expired(queue, clock):
+    first = queue.lease('w1')
+    assert (first.url, first.shard, first.attempts) == (URLS[0], 0, 1)
+    assert queue.lease('w2').url == URLS[1]
+    assert queue.lease('w2') is None
+
+    clock.now += 61
+    again = queue.lease('w2')
+    assert again.url == URLS[0] and again.attempts == 2
+
+
+def test_heartbeat_extends_lease(queue, clock):
+    task = queue.lease('w1')
+    queue.lease('w1')
+    clock.now += 50
+    queue.heartbeat(task)
+    clock.now += 50
+    # only the lease without heartbeat expired
+    assert queue.lease('w2').url == URLS[1]
+    assert queue.lease('w2') is None
+
+
+def test_fail_retries_up_to_max_attempts(queue):
+    for attempt in (1, 2):
+        task = queue.lease('w1')
+        assert (task.url, task.attempts) == (URLS[0], attempt)
+        queue.fail(task, 'boom')
+
+    assert queue.lease('w1').url == URLS[1]
+    assert queue.stats() == {'failed': 1, 'leased': 1}
+
+
+def test_expired_last_attempt_is_failed(queue, clock):
+    for _ in range(2):
+        queue.lease('w1')
+        queue.lease('w1')
+        clock.now += 61
+
+    assert queue.lease('w1') is None
+    assert queue.stats() == {'failed': 2}
+
+
+def test_release_does_not_count_an_attempt(queue):
+    task = queue.lease('w1')
+    queue.release(task)
+    assert queue.lease('w1').attempts == 1
+
+
+def test_complete_is_final(queue, clock):
+    task = queue.lease('w1')
+    queue.complete(task)
+    clock.now += 61
+    assert queue.lease('w1').url == URLS[1]
+    assert queue.stats() == {'done': 1, 'leased': 1}
+
+
+def test_complete_needs_the_lease(queue, clock):
+    stale = queue.lease('w1')
+    queue.lease('w1')
+    clock.now += 61
+    task = queue.lease('w2')
+    assert task.id == stale.id
+
+    # the expired lease was taken over: its late completion is ignored
+    queue.complete(stale)
+    assert queue.stats() == {'leased': 2}
+    queue.complete(task)
+    assert queue.stats() == {'done': 1, 'leased': 1}
+
+
+class FakeSqs:
+
+    def __init__(self):
+        self.messages = []
+        self.n_sent = 0
+
+    def send_message(self, QueueUrl, MessageBody):
+        self.n_sent += 1
+        self.messages.append({'MessageId': str(self.n_sent), 'Body': MessageBody, 'receives': 0})
+
+    def receive_message(self, QueueUrl, **kwargs):
+        if not self.messages:
+            return {}
+        message = self.messages[0]
+        message['receives'] += 1
+        return {'Messages': [{'MessageId': message['MessageId'], 'Body': message['Body'],
+                              'ReceiptHandle': message['MessageId'],
+                              'Attributes': {'ApproximateReceiveCount': str(message['receives'])}}]}
+
+    def change_message_visibility(self, QueueUrl, ReceiptHandle, VisibilityTimeout):
+        pass
+
+    def delete_message(self, QueueUrl, ReceiptHandle):
+        self.messages = [m for m in self.messages if m['MessageId'] != ReceiptHandle]
+
+
+def test_sqs_release_does_not_count_an_attempt(monkeypatch):
+    sqs = FakeSqs()
+    monkeypatch.setattr(work_queue.boto3, 'client', lambda service: sqs)
+    queue = SqsWorkQueue('https://sqs.eu-west-1.amazonaws.com/1/places', max_attempts=2)
+    sqs.send_message(queue.queue_url, '{"url": "%s", "shard": 1}' % URLS[0])
+
+    task = queue.lease('w1')
+    queue.fail(task, 'boom')
+    task = queue.lease('w1')
+    assert task.attempts == 2
+
+    queue.release(task)
+    assert len(sqs.messages) == 1
+    again = queue.lease('w1')
+    assert (again.url, again.shard, again.attempts) == (URLS[0], 1, 2)
+
+
+class FakePool:
+
+    def use_metrics(self, metrics):
+        pass
+
+    def run(self, fn, url):
+        return fn(None, url)
+
+
+def test_drain_stores_results_before_completing(queue):
+    stored = []
+
+    def scrape(scraper, task):
+        return None if task.url == URLS[1] else [task.url]
+
+    def on_result(task, result):
+        assert queue.stats().get('done', 0) == 0
+        stored.append(result)
+
+    counts = drain(queue, FakePool(), scrape, on_result)
+    assert stored == [[URLS[0]]]
+    assert counts == {'completed': 1, 'failed': 2, 'released': 0}
+    assert queue.stats() == {'done': 1, 'failed': 1}
+
+
+def test_drain_releases_when_stopped(queue):
+    counts = drain(queue, FakePool(), lambda scraper, task: [], stop=lambda: True)
+    assert counts == {'completed': 0, 'failed': 0, 'released': 0}
+    assert queue.stats() == {'pending': 2}
+
+
+def test_shards_are_merged_once_and_removed(tmp_path):
+    shard_dir = str(tmp_path / 'shards')
+    headers = ['id_review', 'caption']
+    for run in range(2):
+        # same worker ID, as in a warm Lambda container: each run keeps its own files
+        with ShardWriter(shard_dir, headers, worker='w') as writer:
+            writer.write(0, [{'id_review': 'r1', 'caption': ''}, {'id_review': f'r{run + 2}', 'caption': 'x'}])
+            writer.write(1, [{'id_review': 'r1', 'caption': ''}])
+
+    shards = list_shards(shard_dir)
+    assert len(shards) == 4
+    df = merge_shards(shard_dir, shards)
+    assert sorted(df['id_review']) == ['r1', 'r2', 'r3']
+    assert df.set_index('id_review').loc['r1', 'caption'] == ''
+
+    remove_shards(shard_dir, shards)
+    assert list_shards(shard_dir) == []
+    assert merge_shards(shard_dir).empty
+
+
+class FakeS3:
+
+    def __init__(self):
+        self.uploaded = {}
+
+    def upload_file(self, path, bucket, key):
+        with open(path, 'r', encoding='utf-8') as f:
+            self.uploaded[f"{bucket}/{key}"] = f.read()
+
+
+def test_s3_shards_are_uploaded_and_local_copies_removed(monkeypatch):
+    s3 = FakeS3()
+    monkeypatch.setattr(work_queue.boto3, 'client', lambda service: s3)
+
+    with ShardWriter('s3://bucket/shards', ['id_review'], worker='w') as writer:
+        writer.write(3, [{'id_review': 'r1'}])
+        writer.flush()
+        assert list(s3.uploaded) == [f"bucket/shards/shard-0003.w.{writer.run}.csv"]
+        writer.write(3, [{'id_review': 'r2'}])
+        local_dir = writer.local_dir
+
+    assert s3.uploaded[f"bucket/shards/shard-0003.w.{writer.run}.csv"].split() == ['id_review', 'r1', 'r2']
+    assert not os.path.exists(local_dir)
+
+
+def test_merge_records_visits_once_committed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'urls.txt').write_text('\n'.join(URLS))
+    uploaded = []
+    monkeypatch.setattr(monitor.MonitorS3, 'load_s3_reviews', lambda self, key: pd.DataFrame(columns=['id_review']))
+    monkeypatch.setattr(monitor.MonitorS3, 'upload_csv_to_s3', lambda self, df, headers, key: uploaded.append(df))
+    monkeypatch.setattr(monitor.MonitorS3, 'scrape_place',
+                        lambda self, scraper, url: [{'id_review': url[-1], 'place_id': url[-1]}])
+
+    shard_dir = str(tmp_path / 'shards')
+    schedule = PlaceSchedule(str(tmp_path / 'schedule.sqlite'))
+    queue = SqliteWorkQueue(str(tmp_path / 'queue.sqlite'))
+    worker = monitor.MonitorS3('urls.txt', 10, schedule=schedule, pool=FakePool())
+    worker.enqueue(queue, shards=2)
+    worker.work(queue, shard_dir)
+    assert schedule.next_due(URLS[0]) is None
+
+    coordinator = monitor.MonitorS3('urls.txt', 10, schedule=schedule)
+    coordinator.merge(shard_dir)
+    assert sorted(uploaded[-1]['id_review']) == ['a', 'b']
+    assert all(schedule.next_due(url) is not None for url in URLS)
+    assert list_shards(shard_dir) == [] and list_shards(shard_dir, prefix='visits') == []
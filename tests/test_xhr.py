@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import os
+from datetime import datetime
+
+import pytest
+
+from googlemaps import GoogleMapsScraper
+from metrics import ScraperMetrics
+from xhr import endpoint_of, parse_review_payload
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+RETRIEVAL_DATE = datetime(2024, 11, 2, 10, 30)
+
+
+def payload(endpoint):
+    with open(os.path.join(FIXTURES, f'xhr_{endpoint}.txt'), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def test_listugcposts_payload():
+    reviews = parse_review_payload(payload('listugcposts'), 'listugcposts', place_id='p1',
+                                   retrieval_date=RETRIEVAL_DATE)
+
+    # the entry without ID is dropped
+    assert reviews == [
+        {'id_review': 'ChZDSUhNMG9nS0VJQ0FnSUR4M3JxUxAB', 'caption': 'Great haircut, friendly staff',
+         'relative_date': '4 months ago', 'review_date': datetime.fromtimestamp(1718000000),
+         'retrieval_date': RETRIEVAL_DATE, 'rating': 5.0, 'username': 'Priya R', 'n_review_user': 14,
+         'place_id': 'p1'},
+        {'id_review': 'ChdDSUhNMG9nS0VJQ0FnSUR4bl9iX3BBEAE', 'caption': None,
+         'relative_date': 'a year ago', 'review_date': datetime.fromtimestamp(1690000000),
+         'retrieval_date': RETRIEVAL_DATE, 'rating': 2.0, 'username': 'Arun K', 'n_review_user': 3,
+         'place_id': 'p1'},
+    ]
+
+
+def test_listentitiesreviews_payload():
+    reviews = parse_review_payload(payload('listentitiesreviews'), 'listentitiesreviews', place_id='p1',
+                                   retrieval_date=RETRIEVAL_DATE)
+
+    assert reviews == [
+        {'id_review': 'ChdDSUhNMG9nS0VJQ0FnSUNkOXZDX3dBRRAB', 'caption': 'Clean and quick',
+         'relative_date': '11 months ago', 'review_date': datetime.fromtimestamp(1700000000),
+         'retrieval_date': RETRIEVAL_DATE, 'rating': 4.0, 'username': 'Meena S', 'n_review_user': 27,
+         'place_id': 'p1'},
+    ]
+
+
+def test_payload_without_reviews():
+    assert parse_review_payload(")]}'\n[null,null,null]", 'listugcposts') == []
+
+
+def test_undecodable_payload_raises():
+    with pytest.raises(ValueError):
+        parse_review_payload(")]}'\n<html>", 'listugcposts')
+
+
+@pytest.mark.parametrize('url, endpoint', [
+    ('https://www.google.com/maps/rpc/listugcposts?authuser=0&pb=!1m6', 'listugcposts'),
+    ('https://www.google.com/maps/preview/review/listentitiesreviews?pb=!1m2', 'listentitiesreviews'),
+    ('https://www.google.com/maps/vt?pb=!1m5', None),
+])
+def test_endpoint_of(url, endpoint):
+    assert endpoint_of(url) == endpoint
+
+
+PLACE_URL = 'https://www.google.com/maps/place/Salon/@12.9,77.6,17z/data=!4m8!3m7!1s0x0:0xabc!8m2'
+
+
+def entities_page(ids):
+    entries = []
+    for id_review in ids:
+        entry = [None] * 28
+        entry[0] = [None, f'user {id_review}']
+        entry[4] = 5
+        entry[10] = id_review
+        entries.append(entry)
+    return 'listentitiesreviews', ")]}'\n" + json.dumps([None, None, entries])
+
+
+class FakeCollector:
+    """Hands out one recorded page per collect, as if each scroll fetched the next one."""
+
+    def __init__(self, pages):
+        self.pages = list(pages)
+
+    def collect(self):
+        return [self.pages.pop(0)] if self.pages else []
+
+
+class FakeDriver:
+    def find_element(self, by, value):
+        return object()
+
+    def execute_script(self, script, *args):
+        return 0
+
+
+class FakeWaits:
+    def until(self, name, condition, timeout=None):
+        return False
+
+
+@pytest.fixture
+def xhr_scraper():
+    scraper = GoogleMapsScraper.__new__(GoogleMapsScraper)
+    scraper.logger = logging.getLogger('googlemaps-scraper.test')
+    scraper.metrics = ScraperMetrics()
+    scraper.extraction = 'xhr'
+    scraper.driver = FakeDriver()
+    scraper.waits = FakeWaits()
+    scraper.xhr = FakeCollector([entities_page(['r0', 'r1', 'r2']), entities_page(['r2', 'r3', 'r4', 'r5']),
+                                 entities_page(['r6', 'r7'])])
+    scraper.xhr_reviews = []
+    return scraper
+
+
+def ids(reviews):
+    return [r['id_review'] for r in reviews]
+
+
+def test_get_reviews_xhr_pages_through_offsets(xhr_scraper):
+    assert ids(xhr_scraper.get_reviews(0, PLACE_URL, limit=2)) == ['r0', 'r1']
+    # r2 came with the first response and is not lost, its re-render is dropped
+    assert ids(xhr_scraper.get_reviews(2, PLACE_URL, limit=2)) == ['r2', 'r3']
+    assert ids(xhr_scraper.get_reviews(4, PLACE_URL)) == ['r4', 'r5', 'r6', 'r7']
+    assert xhr_scraper.metrics.counters['reviews'] == 8
+
+
+def test_get_reviews_xhr_stops_at_known_review(xhr_scraper):
+    assert ids(xhr_scraper.get_reviews(0, PLACE_URL, stop_ids={'r3'})) == ['r0', 'r1', 'r2', 'r3', 'r4', 'r5']
+    assert xhr_scraper.xhr.pages  # the last page was never requested
+
+
+def test_get_reviews_xhr_stop_before_offset(xhr_scraper):
+    xhr_scraper.get_reviews(0, PLACE_URL, limit=1)
+    # the known review is already loaded: no scrolling, the loaded reviews after offset
+    assert ids(xhr_scraper.get_reviews(1, PLACE_URL, stop_ids={'r0'})) == ['r1', 'r2']
+    assert len(xhr_scraper.xhr.pages) == 2
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+import logging
+import time
+from collections import deque
+from datetime import datetime
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+MIN_TIMEOUT = 2
+MAX_TIMEOUT = 10
+POLL_FREQUENCY = 0.2
+# adaptive timeout is this many times the average observed wait
+TIMEOUT_FACTOR = 4
+# weight of the latest observation in the running average
+SMOOTHING = 0.3
+# latest waits kept in records, a warm scraper is reused across runs
+MAX_RECORDS = 1000
+
+# TODO: Subject to changes
+REVIEW_BLOCK_SELECTOR = 'div.jftiEf'
+SPINNER_SELECTOR = 'div.lXJj5c.Hk4XGb'
+
+
+class AdaptiveWait:
+    """
+    Condition-based waits with per-wait adaptive timeouts.
+
+    Every wait is identified by a name (e.g. 'sort_menu', 'scroll'); its timeout
+    follows a running average of how long that wait took so far, so slow
+    sessions get more patience and fast ones stop waiting early. The last
+    max_records calls are kept in `records` with the time they actually took.
+    """
+
+    def __init__(self, driver, min_timeout=MIN_TIMEOUT, max_timeout=MAX_TIMEOUT, max_records=MAX_RECORDS):
+        self.driver = driver
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.records = deque(maxlen=max_records)
+        self.logger = logging.getLogger('googlemaps-scraper')
+
+        self._avg = {}
+        self._timeout = {}
+
+    def timeout_for(self, name):
+        return self._timeout.get(name, self.max_timeout)
+
+    def until(self, name, condition, timeout=None):
+        """
+        Wait until condition(driver) is truthy.
+
+        Parameters:
+            name (str): Identifier of the wait, used for adaptation and records.
+            condition (callable): Selenium style condition taking the driver.
+            timeout (float): Explicit timeout overriding the adaptive one.
+
+        Returns:
+            The value returned by condition, or False on timeout.
+        """
+        timeout = self.timeout_for(name) if timeout is None else timeout
+
+        start = time.perf_counter()
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=POLL_FREQUENCY).until(condition)
+            ok = True
+        except TimeoutException:
+            result = False
+            ok = False
+        elapsed = time.perf_counter() - start
+
+        self.__adapt(name, elapsed, ok)
+        self.records.append({
+            'name': name,
+            'elapsed': round(elapsed, 3),
+            'timeout': round(timeout, 3),
+            'ok': ok,
+            'at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        })
+        self.logger.debug(f"wait {name}: {elapsed:.2f}s of {timeout:.2f}s ({'ok' if ok else 'timeout'})")
+
+        return result
+
+    def summary(self):
+        """
+        Returns:
+            dict: Per wait name, number of calls, timeouts and total seconds waited
+            over the calls still in records.
+        """
+        out = {}
+        for r in self.records:
+            s = out.setdefault(r['name'], {'calls': 0, 'timeouts': 0, 'total': 0.0})
+            s['calls'] += 1
+            s['timeouts'] += 0 if r['ok'] else 1
+            s['total'] = round(s['total'] + r['elapsed'], 3)
+        return out
+
+    def __adapt(self, name, elapsed, ok):
+        if not ok:
+            # too impatient: double the timeout for the next attempt
+            self._timeout[name] = min(self.max_timeout, self.timeout_for(name) * 2)
+            return
+
+        avg = self._avg.get(name)
+        avg = elapsed if avg is None else SMOOTHING * elapsed + (1 - SMOOTHING) * avg
+        self._avg[name] = avg
+        self._timeout[name] = min(self.max_timeout, max(self.min_timeout, avg * TIMEOUT_FACTOR))
+
+
+def review_count(driver):
+    return driver.execute_script(f"return document.querySelectorAll('{REVIEW_BLOCK_SELECTOR}').length")
+
+
+def review_ids(driver, start=0):
+    """
+    data-review-id of the loaded review blocks from index start.
+    """
+    return driver.execute_script(
+        "return Array.prototype.slice.call(document.querySelectorAll(arguments[1]), arguments[0])"
+        ".map(function (b) { return b.getAttribute('data-review-id'); })",
+        start, REVIEW_BLOCK_SELECTOR) or []
+
+
+def count_above(selector, previous):
+    def _condition(driver):
+        return driver.execute_script("return document.querySelectorAll(arguments[0]).length", selector) > previous
+    return _condition
+
+
+def review_count_above(previous):
+    def _condition(driver):
+        return review_count(driver) > previous
+    return _condition
+
+
+def spinner_gone(driver):
+    return not driver.execute_script(f"return document.querySelector('{SPINNER_SELECTOR}') !== null")
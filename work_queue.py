@@ -0,0 +1,451 @@
+# -*- coding: utf-8 -*-
+"""
+Sharded work queue fanning places out to scraper.py and monitor.py workers.
+
+A coordinator puts place URLs on the queue, spread over shards. Workers on any
+number of processes or nodes lease one task at a time, keep its lease alive
+with heartbeats while scraping and complete it, or fail it to be retried by
+another lease up to max_attempts. A task whose worker died is leased again once
+its lease expires. Each worker appends its results to per-shard CSV files,
+stored before the task completes, then merged (and deduplicated, retries may
+repeat reviews) and removed once the queue is drained.
+
+Backends: SqliteWorkQueue (a local file, shared by the processes of one host)
+and SqsWorkQueue (an SQS queue), picked by open_queue from the queue URI.
+"""
+import csv
+import json
+import logging
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from collections import namedtuple
+from urllib.parse import urlparse
+
+import boto3
+
+# seconds a leased task stays invisible to other workers without heartbeat
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 3
+SHARDS = 8
+
+Task = namedtuple('Task', ['id', 'url', 'shard', 'attempts', 'receipt'])
+
+
+def worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class SqliteWorkQueue:
+    """
+    Work queue in a SQLite file, safe to share between the processes of one host.
+    """
+
+    def __init__(self, path, lease=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.lease_seconds = lease
+        self.max_attempts = max_attempts
+        self.logger = logging.getLogger('googlemaps-scraper')
+        self._lock = threading.Lock()
+
+        # autocommit, leases take a write lock with BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                shard INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                receipt TEXT,
+                leased_until REAL,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, leased_until);
+        """)
+
+    def put(self, urls, shards=SHARDS):
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.executemany("INSERT INTO tasks (url, shard) VALUES (?, ?)",
+                                  [(url, i % shards) for i, url in enumerate(urls)])
+            self.conn.execute("COMMIT")
+
+    def lease(self, worker):
+        """
+        Returns:
+            Task: Next pending task (or task whose lease expired), None when there is none left.
+        """
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # expired leases of a last attempt are not retried
+                self.conn.execute("""
+                    UPDATE tasks SET status = 'failed', error = 'lease expired'
+                    WHERE status = 'leased' AND leased_until < ? AND attempts >= ?
+                """, (now, self.max_attempts))
+                row = self.conn.execute("""
+                    SELECT id, url, shard, attempts FROM tasks
+                    WHERE status = 'pending' OR (status = 'leased' AND leased_until < ?)
+                    ORDER BY id LIMIT 1
+                """, (now,)).fetchone()
+                if row is None:
+                    self.conn.execute("COMMIT")
+                    return None
+
+                task_id, url, shard, attempts = row
+                receipt = f"{worker}:{attempts + 1}"
+                self.conn.execute("""
+                    UPDATE tasks SET status = 'leased', attempts = ?, receipt = ?, leased_until = ? WHERE id = ?
+                """, (attempts + 1, receipt, now + self.lease_seconds, task_id))
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+        return Task(task_id, url, shard, attempts + 1, receipt)
+
+    def heartbeat(self, task):
+        with self._lock:
+            self.conn.execute("UPDATE tasks SET leased_until = ? WHERE id = ? AND receipt = ? AND status = 'leased'",
+                              (time.time() + self.lease_seconds, task.id, task.receipt))
+
+    def complete(self, task):
+        with self._lock:
+            # a worker whose lease expired and was taken over no longer owns the task
+            self.conn.execute("UPDATE tasks SET status = 'done', leased_until = NULL WHERE id = ? AND receipt = ?",
+                              (task.id, task.receipt))
+
+    def fail(self, task, error=''):
+        status = 'failed' if task.attempts >= self.max_attempts else 'pending'
+        with self._lock:
+            self.conn.execute("UPDATE tasks SET status = ?, error = ?, leased_until = NULL WHERE id = ? AND receipt = ?",
+                              (status, str(error), task.id, task.receipt))
+
+    def release(self, task):
+        # handed back untried, e.g. out of time: the attempt does not count
+        with self._lock:
+            self.conn.execute("""
+                UPDATE tasks SET status = 'pending', attempts = attempts - 1, leased_until = NULL
+                WHERE id = ? AND receipt = ?
+            """, (task.id, task.receipt))
+
+    def stats(self):
+        """
+        Returns:
+            dict: status -> number of tasks.
+        """
+        with self._lock:
+            return dict(self.conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+
+    def close(self):
+        self.conn.close()
+
+
+class SqsWorkQueue:
+    """
+    Work queue on SQS: leases are visibility timeouts, attempts the receive count.
+
+    Every receive counts, so a released task is handed back as a new message
+    carrying the attempts already made instead of being made visible again.
+
+    Give the queue a redrive policy to keep the messages of failed tasks in a
+    dead-letter queue; without one they are dropped after max_attempts.
+    """
+
+    def __init__(self, queue_url, lease=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS, wait=5):
+        self.queue_url = queue_url
+        self.lease_seconds = lease
+        self.max_attempts = max_attempts
+        self.wait = wait
+        self.logger = logging.getLogger('googlemaps-scraper')
+        self.sqs = boto3.client('sqs')
+
+    def put(self, urls, shards=SHARDS):
+        entries = [{'Id': str(i), 'MessageBody': json.dumps({'url': url, 'shard': i % shards})}
+                   for i, url in enumerate(urls)]
+        # at most 10 messages per batch
+        for i in range(0, len(entries), 10):
+            resp = self.sqs.send_message_batch(QueueUrl=self.queue_url, Entries=entries[i:i + 10])
+            for failed in resp.get('Failed', []):
+                self.logger.error(f"Failed to enqueue {entries[int(failed['Id'])]['MessageBody']}: {failed['Message']}")
+
+    def lease(self, worker):
+        resp = self.sqs.receive_message(QueueUrl=self.queue_url, MaxNumberOfMessages=1,
+                                        VisibilityTimeout=self.lease_seconds, WaitTimeSeconds=self.wait,
+                                        AttributeNames=['ApproximateReceiveCount'])
+        messages = resp.get('Messages', [])
+        if not messages:
+            return None
+
+        message = messages[0]
+        body = json.loads(message['Body'])
+        attempts = body.get('attempts', 0) + int(message['Attributes']['ApproximateReceiveCount'])
+        return Task(message['MessageId'], body['url'], body['shard'], attempts, message['ReceiptHandle'])
+
+    def heartbeat(self, task):
+        self.sqs.change_message_visibility(QueueUrl=self.queue_url, ReceiptHandle=task.receipt,
+                                           VisibilityTimeout=self.lease_seconds)
+
+    def complete(self, task):
+        self.sqs.delete_message(QueueUrl=self.queue_url, ReceiptHandle=task.receipt)
+
+    def fail(self, task, error=''):
+        if task.attempts >= self.max_attempts:
+            self.logger.error(f"Giving up on {task.url} after {task.attempts} attempts: {error}")
+            self.sqs.delete_message(QueueUrl=self.queue_url, ReceiptHandle=task.receipt)
+        else:
+            self.sqs.change_message_visibility(QueueUrl=self.queue_url, ReceiptHandle=task.receipt,
+                                               VisibilityTimeout=0)
+
+    def release(self, task):
+        # a new message starts its receive count over: the attempt does not count. If the delete
+        # fails the task runs twice, its duplicate reviews are dropped by the merge
+        body = {'url': task.url, 'shard': task.shard, 'attempts': task.attempts - 1}
+        self.sqs.send_message(QueueUrl=self.queue_url, MessageBody=json.dumps(body))
+        self.sqs.delete_message(QueueUrl=self.queue_url, ReceiptHandle=task.receipt)
+
+    def stats(self):
+        attributes = self.sqs.get_queue_attributes(
+            QueueUrl=self.queue_url,
+            AttributeNames=['ApproximateNumberOfMessages', 'ApproximateNumberOfMessagesNotVisible'])['Attributes']
+        return {'pending': int(attributes['ApproximateNumberOfMessages']),
+                'leased': int(attributes['ApproximateNumberOfMessagesNotVisible'])}
+
+    def close(self):
+        pass
+
+
+def open_queue(uri, lease=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+    """
+    Parameters:
+        uri (str): SQS queue URL (https://sqs.<region>.amazonaws.com/...) or SQLite file path.
+    """
+    if uri.startswith('https://sqs.') or uri.startswith('sqs://'):
+        return SqsWorkQueue(uri.replace('sqs://', 'https://', 1), lease=lease, max_attempts=max_attempts)
+    return SqliteWorkQueue(uri, lease=lease, max_attempts=max_attempts)
+
+
+def drain(queue, pool, fn, on_result=None, threads=1, worker=None, stop=None):
+    """
+    Lease and process tasks until the queue is empty.
+
+    Parameters:
+        queue: SqliteWorkQueue or SqsWorkQueue.
+        pool (ScraperPool): Scrapers running the tasks.
+        fn (callable): fn(scraper, task) doing one task, None or False on failure.
+        on_result (callable): on_result(task, result) storing a result before the task completes.
+        threads (int): Tasks processed in parallel, usually the pool workers.
+        worker (str): Worker ID, defaults to host and process.
+        stop (callable): Returns True when no more tasks should be leased (e.g. out of time).
+
+    Returns:
+        dict: Tasks completed, failed and released by this worker.
+    """
+    worker = worker or worker_id()
+    logger = logging.getLogger('googlemaps-scraper')
+    leased = {}
+    counts = {'completed': 0, 'failed': 0, 'released': 0}
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def beat():
+        # keep the leases of running tasks alive
+        while not done.wait(queue.lease_seconds / 3):
+            with lock:
+                tasks = list(leased.values())
+            for task in tasks:
+                try:
+                    queue.heartbeat(task)
+                except Exception as e:
+                    logger.warning(f"Heartbeat of {task.url} failed: {e}")
+
+    def process(task):
+        if stop and stop():
+            queue.release(task)
+            return 'released'
+
+        try:
+            result = pool.run(lambda scraper, url: fn(scraper, task), task.url)
+            if result is None or result is False:
+                raise RuntimeError('scrape failed')
+            if on_result is not None:
+                on_result(task, result)
+        except Exception as e:
+            logger.error(f"{task.url} (attempt {task.attempts}): {type(e).__name__}: {e}")
+            queue.fail(task, e)
+            return 'failed'
+
+        queue.complete(task)
+        return 'completed'
+
+    def work():
+        while not (stop and stop()):
+            task = queue.lease(worker)
+            if task is None:
+                return
+
+            with lock:
+                leased[task.id] = task
+            try:
+                outcome = process(task)
+            finally:
+                with lock:
+                    leased.pop(task.id, None)
+            with lock:
+                counts[outcome] += 1
+
+    heartbeat = threading.Thread(target=beat, daemon=True)
+    heartbeat.start()
+    workers = [threading.Thread(target=work) for _ in range(max(1, threads))]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    done.set()
+
+    logger.info(f"Worker {worker} drained the queue: {counts}")
+    return counts
+
+
+class ShardWriter:
+    """
+    Per-shard CSV outputs of one worker run: <shard_dir>/<prefix>-<shard>.<worker>.<run>.csv
+
+    shard_dir is a local (or shared) directory or s3://bucket/prefix; S3 files
+    are written locally and uploaded by flush, to call before completing the
+    task whose rows were written. run is unique per writer, so a warm Lambda
+    container never overwrites the files of its previous invocations.
+    """
+
+    def __init__(self, shard_dir, headers, worker=None, prefix='shard'):
+        self.shard_dir = shard_dir
+        self.headers = headers
+        self.worker = worker or worker_id()
+        self.prefix = prefix
+        self.run = uuid.uuid4().hex[:12]
+        self.logger = logging.getLogger('googlemaps-scraper')
+        self._lock = threading.Lock()
+        self._files = {}
+        self._dirty = set()
+
+        self.s3_url = urlparse(shard_dir) if shard_dir.startswith('s3://') else None
+        self.local_dir = os.path.join('/tmp', 'shards', self.run) if self.s3_url else shard_dir
+        os.makedirs(self.local_dir, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    def write(self, shard, reviews):
+        with self._lock:
+            name, f, writer = self.__open(shard)
+            for r in reviews:
+                writer.writerow([r.get(k, "") for k in self.headers])
+            f.flush()
+            os.fsync(f.fileno())
+            self._dirty.add(name)
+
+    def flush(self):
+        """
+        Upload the S3 files written since the last flush.
+        """
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            if self.s3_url is None:
+                return
+            for name in sorted(dirty):
+                key = f"{self.s3_url.path.strip('/')}/{name}".lstrip('/')
+                boto3.client('s3').upload_file(os.path.join(self.local_dir, name), self.s3_url.netloc, key)
+                self.logger.debug(f"Uploaded s3://{self.s3_url.netloc}/{key}")
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            files, self._files = self._files, {}
+        for f, _ in files.values():
+            f.close()
+        if self.s3_url is not None:
+            # uploaded by flush: the local copies would fill the disk of a warm Lambda container
+            shutil.rmtree(self.local_dir, ignore_errors=True)
+
+    def __open(self, shard):
+        name = f"{self.prefix}-{shard:04d}.{self.worker}.{self.run}.csv"
+        if name not in self._files:
+            f = open(os.path.join(self.local_dir, name), 'a', newline='', encoding='utf-8')
+            writer = csv.writer(f)
+            writer.writerow(self.headers)
+            self._files[name] = (f, writer)
+        return (name,) + self._files[name]
+
+
+def list_shards(shard_dir, prefix='shard'):
+    """
+    Returns:
+        list[str]: Names of the files written by ShardWriters with this prefix in shard_dir.
+    """
+    if shard_dir.startswith('s3://'):
+        url = urlparse(shard_dir)
+        base = url.path.strip('/')
+        pages = boto3.client('s3').get_paginator('list_objects_v2').paginate(
+            Bucket=url.netloc, Prefix=f"{base}/{prefix}-".lstrip('/'))
+        return sorted(obj['Key'].rsplit('/', 1)[-1] for page in pages for obj in page.get('Contents', []))
+    if os.path.isdir(shard_dir):
+        return sorted(name for name in os.listdir(shard_dir)
+                      if name.startswith(f"{prefix}-") and name.endswith('.csv'))
+    return []
+
+
+def merge_shards(shard_dir, names=None):
+    """
+    Parameters:
+        shard_dir (str): Directory or s3://bucket/prefix written by ShardWriters.
+        names (list[str]): Files to merge, every review shard (list_shards) by default.
+
+    Returns:
+        pd.DataFrame: Rows of every file, each id_review once.
+    """
+    import pandas as pd
+
+    names = list_shards(shard_dir) if names is None else names
+    # as written: no type inference, empty fields stay empty
+    read = dict(dtype=str, keep_default_na=False)
+    frames = []
+    if shard_dir.startswith('s3://'):
+        url = urlparse(shard_dir)
+        s3 = boto3.client('s3')
+        for name in names:
+            key = f"{url.path.strip('/')}/{name}".lstrip('/')
+            frames.append(pd.read_csv(s3.get_object(Bucket=url.netloc, Key=key)['Body'], **read))
+    else:
+        for name in names:
+            frames.append(pd.read_csv(os.path.join(shard_dir, name), **read))
+
+    if not frames:
+        return pd.DataFrame(columns=['id_review'])
+
+    df = pd.concat(frames, ignore_index=True)
+    return df.drop_duplicates('id_review') if 'id_review' in df.columns else df
+
+
+def remove_shards(shard_dir, names):
+    """
+    Delete merged files, once their rows are committed, so that the next merge does not read them again.
+    """
+    if shard_dir.startswith('s3://'):
+        url = urlparse(shard_dir)
+        s3 = boto3.client('s3')
+        keys = [f"{url.path.strip('/')}/{name}".lstrip('/') for name in names]
+        # delete_objects takes up to 1000 keys
+        for i in range(0, len(keys), 1000):
+            s3.delete_objects(Bucket=url.netloc, Delete={'Objects': [{'Key': key} for key in keys[i:i + 1000]]})
+    else:
+        for name in names:
+            os.remove(os.path.join(shard_dir, name))
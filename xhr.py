@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+from datetime import datetime
+
+# background requests feeding the review pane
+# TODO: Subject to changes
+REVIEW_XHR_PATTERNS = {
+    'listugcposts': '/maps/rpc/listugcposts',
+    'listentitiesreviews': '/maps/preview/review/listentitiesreviews',
+}
+
+# anti-XSSI prefix Google puts in front of JSON responses
+XSSI_PREFIX = ")]}'"
+
+# index paths of each field inside a single review entry, per endpoint
+# TODO: Subject to changes
+REVIEW_FIELDS = {
+    'listugcposts': {
+        'id_review': (0, 0),
+        'username': (0, 1, 4, 5, 0),
+        'n_review_user': (0, 1, 4, 5, 5),
+        'timestamp_us': (0, 1, 2),
+        'relative_date': (0, 1, 6),
+        'rating': (0, 2, 0, 0),
+        'caption': (0, 2, 15, 0, 0),
+    },
+    'listentitiesreviews': {
+        'id_review': (10,),
+        'username': (0, 1),
+        'n_review_user': (12, 1, 1),
+        'timestamp_ms': (27,),
+        'relative_date': (1,),
+        'rating': (4,),
+        'caption': (3,),
+    },
+}
+
+
+def _dig(obj, path):
+    for i in path:
+        try:
+            obj = obj[i]
+        except (IndexError, KeyError, TypeError):
+            return None
+    return obj
+
+
+def endpoint_of(url):
+    for name, pattern in REVIEW_XHR_PATTERNS.items():
+        if pattern in url:
+            return name
+    return None
+
+
+def load_payload(body):
+    if body.startswith(XSSI_PREFIX):
+        body = body[len(XSSI_PREFIX):]
+    return json.loads(body)
+
+
+def parse_review_payload(body, endpoint, place_id=None, retrieval_date=None):
+    """
+    Decode a review XHR response into the review dict schema used by __parse.
+
+    Pure function on the response text, so recorded payloads can be parsed offline.
+
+    Parameters:
+        body (str): Raw response body, XSSI prefix included.
+        endpoint (str): Key of REVIEW_XHR_PATTERNS the body was fetched from.
+        place_id (str): Place ID added to each review.
+        retrieval_date (datetime): Scraping time, defaults to now.
+
+    Returns:
+        list[dict]: Parsed reviews.
+    """
+    retrieval_date = datetime.now() if retrieval_date is None else retrieval_date
+    fields = REVIEW_FIELDS[endpoint]
+
+    entries = _dig(load_payload(body), (2,)) or []
+
+    reviews = []
+    for entry in entries:
+        id_review = _dig(entry, fields['id_review'])
+        if id_review is None:
+            continue
+
+        review_date = None
+        if 'timestamp_us' in fields and _dig(entry, fields['timestamp_us']):
+            review_date = datetime.fromtimestamp(_dig(entry, fields['timestamp_us']) / 1e6)
+        elif 'timestamp_ms' in fields and _dig(entry, fields['timestamp_ms']):
+            review_date = datetime.fromtimestamp(_dig(entry, fields['timestamp_ms']) / 1e3)
+
+        rating = _dig(entry, fields['rating'])
+        caption = _dig(entry, fields['caption'])
+
+        reviews.append({
+            'id_review': id_review,
+            'caption': caption.replace('\r', ' ').replace('\n', ' ').replace('\t', ' ') if caption else None,
+            'relative_date': _dig(entry, fields['relative_date']),
+            'review_date': review_date,
+            'retrieval_date': retrieval_date,
+            'rating': float(rating) if rating is not None else None,
+            'username': _dig(entry, fields['username']),
+            'n_review_user': _dig(entry, fields['n_review_user']) or 0,
+            'place_id': place_id,
+        })
+
+    return reviews
+
+
+class ReviewXhrCollector:
+    """
+    Collect review XHR responses from the Chrome DevTools performance log.
+
+    The driver must be started with the 'goog:loggingPrefs' performance capability.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.logger = logging.getLogger('googlemaps-scraper')
+        # requestId -> (endpoint, url) of matching responses whose body is not loaded yet
+        self._pending = {}
+
+    def reset(self):
+        # drain the buffered log, e.g. before navigating to a new place
+        self.driver.get_log('performance')
+        self._pending = {}
+
+    def collect(self):
+        """
+        Returns:
+            list[tuple[str, str]]: (endpoint, body) of review responses finished since the last call.
+        """
+        finished = set()
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+
+            method = message.get('method')
+            params = message.get('params', {})
+
+            if method == 'Network.responseReceived':
+                url = params.get('response', {}).get('url', '')
+                endpoint = endpoint_of(url)
+                if endpoint is not None:
+                    self._pending[params['requestId']] = (endpoint, url)
+            elif method == 'Network.loadingFinished':
+                finished.add(params.get('requestId'))
+
+        bodies = []
+        for request_id in [r for r in self._pending if r in finished]:
+            endpoint, url = self._pending.pop(request_id)
+            try:
+                resp = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+                bodies.append((endpoint, resp['body']))
+            except Exception as e:
+                self.logger.warning(f"Failed to read response body of {url}: {e}")
+
+        return bodies